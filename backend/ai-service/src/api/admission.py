@@ -0,0 +1,200 @@
+# backend/ai-service/src/api/admission.py
+"""분석 요청 승인(admission) 제어
+
+분석 1건의 비용을 (오디오 길이 × 분석 샘플레이트) 로 추정해 메모리·슬롯을 예약한다.
+전체 / 클라이언트별 한도를 넘는 요청은 스레드풀에서 기다리게 하지 않고 바로 거절
+(엔드포인트에서 429 + Retry-After) → 몰린 요청 때문에 컨테이너가 OOM 으로 죽지 않는다.
+
+- 메모리 : 길이 × sr × ADMISSION_BYTES_PER_SAMPLE
+           (디코딩·HPSS·STFT·RNN 전체 최대 사용량 실측 ≈ 128 B/샘플)
+- 슬롯   : 동시 분석 수 (기본값 = 분석 엔진 동시 실행 수)
+- 클라이언트 : 요청 IP (ADMISSION_TRUST_PROXY=1 이면 X-Forwarded-For 첫 값)
+- client=None (작업 큐 · CLI) 은 거절 대신 자리가 날 때까지 기다리고
+  클라이언트별 한도는 적용하지 않는다 (작업 큐는 자체 대기열이 있으므로)
+- 한도보다 큰 단일 요청은 다른 분석이 없을 때 단독으로만 실행
+- Retry-After : 진행 중인 분석의 예상 종료 시각 (길이 × 처리 속도 이동 평균)
+"""
+
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+from fastapi import HTTPException, Request
+
+from beatmap.engine import analysis_engine
+from monitoring.metrics import ADMISSION_REJECTED
+
+MB = 1024 * 1024
+
+ADMISSION_MEMORY_MB = int(os.getenv("ADMISSION_MEMORY_MB", "2048"))
+ADMISSION_CLIENT_MEMORY_MB = int(os.getenv("ADMISSION_CLIENT_MEMORY_MB", "1024"))
+ADMISSION_SLOTS = int(os.getenv("ADMISSION_SLOTS", "0"))         # 0 → 엔진 capacity
+ADMISSION_CLIENT_SLOTS = int(os.getenv("ADMISSION_CLIENT_SLOTS", "2"))
+ADMISSION_BYTES_PER_SAMPLE = int(os.getenv("ADMISSION_BYTES_PER_SAMPLE", "128"))
+# 오디오 1초당 처리 시간(초) 초기값 – 이후 실제 처리 시간으로 갱신
+ADMISSION_RTF = float(os.getenv("ADMISSION_RTF", "0.1"))
+ADMISSION_MAX_RETRY_AFTER = int(os.getenv("ADMISSION_MAX_RETRY_AFTER", "60"))
+ADMISSION_TRUST_PROXY = os.getenv("ADMISSION_TRUST_PROXY", "0") == "1"
+
+_REASONS = {
+    "slots": "동시 분석 수 한도",
+    "memory": "분석 메모리 한도",
+    "client_slots": "클라이언트 동시 분석 수 한도",
+    "client_memory": "클라이언트 분석 메모리 한도",
+}
+
+
+class AdmissionRejected(Exception):
+    """한도 초과 – retry_after 초 뒤 재시도 권장 (client: 클라이언트별 한도일 때 그 클라이언트)"""
+
+    def __init__(self, reason: str, retry_after: int, client: Optional[str] = None):
+        super().__init__(f"{_REASONS[reason]} 초과 – {retry_after}초 후 다시 시도하세요")
+        self.reason = reason
+        self.retry_after = retry_after
+        self.client = client
+
+
+@dataclass
+class _Ticket:
+    client: Optional[str]
+    memory: int
+    duration: float
+    started: float = 0.0
+
+
+class AdmissionController:
+    def __init__(self, max_memory: int, max_slots: int, client_memory: int,
+                 client_slots: int, bytes_per_sample: int = 128, rtf: float = 0.1):
+        self.max_memory = max_memory
+        self.max_slots = max_slots
+        self.client_memory = client_memory
+        self.client_slots = client_slots
+        self.bytes_per_sample = bytes_per_sample
+        self.rtf = rtf
+        self.rejected = 0
+
+        self._cond = threading.Condition()
+        self._tickets: List[_Ticket] = []
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        slots = ADMISSION_SLOTS or analysis_engine.capacity
+        return cls(max_memory=ADMISSION_MEMORY_MB * MB, max_slots=slots,
+                   client_memory=ADMISSION_CLIENT_MEMORY_MB * MB,
+                   client_slots=ADMISSION_CLIENT_SLOTS,
+                   bytes_per_sample=ADMISSION_BYTES_PER_SAMPLE, rtf=ADMISSION_RTF)
+
+    # ──────────────────────────────────────────────────────────────
+    # PUBLIC
+    # ──────────────────────────────────────────────────────────────
+    def estimate(self, duration: float, sr: int) -> int:
+        """분석 최대 메모리 추정 (바이트)"""
+        return int(max(duration, 1.0) * sr * self.bytes_per_sample)
+
+    def check(self, client: str):
+        """비용을 모르는 시점(스풀·다운로드 전)의 빠른 거절 – 슬롯만 확인"""
+        with self._cond:
+            self._raise_if_blocked_locked(client, 0)
+
+    @contextmanager
+    def admit(self, client: Optional[str], duration: float, sr: int,
+              resident_sec: Optional[float] = None) -> Iterator[_Ticket]:
+        """분석 구간 동안 메모리·슬롯 예약
+
+        duration     : 오디오 길이(초) – Retry-After 추정에 사용
+        resident_sec : 한 번에 메모리에 올라가는 길이 (스트리밍 분석은 블록 크기)
+        """
+        resident = duration if resident_sec is None else min(duration, resident_sec)
+        ticket = _Ticket(client, self.estimate(resident, sr), duration)
+        with self._cond:
+            if client is None:
+                while self._blocked_locked(None, ticket.memory):
+                    self._cond.wait()
+            else:
+                self._raise_if_blocked_locked(client, ticket.memory)
+            ticket.started = time.monotonic()
+            self._tickets.append(ticket)
+        try:
+            yield ticket
+        finally:
+            elapsed = time.monotonic() - ticket.started
+            with self._cond:
+                self._tickets.remove(ticket)
+                if ticket.duration > 0:
+                    self.rtf = 0.8 * self.rtf + 0.2 * (elapsed / ticket.duration)
+                self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "inflight": len(self._tickets),
+                "memory_mb": round(sum(t.memory for t in self._tickets) / MB, 1),
+                "max_memory_mb": round(self.max_memory / MB, 1),
+                "slots": self.max_slots,
+                "clients": len({t.client for t in self._tickets}),
+                "rtf": round(self.rtf, 4),
+                "rejected": self.rejected,
+            }
+
+    def memory_in_use(self) -> int:
+        with self._cond:
+            return sum(t.memory for t in self._tickets)
+
+    # ──────────────────────────────────────────────────────────────
+    # INTERNAL
+    # ──────────────────────────────────────────────────────────────
+    def _blocked_locked(self, client: Optional[str], memory: int) -> Optional[str]:
+        """넘는 한도 이름 (없으면 None). 비어 있으면 큰 요청도 단독으로 통과"""
+        if len(self._tickets) >= self.max_slots:
+            return "slots"
+        if self._tickets and sum(t.memory for t in self._tickets) + memory > self.max_memory:
+            return "memory"
+        if client is not None:
+            mine = [t for t in self._tickets if t.client == client]
+            if len(mine) >= self.client_slots:
+                return "client_slots"
+            if mine and sum(t.memory for t in mine) + memory > self.client_memory:
+                return "client_memory"
+        return None
+
+    def _raise_if_blocked_locked(self, client: str, memory: int):
+        reason = self._blocked_locked(client, memory)
+        if reason is None:
+            return
+        self.rejected += 1
+        ADMISSION_REJECTED.labels(reason).inc()
+        if not reason.startswith("client_"):
+            raise AdmissionRejected(reason, self._retry_after_locked(self._tickets))
+        tickets = [t for t in self._tickets if t.client == client]
+        raise AdmissionRejected(reason, self._retry_after_locked(tickets), client=client)
+
+    def _retry_after_locked(self, tickets: List[_Ticket]) -> int:
+        """가장 먼저 끝날 분석의 예상 남은 시간 (1 ~ ADMISSION_MAX_RETRY_AFTER 초)"""
+        now = time.monotonic()
+        left = min((t.started + t.duration * self.rtf - now for t in tickets), default=1.0)
+        return min(max(1, math.ceil(left)), ADMISSION_MAX_RETRY_AFTER)
+
+
+admission = AdmissionController.from_env()
+
+
+def too_busy(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(429, str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+async def admission_client(request: Request) -> str:
+    """라우트 의존성 – 클라이언트 식별 + 슬롯이 꽉 찼으면 업로드·다운로드 전에 429"""
+    client = request.client.host if request.client else "unknown"
+    if ADMISSION_TRUST_PROXY:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            client = forwarded.split(",")[0].strip() or client
+    try:
+        admission.check(client)
+    except AdmissionRejected as e:
+        raise too_busy(e)
+    return client
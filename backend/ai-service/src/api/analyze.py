@@ -1,242 +1,569 @@
 # backend/ai-service/src/api/analyze.py
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi import (APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks,
+                     Depends, Request)
 from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+import asyncio
 import io
 import json
 import logging
 import os
-import uuid
-import importlib
+import subprocess
+from itertools import chain
+from typing import Callable, Dict, Iterator, List, Optional, Union
 import numpy as np
 import librosa
-from scipy.signal import butter, sosfiltfilt, medfilt, argrelextrema
+import soundfile as sf
+from scipy.signal import medfilt
 from librosa.util.exceptions import ParameterError
 
+from audio.converters import decode_to_array, stream_pcm
+from audio.digest import AudioHasher
+from beatmap.analysis import AnalysisContext, detect_beats, resample_audio
+from beatmap.charting import (BEAT_TOL, CLOSE_EVENT_THR, MAX_FACTOR, NUM_LANES, SNAP_TOL,
+                              SPAN_MARGIN_SEC, SPAN_SEC, SUBDIVISIONS, TARGET_DENSITY,
+                              WINDOW_SEC, BeatmapFeatures, chart_from_features,
+                              estimate_tempo, report_progress)
+from beatmap.cache import BeatmapCache
+from beatmap.engine import analysis_engine
+from beatmap.features import FeatureCache, feature_path, read_features, write_features
+from beatmap.generator import Difficulty
+from beatmap.store import save_beatmap
+from models.beat_tracker import BeatTracker
+from monitoring.metrics import AUDIO_SECONDS, StageTimer, register_cache
+from monitoring.profiler import PROFILE_HEADER, profiled
+from api.admission import AdmissionRejected, admission, admission_client, too_busy
+from api.uploads import check_content_length, spool_upload
+
 # --------------------------------------------------------------- #
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-SAVE_DIR = "/tmp/audio_json"
-NUM_LANES = 4
-TARGET_DENSITY = 2.5    # 초당 최대 이벤트
-WINDOW_SEC = 2.5
-MAX_FACTOR = 2.0
-BEAT_TOL = 0.05         # strong 판정용 비트 근접 오차(초)
-SNAP_TOL = 0.04         # 그리드 스냅 오차(초)
-CLOSE_EVENT_THR = 0.02 # 너무 가까운 이벤트 병합(초)
-SUBDIVISIONS = [1, 2, 4, 8]
+SAVE_DIR = os.getenv("BEATMAP_DIR", "/tmp/audio_json")
+# 분석 샘플레이트 (0 이면 업로드 원본 레이트 그대로 – 이전 동작)
+ANALYSIS_SR = int(os.getenv("ANALYSIS_SR", "22050")) or None
+RAW_PCM_SR = 44100      # raw PCM 폴백 시 가정하는 원본 레이트
+UPLOAD_MIN_BYTES_PER_SEC = 16000   # 헤더로 길이를 모를 때 가정하는 최저 비트레이트 (128 kbps)
+PIPELINE_VERSION = 4    # 상수 외 알고리즘 변경 시 올려서 캐시 무효화
+FEATURE_VERSION = 3     # 특징 추출(extract_features) 변경 시 올려서 .feat 무효화
+
+CACHE_MAX_BYTES = int(os.getenv("BEATMAP_CACHE_MAX_MB", "512")) * 1024 * 1024
+CACHE_MAX_ENTRIES = int(os.getenv("BEATMAP_CACHE_MAX_ENTRIES", "5000"))
+FEATURE_CACHE_ENTRIES = int(os.getenv("FEATURE_CACHE_ENTRIES", "64"))
+# 미리보기: 이 레이트로 내려 HPSS·madmom 없이 librosa 비트 + 온셋만 (hop 256 → 본 분석과 같은 프레임 간격)
+PREVIEW_SR = int(os.getenv("PREVIEW_SR", "11025"))
+PREVIEW_HOP = 256
+
+# 난이도별 초당 최대 이벤트 (NORMAL = 기존 단일 차트, 비율은 generator 의 note_density)
+DIFFICULTY_DENSITY = {
+    Difficulty.EASY:   TARGET_DENSITY * 0.6,
+    Difficulty.NORMAL: TARGET_DENSITY,
+    Difficulty.HARD:   TARGET_DENSITY * 1.4,
+    Difficulty.EXPERT: TARGET_DENSITY * 1.8,
+}
+
+
+def analysis_params():
+    """결과에 영향을 주는 파라미터 – 캐시 지문의 원천"""
+    return {
+        "version": PIPELINE_VERSION,
+        "feature_version": FEATURE_VERSION,
+        "analysis_sr": ANALYSIS_SR,
+        "num_lanes": NUM_LANES,
+        "target_density": TARGET_DENSITY,
+        "window_sec": WINDOW_SEC,
+        "max_factor": MAX_FACTOR,
+        "beat_tol": BEAT_TOL,
+        "snap_tol": SNAP_TOL,
+        "close_event_thr": CLOSE_EVENT_THR,
+        "subdivisions": SUBDIVISIONS,
+        "span_sec": SPAN_SEC,
+        "span_margin_sec": SPAN_MARGIN_SEC,
+        "difficulty_density": {d.value: v for d, v in DIFFICULTY_DENSITY.items()},
+    }
+
+
+beatmap_cache = BeatmapCache(SAVE_DIR, analysis_params,
+                             max_bytes=CACHE_MAX_BYTES,
+                             max_entries=CACHE_MAX_ENTRIES)
+feature_cache = FeatureCache(max_entries=FEATURE_CACHE_ENTRIES)
+register_cache("beatmap", beatmap_cache.stats)
+register_cache("features", feature_cache.stats)
+# 리듬 메타데이터(템포 신뢰도·리듬 복잡도) – 이미 구한 온셋 엔벨로프만 재사용
+feature_engine = BeatTracker(device="cpu")
 
 # --------------------------------------------------------------- #
 # 1. 안전한 오디오 로드
-def load_audio_safe(audio_bytes):
+def load_audio_safe(audio: Union[bytes, str], sr=ANALYSIS_SR):
+    """업로드 바이트 또는 파일 경로 → mono float32
+
+    raw PCM 폴백은 바이트면 frombuffer 뷰, 경로면 memmap 에서 float32 버퍼 하나로 바로 변환
+    """
+    is_path = isinstance(audio, (str, os.PathLike))
     try:
-        y, sr = librosa.load(io.BytesIO(audio_bytes),
-                             sr=None, mono=True, dtype=np.float32)
+        # 디코딩과 동시에 분석 레이트로 리샘플 (soxr_hq)
+        y, sr = librosa.load(audio if is_path else io.BytesIO(audio),
+                             sr=sr, mono=True, dtype=np.float32,
+                             res_type="soxr_hq")
     except ParameterError as e:
         logger.warning("librosa.load failed (%s) – raw PCM fallback", e)
-        raw = np.frombuffer(audio_bytes, dtype=np.int16)
+        if is_path:
+            n = os.path.getsize(audio) // 2
+            raw = np.memmap(audio, dtype=np.int16, mode="r", shape=(n,)) if n else np.zeros(0, np.int16)
+        else:
+            raw = np.frombuffer(audio, dtype=np.int16)
         if raw.size == 0:
             raise
-        y = raw.astype(np.float32) / 32768.0
-        sr = 44100
+        y = np.empty(raw.size, dtype=np.float32)
+        np.multiply(raw, np.float32(1 / 32768.0), out=y)
+        del raw
+        y = resample_audio(y, RAW_PCM_SR, sr)
+        sr = sr or RAW_PCM_SR
     if not np.isfinite(y).all():
         y = np.nan_to_num(y, nan=0.0, posinf=0.0, neginf=0.0)
     return y, sr
 
-# --------------------------------------------------------------- #
-# 2. 전처리 뷰
-def bandpass_filter(y, sr, low=20, high=200, order=4):
-    nyq = sr / 2
-    sos = butter(order, [low / nyq, high / nyq], btype="band", output="sos")
-    return sosfiltfilt(sos, y)
-
-def preprocess_views(y, sr):
-    y_low = bandpass_filter(y, sr, 20, 200)
+def load_audio_file(path, sr=ANALYSIS_SR, duration_hint=None):
+    """파일 → ffmpeg 파이프(리샘플 포함) → mono float32 (임시 wav · 재디코딩 없음)
+
+    ffmpeg 가 없거나 실패하면(또는 sr=None) 파일 경로로 load_audio_safe 폴백
+    duration_hint 가 없으면 soundfile 헤더로 길이를 읽어 PCM 버퍼를 한 번에 잡는다
+    """
     try:
-        y_harm, y_perc = librosa.effects.hpss(y)
-    except Exception:
-        logger.warning("HPSS 실패 – harm/full 동일 사용")
-        y_harm, y_perc = y, y_low
-    return dict(full=y, low=y_low, harm=y_harm, perc=y_perc)
+        if sr is None:
+            raise ValueError("원본 레이트 분석은 librosa 경로 사용")
+        if duration_hint is None:
+            try:
+                duration_hint = sf.info(path).duration
+            except RuntimeError:                   # 헤더로 길이를 모르는 형식
+                pass
+        y = decode_to_array(path, sr, duration_hint=duration_hint)
+    except (OSError, subprocess.CalledProcessError, ValueError) as e:
+        logger.warning("ffmpeg 파이프 디코딩 생략 (%s) – load_audio_safe 폴백", e)
+        return load_audio_safe(path, sr=sr)
+    if not np.isfinite(y).all():
+        y = np.nan_to_num(y, nan=0.0, posinf=0.0, neginf=0.0)
+    return y, sr
 
 # --------------------------------------------------------------- #
-# 3. 비트 트래킹
-def detect_beats(y, sr):
-    if importlib.util.find_spec("madmom") is not None:
-        from madmom.features.beats import RNNBeatProcessor, DBNBeatTrackingProcessor
-        act = RNNBeatProcessor()(y)
-        logger.info("✅ madmom beat detector 사용")
-        return DBNBeatTrackingProcessor(fps=100)(act)
-    o_env = librosa.onset.onset_strength(y=y, sr=sr)
-    _, beat_frames = librosa.beat.beat_track(onset_envelope=o_env, sr=sr)
-    return librosa.frames_to_time(beat_frames, sr=sr)
-
+# 2~7. 전처리 · 비트 · 온셋 · 스냅 · 레인 · 차트 → beatmap.analysis / beatmap.charting
 # --------------------------------------------------------------- #
-# 4. 온셋 환경·후보 추출
-def mixed_onset_env(views, sr, w_perc=0.7, w_harm=0.3):
-    o_perc = librosa.onset.onset_strength(y=views["perc"], sr=sr)
-    o_harm = librosa.onset.onset_strength(y=views["harm"], sr=sr)
-    o_perc = medfilt(o_perc, kernel_size=5)
-    o_harm = medfilt(o_harm, kernel_size=5)
-    n_perc = (o_perc - o_perc.min()) / (o_perc.ptp() + 1e-8)
-    n_harm = (o_harm - o_harm.min()) / (o_harm.ptp() + 1e-8)
-    return w_perc * n_perc + w_harm * n_harm
-
-def gather_times(beat_times, onset_env, sr):
-    onset_frames = librosa.onset.onset_detect(onset_envelope=onset_env,
-                                              sr=sr, backtrack=True)
-    onset_times = librosa.frames_to_time(onset_frames, sr=sr)
-
-    peak_frames = argrelextrema(onset_env, np.greater, order=4)[0]
-    peak_times = librosa.frames_to_time(peak_frames, sr=sr)
-
-    return np.unique(np.concatenate([beat_times, onset_times, peak_times]))
+# 미리보기 · 난이도
+def extract_preview_features(y, sr, progress: Optional[Callable[[str], None]] = None):
+    """미리보기용 저비용 특징 – PREVIEW_SR 로 내린 신호의 STFT 한 번
+    (madmom·HPSS 없이 librosa 비트 트래킹 + 전체 대역 온셋, 3분 곡 1초 미만)"""
+    report_progress(progress, "preview")
+    y_low = resample_audio(y, sr, PREVIEW_SR)
+    ctx = AnalysisContext(y_low, PREVIEW_SR, n_fft=1024, hop_length=PREVIEW_HOP)
+    beat_times = detect_beats(y_low, PREVIEW_SR, ctx=ctx, use_madmom=False)
+    raw_env = ctx.onset_env("full")
+    onset_env = medfilt(raw_env, kernel_size=5)
+    onset_env = (onset_env - onset_env.min()) / (onset_env.ptp() + 1e-8)
+    return BeatmapFeatures(
+        sr=PREVIEW_SR, hop_length=PREVIEW_HOP, duration=len(y) / sr,
+        tempo=estimate_tempo(raw_env, PREVIEW_SR, PREVIEW_HOP),
+        beat_times=np.asarray(beat_times, dtype=float),
+        onset_env=onset_env, centroid=ctx.centroid(),
+    )
 
-# --------------------------------------------------------------- #
-# 5. 스냅 / 병합 / 밀도제어
-def snap_to_grid(times, beat_times, bpm):
-    if len(beat_times) < 2 or bpm is None or np.isnan(bpm):
-        return times
-    beat_dur = 60.0 / bpm
-    snapped = []
-    for t in times:
-        idx = max(np.searchsorted(beat_times, t) - 1, 0)
-        base = beat_times[idx]
-        rel = t - base
-        best = t
-        best_diff = SNAP_TOL + 1
-        for div in SUBDIVISIONS:
-            cand = base + round(rel / (beat_dur / div)) * (beat_dur / div)
-            diff = abs(cand - t)
-            if diff < best_diff:
-                best, best_diff = cand, diff
-        snapped.append(best if best_diff <= SNAP_TOL else t)
-    return np.array(snapped)
-
-def merge_close(times, thr=CLOSE_EVENT_THR):
-    if len(times) == 0:
-        return times
-    merged = [times[0]]
-    for t in times[1:]:
-        if t - merged[-1] < thr:
-            merged[-1] = (merged[-1] + t) / 2.0
-        else:
-            merged.append(t)
-    return np.array(merged)
-
-def prune_density(times, song_dur, target_density=TARGET_DENSITY):
-    limit = max(1, int(song_dur * target_density))
-    if len(times) <= limit:
-        return times
-    idx = np.linspace(0, len(times) - 1, num=limit, dtype=int)
-    return times[idx]
-
-def adaptive_prune_density(times, onset_env, time_axis,
-                           target_density, window_sec=WINDOW_SEC,
-                           max_factor=MAX_FACTOR):
-    win_edges  = np.arange(0, time_axis[-1] + window_sec, window_sec)
-    center_e   = np.interp((win_edges[:-1] + win_edges[1:]) / 2,
-                           time_axis, onset_env)
-    energy_norm = (center_e - center_e.min()) / (center_e.ptp() + 1e-8)
-    local_fac   = 1 + energy_norm * (max_factor - 1)
-
-    pruned = []
-    for i in range(len(win_edges) - 1):
-        lo, hi    = win_edges[i], win_edges[i+1]
-        w_times   = times[(times >= lo) & (times < hi)]
-        limit     = int(window_sec * target_density * local_fac[i])
-        if len(w_times) > limit:
-            idx  = np.linspace(0, len(w_times) - 1, num=limit, dtype=int)
-            w_times = w_times[idx]
-        pruned.append(w_times)
-    return np.concatenate(pruned) if pruned else times
+def parse_difficulties(value: str) -> List[Difficulty]:
+    """"easy,hard" → [Difficulty.EASY, Difficulty.HARD] (빈 값이면 전체)"""
+    names = [v.strip().lower() for v in (value or "").split(",") if v.strip()]
+    if not names:
+        return list(Difficulty)
+    try:
+        return list(dict.fromkeys(Difficulty(n) for n in names))
+    except ValueError:
+        raise ValueError(f"알 수 없는 난이도: {value} "
+                         f"(가능: {', '.join(d.value for d in Difficulty)})")
+
+def chart_difficulty(feats: BeatmapFeatures, difficulty: Difficulty,
+                     num_lanes: int = NUM_LANES):
+    """같은 특징에서 난이도별 밀도로 차트만 다시 생성"""
+    beatmap = chart_from_features(feats, num_lanes, DIFFICULTY_DENSITY[difficulty])
+    beatmap["difficulty"] = difficulty.value
+    return beatmap
 
 # --------------------------------------------------------------- #
-# 6. 메인 비트맵
-def make_beatmap(y, sr, num_lanes: int = NUM_LANES):
-    views       = preprocess_views(y, sr)
-    beat_times  = detect_beats(views["full"], sr)
-    onset_env   = mixed_onset_env(views, sr)
-    all_times   = gather_times(beat_times, onset_env, sr)
-
-    # tempo --------------------------------------------------------
+# 8. 업로드(바이트 또는 스풀 파일) → 비트맵 (엔드포인트·작업 큐 공용)
+def _upload_digest(audio: Union[bytes, str]) -> str:
+    if isinstance(audio, (str, os.PathLike)):
+        return BeatmapCache.file_digest(audio, prefix="")
+    return BeatmapCache.bytes_digest(audio)
+
+def _upload_info(audio: Union[bytes, str]):
+    """(길이 초, 원본 sr) – 승인 비용 추정용. 헤더를 못 읽으면 크기로 길이를 넉넉히 잡는다"""
+    is_path = isinstance(audio, (str, os.PathLike))
     try:
-        bpm = float(librosa.beat.tempo(onset_envelope=onset_env, sr=sr)[0])
-    except Exception:
-        bpm = 120.0
-
-    snapped     = snap_to_grid(all_times, beat_times, bpm)
-    snapped     = merge_close(np.sort(snapped))          # 병합 thr 0.02 초
-    # song_dur    = len(y) / sr
-    # final_times = prune_density(snapped, song_dur)
-    final_times = adaptive_prune_density(snapped, onset_env,
-                                         librosa.frames_to_time(np.arange(len(onset_env)), sr=sr),
-                                         TARGET_DENSITY, WINDOW_SEC, MAX_FACTOR)
-
-    # ---------- Spectral Centroid (lane 후보 값) ----------
-    centroid        = librosa.feature.spectral_centroid(y=views["full"], sr=sr).flatten()
-    centroid_norm   = (centroid - centroid.min()) / (centroid.ptp() + 1e-8)
-    frame_times     = librosa.frames_to_time(np.arange(len(centroid_norm)), sr=sr)
-
-    # 강도 기준선 ---------------------------------------------------
-    strong_thr  = np.percentile(onset_env, 70)
-    time_axis   = librosa.frames_to_time(np.arange(len(onset_env)), sr=sr)
-
-    # 버킷별 라운드로빈 인덱스 초기화
-    rr_idx = {0: 0, 1: 0, 2: 0, 3: 0}     # 버킷 0~3
-
-    def bucket_to_lane(bucket: int, rr: int) -> int:
-        """버킷별 라운드로빈 → lane 매핑 표"""
-        mapping = {
-            0: [0, 1, 0, 1],   # 저음: 0↔1
-            1: [1, 0, 1, 0],   # 중저: 1↔0
-            2: [2, 3, 2, 3],   # 중고: 2↔3
-            3: [3, 2, 3, 2],   # 고음: 3↔2
-        }
-        return mapping[bucket][rr % len(mapping[bucket])]
-
-    events = []
-    for i, t in enumerate(final_times, start=1):
-        strength  = np.interp(t, time_axis, onset_env,
-                              left=onset_env[0], right=onset_env[-1])
-        is_beat   = any(abs(t - b) < BEAT_TOL for b in beat_times)
-        note_type = "strong" if (is_beat and strength >= strong_thr) else "normal"
-
-        # ---------- Lane 결정 ----------
-        if note_type == "strong":
-            lane = 1 if (i % 2) else 2          # strong은 1→2→1→2…
-        else:
-            c_val   = np.interp(t, frame_times, centroid_norm,
-                                left=centroid_norm[0], right=centroid_norm[-1])
-            c_sqrt_val = np.sqrt(c_val)  # 0~1 → 0~1 범위로 조정
-            bucket  = int(np.clip(np.floor(c_sqrt_val * 4), 0, 3))   # 0~3
-            lane    = bucket_to_lane(bucket, rr_idx[bucket])
-            rr_idx[bucket] += 1                 # 라운드로빈 진행
-
-        events.append({
-            "id"  : i,
-            "time": round(float(t), 4),
-            "type": note_type,
-            "lane": lane
-        })
-
-    return {"tempo": bpm, "lanes": num_lanes, "events": events}
+        info = sf.info(audio if is_path else io.BytesIO(audio))
+        return info.duration, info.samplerate
+    except RuntimeError:
+        size = os.path.getsize(audio) if is_path else len(audio)
+        return size / UPLOAD_MIN_BYTES_PER_SEC, RAW_PCM_SR
 
-# --------------------------------------------------------------- #
-# 7. FastAPI 엔드포인트
-@router.post("/")
-async def analyze(bg: BackgroundTasks, file: UploadFile = File(...)):
+def _decode_upload(audio: Union[bytes, str], duration: Optional[float] = None):
+    """스풀 파일은 ffmpeg 파이프로 float32 버퍼 하나에 바로 디코딩"""
+    if isinstance(audio, (str, os.PathLike)):
+        return load_audio_file(audio, duration_hint=duration)
+    return load_audio_safe(audio)
+
+def _admit_upload(audio: Union[bytes, str], client: Optional[str]):
+    """디코딩~저장 구간의 승인 예약 (client=None 이면 자리가 날 때까지 대기)"""
+    duration, native_sr = _upload_info(audio)
+    return duration, admission.admit(client, duration, ANALYSIS_SR or native_sr)
+
+def analyze_upload(audio: Union[bytes, str],
+                   progress: Optional[Callable[[str], None]] = None,
+                   title: Optional[str] = None,
+                   upload_digest: Optional[str] = None,
+                   client: Optional[str] = None,
+                   on_preview: Optional[Callable[[Dict], None]] = None,
+                   metadata: bool = False) -> Dict:
+    """audio: 업로드 바이트 또는 스풀 파일 경로
+    upload_digest: 스풀하면서 미리 계산한 업로드 해시 (없으면 여기서 계산)
+    client: 승인 제어 클라이언트 – 한도 초과면 AdmissionRejected (None 이면 대기)
+    on_preview: 주면 본 분석 전에 미리보기 비트맵을 저장하고 그 결과로 호출.
+                본 분석 결과는 같은 beatmap_id 로 덮어쓴다 (캐시에 있으면 미리보기 생략)
+    metadata: 결과에 "metadata" (rhythm_metadata) 추가 – 차트용 특징을 재사용
+              (캐시 적중인데 .feat 가 없으면 None – .feat 저장 전에 만든 항목이거나
+              FEATURE_VERSION 이 바뀐 경우. .feat 는 캐시 항목과 함께 지워진다)"""
+    with StageTimer(progress) as progress:
+        # ① 업로드 바이트 그대로 조회 – 디코딩 없이 바로 반환 (승인 대상 아님)
+        upload_digest = upload_digest or _upload_digest(audio)
+        cached = beatmap_cache.lookup_upload(upload_digest)
+        if cached:
+            result = {"beatmap_id": cached, "cached": True}
+            if metadata:
+                digest = beatmap_cache.resolve_upload(upload_digest)
+                feats = cached_features(digest) if digest else None
+                result["metadata"] = rhythm_metadata(feats) if feats else None
+            return result
+
+        # ② 디코딩된 신호 기준 조회 (같은 음원, 다른 컨테이너/태그)
+        duration, ticket = _admit_upload(audio, client)
+        with ticket:
+            report_progress(progress, "decode")
+            y, sr = _decode_upload(audio, duration)
+            audio_digest = BeatmapCache.audio_digest(y, sr)
+            cached = beatmap_cache.lookup(audio_digest)
+            if cached:
+                beatmap_cache.alias(upload_digest, audio_digest)
+                result = {"beatmap_id": cached, "cached": True}
+                if metadata:
+                    feats = cached_features(audio_digest)
+                    result["metadata"] = rhythm_metadata(feats) if feats else None
+                return result
+
+            feats = cached_features(audio_digest)
+            fname = None
+            if feats is None:
+                if on_preview is not None:
+                    # ③ 미리보기 먼저 저장 → 바로 응답, 본 분석은 같은 id 로 교체
+                    fname, preview_feats = save_preview(y, sr, title, progress)
+                    first = {"beatmap_id": fname, "cached": False, "preview": True}
+                    if metadata:
+                        first["metadata"] = rhythm_metadata(preview_feats)
+                    on_preview(first)
+                feats = compute_features(y, sr, audio_digest, progress)
+            result = chart_from_features(feats, progress=progress)
+        report_progress(progress, "write")
+        fname = save_beatmap(SAVE_DIR, result, beatmap_id=fname,
+                             meta=_catalog_meta(feats, title))
+        beatmap_cache.store(audio_digest, fname, upload_digest=upload_digest)
+        result = {"beatmap_id": fname, "cached": False}
+        if metadata:
+            result["metadata"] = rhythm_metadata(feats)
+        return result
+
+def save_preview(y, sr, title: Optional[str] = None,
+                 progress: Optional[Callable[[str], None]] = None):
+    """미리보기 비트맵 저장 (preview 표시 → 정적 서빙이 immutable 로 캐시하지 않음)
+    → (beatmap_id, 미리보기 특징)"""
+    feats = extract_preview_features(y, sr, progress)
+    fname = save_beatmap(SAVE_DIR, chart_from_features(feats), preview=True,
+                         meta=_catalog_meta(feats, title))
+    return fname, feats
+
+def rhythm_metadata(feats: BeatmapFeatures) -> Dict:
+    """차트용 특징의 온셋 엔벨로프 · 템포로 리듬 메타데이터 (STFT 없음, 수십 ms)
+    차트와 같은 온셋·비트·템포(같은 8 초 템포그램)를 쓰므로 비트맵과 어긋나지 않는다.
+
+    {"tempo", "tempo_confidence", "rhythm_complexity", "periodicity", "beats", "duration"}
+    """
+    meta = feature_engine.rhythm_summary(feats.onset_env, feats.sr,
+                                         feats.hop_length, tempo=feats.tempo)
+    meta.update(beats=len(feats.beat_times), duration=feats.duration)
+    return meta
+
+def analyze_upload_segments(path: str, upload_digest: str, title: Optional[str] = None,
+                            client: Optional[str] = None,
+                            segment_sec: Optional[float] = None) -> Iterator[Dict]:
+    """스풀 파일 → 시간순 비트맵 구간 (beatmap.streaming.iter_segments)
+    마지막 항목은 {"done": True, "beatmap_id", "cached"} – 이어 붙인 전체 비트맵
+
+    /api/analyze 결과(곡 전체 통계 차트)가 캐시에 있으면 그것을 잘라서 내고, 없으면
+    구간 차트(SpanCharter)를 흘려 만들어 <업로드 해시>/segments 키로 저장한다.
+    구간 차트는 곡 전체 차트와 노트가 다르므로 /api/analyze 캐시 키에는 넣지 않는다.
+    같은 신호의 곡 전체 차트가 이미 있으면 업로드 해시만 연결해 다음부터 그쪽을 쓴다.
+    스풀 파일은 끝나거나 중간에 닫힐 때(generator close) 지운다.
+    """
+    from beatmap.streaming import (SEGMENT_RESIDENT_SEC, SEGMENT_SEC, iter_segments,
+                                   join_segments)  # 순환 import 방지
+    segment_sec = segment_sec or SEGMENT_SEC
+    key = f"{upload_digest}/segments"
     try:
-        audio_bytes = await file.read()
-        y, sr = load_audio_safe(audio_bytes)
-        result = await run_in_threadpool(make_beatmap, y, sr)
+        duration, native_sr = _upload_info(path)
+        cached = beatmap_cache.lookup_upload(upload_digest) or beatmap_cache.lookup(key)
+        if cached:
+            yield from _cached_segments(cached, duration, segment_sec)
+            return
+
+        sr = ANALYSIS_SR or native_sr
+        hasher = AudioHasher(sr)
+
+        def chunks():
+            for chunk in stream_pcm(path, sr):
+                if not np.isfinite(chunk).all():        # load_audio_file 과 같은 정리
+                    chunk = np.nan_to_num(chunk, nan=0.0, posinf=0.0, neginf=0.0)
+                hasher.update(chunk)
+                yield chunk
 
-        os.makedirs(SAVE_DIR, exist_ok=True)
-        fname = f"{uuid.uuid4()}.json"
-        with open(os.path.join(SAVE_DIR, fname), "w", encoding="utf-8") as fp:
-            json.dump(result, fp, ensure_ascii=False)
+        segments = []
+        with admission.admit(client, duration, sr, resident_sec=SEGMENT_RESIDENT_SEC):
+            for seg in iter_segments(chunks(), sr, segment_sec):
+                segments.append(seg)
+                yield seg
+        if not segments:
+            raise ValueError("디코딩된 오디오가 비어 있습니다")
+        # 같은 신호를 다른 업로드로 이미 /api/analyze 했으면 업로드 해시를 그 항목에 연결
+        beatmap_cache.alias(upload_digest, hasher.hexdigest())
+        duration = segments[-1]["end"]
+        AUDIO_SECONDS.labels("upload").inc(duration)
+        fname = save_beatmap(SAVE_DIR, join_segments(segments),
+                             meta={"source": "upload", "title": title, "duration": duration})
+        beatmap_cache.store(key, fname)
+        yield {"done": True, "beatmap_id": fname, "cached": False}
+    finally:
+        os.remove(path)
 
-        return {"beatmap_id": fname}
+def _cached_segments(beatmap_id: str, duration: float, segment_sec: float) -> Iterator[Dict]:
+    from beatmap.streaming import slice_segments  # 순환 import 방지
+    with open(os.path.join(SAVE_DIR, beatmap_id), "r", encoding="utf-8") as fp:
+        beatmap = json.load(fp)
+    yield from slice_segments(beatmap, duration, segment_sec)
+    yield {"done": True, "beatmap_id": beatmap_id, "cached": True}
+
+def _catalog_meta(feats: BeatmapFeatures, title: Optional[str]) -> Dict:
+    """업로드 비트맵의 카탈로그 항목 (제목 = 업로드 파일명)"""
+    return {"source": "upload", "title": title, "duration": feats.duration}
+
+def _feature_path(digest: str) -> str:
+    return feature_path(SAVE_DIR, digest)
+
+def save_features(digest: str, feats: BeatmapFeatures):
+    """특징을 SAVE_DIR/<digest>.feat 로 저장 (비트맵 JSON 옆, 재차트용)"""
+    meta = {"version": FEATURE_VERSION, "sr": feats.sr, "hop_length": feats.hop_length,
+            "duration": feats.duration, "tempo": feats.tempo,
+            "frame_rate": feats.frame_rate}
+    write_features(_feature_path(digest), meta,
+                   {"beat_times": feats.beat_times, "onset_env": feats.onset_env,
+                    "centroid": feats.centroid})
+
+def load_features(digest: str, mmap: bool = True) -> Optional[BeatmapFeatures]:
+    """저장된 특징 로드 – 없거나 FEATURE_VERSION 이 다르면 None"""
+    try:
+        meta, arrays = read_features(_feature_path(digest), mmap=mmap)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("feature 파일 손상 (%s): %s", digest, e)
+        return None
+    if meta.get("version") != FEATURE_VERSION:
+        return None
+    return BeatmapFeatures(sr=meta["sr"], hop_length=meta["hop_length"],
+                           duration=meta["duration"], tempo=meta["tempo"], **arrays)
+
+def cached_features(digest: str) -> Optional[BeatmapFeatures]:
+    """메모리 LRU → .feat 파일 (둘 다 없으면 None)"""
+    key = f"{digest}:f{FEATURE_VERSION}"
+    feats = feature_cache.get(key)
+    if feats is None:
+        feats = load_features(digest)
+        if feats is not None:
+            feature_cache.put(key, feats)
+    return feats
+
+def compute_features(y, sr, digest: str,
+                     progress: Optional[Callable[[str], None]] = None,
+                     source: str = "upload") -> BeatmapFeatures:
+    """엔진 추출 → .feat 저장 · LRU 등록"""
+    feats = analysis_engine.extract_features(y, sr, progress=progress)
+    AUDIO_SECONDS.labels(source).inc(feats.duration)
+    save_features(digest, feats)
+    feature_cache.put(f"{digest}:f{FEATURE_VERSION}", feats)
+    return feats
+
+def get_features(y, sr, digest: str,
+                 progress: Optional[Callable[[str], None]] = None,
+                 source: str = "upload") -> BeatmapFeatures:
+    """메모리 LRU → .feat 파일 → 엔진 추출(후 저장) 순으로 특징 확보"""
+    feats = cached_features(digest)
+    if feats is None:
+        feats = compute_features(y, sr, digest, progress, source)
+    return feats
+
+def analyze_difficulties(audio: Union[bytes, str], difficulties: List[Difficulty],
+                         progress: Optional[Callable[[str], None]] = None,
+                         title: Optional[str] = None,
+                         upload_digest: Optional[str] = None,
+                         client: Optional[str] = None) -> Dict:
+    """분석 1회 → 난이도별 비트맵. 캐시 키는 "<해시>/<난이도>" 로 난이도마다 따로"""
+    with StageTimer(progress) as progress:
+        upload_digest = upload_digest or _upload_digest(audio)
+        found = {d: beatmap_cache.lookup_upload(f"{upload_digest}/{d.value}")
+                 for d in difficulties}
+        if all(found.values()):
+            return {"beatmaps": {d.value: b for d, b in found.items()}, "cached": True}
+
+        duration, ticket = _admit_upload(audio, client)
+        with ticket:
+            report_progress(progress, "decode")
+            y, sr = _decode_upload(audio, duration)
+            audio_digest = BeatmapCache.audio_digest(y, sr)
+            feats = None
+            cached = True
+            for d in difficulties:
+                if found[d]:
+                    continue
+                found[d] = beatmap_cache.lookup(f"{audio_digest}/{d.value}")
+                if found[d]:
+                    beatmap_cache.alias(f"{upload_digest}/{d.value}",
+                                        f"{audio_digest}/{d.value}")
+                    continue
+                if feats is None:
+                    feats = get_features(y, sr, audio_digest, progress)
+                    report_progress(progress, "lanes")
+                cached = False
+                fname = save_beatmap(SAVE_DIR, chart_difficulty(feats, d),
+                                     meta=_catalog_meta(feats, title))
+                beatmap_cache.store(f"{audio_digest}/{d.value}", fname,
+                                    upload_digest=f"{upload_digest}/{d.value}")
+                found[d] = fname
+        report_progress(progress, "write")
+        return {"beatmaps": {d.value: b for d, b in found.items()}, "cached": cached}
+
+# --------------------------------------------------------------- #
+# 9. FastAPI 엔드포인트
+# 미리보기로 먼저 응답한 뒤에도 이어지는 본 분석 (작업 참조 유지용)
+_refining = set()
+
+def _analysis_done(task: asyncio.Future, path: str, first: asyncio.Future):
+    """분석 스레드가 끝나면 스풀 파일 정리 – 미리보기 응답 뒤의 실패는 로그로만"""
+    _refining.discard(task)
+    os.remove(path)
+    if first.done() and not task.cancelled() and task.exception() is not None:
+        logger.error("미리보기 이후 본 분석 실패 (%s): %s",
+                     first.result()["beatmap_id"], task.exception())
+
+@router.post("/", dependencies=[Depends(check_content_length)])
+async def analyze(request: Request, bg: BackgroundTasks, file: UploadFile = File(...),
+                  client: str = Depends(admission_client), preview: bool = False,
+                  metadata: bool = False):
+    """preview=true 면 미리보기 비트맵(librosa 비트 + 저해상도 온셋)을 먼저 돌려주고
+    본 분석은 계속 진행해 같은 beatmap_id 로 교체한다.
+    교체 전까지 /beatmaps 응답은 no-cache + X-Beatmap-Preview: 1
+
+    metadata=true 면 응답에 "metadata" – 템포·템포 신뢰도·리듬 복잡도·주기성.
+    차트에 쓴 온셋 엔벨로프를 재사용하므로 추가 비용은 수십 ms
+    (미리보기 응답은 미리보기 특징 기준)
+    """
+    # 업로드는 메모리에 올리지 않고 조각 단위로 디스크에 스풀 (크기 초과 시 413)
+    # 분석 한도(전체·클라이언트별)를 넘으면 429 + Retry-After
+    path, upload_digest = await spool_upload(file)
+    loop = asyncio.get_running_loop()
+    first = loop.create_future()
+
+    def on_preview(result: Dict):
+        loop.call_soon_threadsafe(lambda: first.done() or first.set_result(result))
+
+    # 스풀 파일은 분석 스레드가 끝날 때 지운다 (응답·연결 종료와 무관)
+    task = asyncio.ensure_future(run_in_threadpool(
+        profiled, analyze_upload, path, label="analyze",
+        force=request.headers.get(PROFILE_HEADER) == "1", title=file.filename,
+        upload_digest=upload_digest, client=client,
+        on_preview=on_preview if preview else None, metadata=metadata))
+    _refining.add(task)
+    task.add_done_callback(lambda t: _analysis_done(t, path, first))
+    try:
+        await asyncio.wait({first, task}, return_when=asyncio.FIRST_COMPLETED)
+        if first.done():
+            return first.result()
+        return task.result()
+    except AdmissionRejected as e:
+        raise too_busy(e)
     except Exception as e:
         logger.exception("분석 실패")
         raise HTTPException(400, f"분석 실패: {e}")
+
+@router.post("/difficulties", dependencies=[Depends(check_content_length)])
+async def analyze_multi(request: Request, file: UploadFile = File(...),
+                        difficulties: str = Form(""),
+                        client: str = Depends(admission_client)):
+    """한 번 분석해 easy/normal/hard/expert 비트맵을 함께 생성
+
+    difficulties: 쉼표 구분 (예: "easy,hard"), 비우면 전체.
+    두 번째 난이도부터는 추출해 둔 특징으로 차트만 만들므로 수 ms.
+    """
+    try:
+        levels = parse_difficulties(difficulties)
+    except ValueError as e:
+        raise HTTPException(422, str(e))
+    path, upload_digest = await spool_upload(file)
+    try:
+        return await run_in_threadpool(
+            profiled, analyze_difficulties, path, levels, label="difficulties",
+            force=request.headers.get(PROFILE_HEADER) == "1",
+            key=lambda r: next(iter(r["beatmaps"].values()), None), title=file.filename,
+            upload_digest=upload_digest, client=client)
+    except AdmissionRejected as e:
+        raise too_busy(e)
+    except Exception as e:
+        logger.exception("다중 난이도 분석 실패")
+        raise HTTPException(400, f"분석 실패: {e}")
+    finally:
+        os.remove(path)
+
+def _ndjson(first: Dict, rest: Iterator[Dict]) -> Iterator[str]:
+    """구간을 한 줄씩 – 도중 실패는 {"error"} 줄로 알리고 끝낸다"""
+    try:
+        for item in chain([first], rest):
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+    except Exception as e:
+        logger.exception("구간 분석 실패")
+        yield json.dumps({"error": f"분석 실패: {e}"}, ensure_ascii=False) + "\n"
+
+@router.post("/segments", dependencies=[Depends(check_content_length)])
+async def analyze_segments(file: UploadFile = File(...),
+                           client: str = Depends(admission_client),
+                           segment: Optional[float] = None):
+    """구간 비트맵을 완성되는 대로 NDJSON 으로 전송 (한 줄 = 한 구간)
+
+    {"segment", "start", "end", "tempo", "lanes", "events", "last"} … 마지막 줄은
+    {"done": true, "beatmap_id", "cached"}. 첫 구간(segment 초 + 분석 여백)만 분석되면
+    응답이 시작되므로 클라이언트는 뒤 구간을 기다리지 않고 바로 재생할 수 있다.
+    segment: 구간 길이 (기본 SEGMENT_SEC) – 노트는 구간 길이와 무관하다 (구간 차트라
+             /api/analyze 의 곡 전체 차트와는 조금 다르다)
+    """
+    if segment is not None and not 5 <= segment <= 120:
+        raise HTTPException(422, "segment 는 5~120 초")
+    path, upload_digest = await spool_upload(file)
+    segments = analyze_upload_segments(path, upload_digest, file.filename, client, segment)
+    try:
+        # 첫 구간까지는 여기서 기다린다 → 한도 초과·디코딩 실패는 스트림 전에 429/400
+        first = await run_in_threadpool(next, segments)
+    except AdmissionRejected as e:
+        raise too_busy(e)
+    except Exception as e:
+        logger.exception("구간 분석 실패")
+        raise HTTPException(400, f"분석 실패: {e}")
+    return StreamingResponse(_ndjson(first, segments), media_type="application/x-ndjson")
@@ -2,21 +2,37 @@
 """통합 오디오 유틸리티 라우터
 
 1. /download  : YouTube URL → mp3 저장 → wav 변환 경로 반환 (기존 로직 그대로)
-2. /generate  : YouTube URL → mp3 저장 → wav 변환 → 비트맵(JSON) 생성 → wav 자동 삭제
+2. /generate  : YouTube URL → mp3 저장 → ffmpeg PCM 파이프 디코딩 → 비트맵(JSON) 생성
+   (영상 ID 인덱스로 이미 받은 mp3·비트맵은 재사용,
+    STREAM_MIN_SEC 보다 긴 곡은 블록 단위 스트리밍 분석으로 메모리 상한 유지)
 
 mp3는 남겨 두어 클라이언트에서 직접 스트리밍/다운로드에 사용하도록 합니다.
+
+다운로드·트랜스코딩은 이벤트 루프 위에서 비동기로 돈다 (yt-dlp 는 스레드, ffmpeg ·
+ffprobe 는 asyncio 서브프로세스). 다운로드 중에도 다른 요청은 그대로 응답하고,
+스레드풀은 분석에만 쓴다. 작업 큐 워커 스레드는 anyio.from_thread 로 같은 경로를 쓴다.
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Form
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Form, Request
 from fastapi.concurrency import run_in_threadpool
 
 from audio.youtube_downloader import YoutubeDownloader
-from audio.converters import mp3_to_wav
-from api.analyze import load_audio_safe, make_beatmap
+from audio.converters import mp3_to_wav_async
+from audio.dedup import SingleFlight, VideoIndex, extract_video_id
+from api.admission import AdmissionRejected, admission, admission_client, too_busy
+from api.analyze import (ANALYSIS_SR, beatmap_cache, chart_from_features,
+                         get_features, load_audio_file, load_features,
+                         save_features)
+from beatmap.cache import BeatmapCache
+from beatmap.engine import analysis_engine
+from beatmap.store import save_beatmap
+from beatmap.streaming import RESIDENT_SEC
+from monitoring.metrics import AUDIO_SECONDS, StageTimer
+from monitoring.profiler import PROFILE_HEADER, profiled
 
 import os
-import uuid
-import json
+from typing import Awaitable, Callable, Dict, Optional
 
 router = APIRouter()
 
@@ -27,19 +43,155 @@ router = APIRouter()
 SAVE_MP3_DIR = os.getenv("AUDIO_DIR", "/tmp/audio_mp3")
 SAVE_JSON_DIR = os.getenv("BEATMAP_DIR", "/tmp/audio_json")
 
+# 허용 최대 길이 / 이 길이부터는 전체 디코딩 대신 스트리밍 분석
+MAX_VIDEO_SEC = int(os.getenv("MAX_VIDEO_SEC", "3600"))
+STREAM_MIN_SEC = float(os.getenv("STREAM_MIN_SEC", "300"))
+# 길이를 모를 때 mp3 크기로 길이 추정 (192 kbps)
+MP3_BYTES_PER_SEC = 192_000 // 8
+# 다른 클라이언트 한도로 거절된 공유 분석을 내 클라이언트로 다시 시도하는 횟수 · 첫 대기(초, 매번 두 배)
+FLIGHT_RETRIES = int(os.getenv("FLIGHT_RETRIES", "3"))
+FLIGHT_RETRY_BACKOFF_SEC = float(os.getenv("FLIGHT_RETRY_BACKOFF_SEC", "0.1"))
+
 os.makedirs(SAVE_MP3_DIR, exist_ok=True)
 os.makedirs(SAVE_JSON_DIR, exist_ok=True)
 
+# 영상 ID → mp3 / beatmap 인덱스, 동시 요청 합치기
+video_index = VideoIndex(SAVE_JSON_DIR)
+_flights = SingleFlight()
+
+
+async def _download_async(url: str, video_id: Optional[str]) -> Dict:
+    """인덱스에 mp3 가 남아 있으면 _probe·다운로드 없이 재사용"""
+    meta = await run_in_threadpool(video_index.find_mp3, video_id) if video_id else None
+    if meta is None:
+        meta = await YoutubeDownloader(output_dir=SAVE_MP3_DIR,
+                                       max_duration=MAX_VIDEO_SEC).download_mp3_async(url)
+        await anyio.to_thread.run_sync(video_index.put, meta["id"], meta)
+    return meta
+
+
+async def _fetch_mp3(url: str, video_id: Optional[str]) -> Dict:
+    """같은 영상의 동시 다운로드를 하나로 합친다 (/download · /generate · 작업 큐 공용)"""
+    return await _flights.do(f"mp3:{video_id or url}",
+                             lambda: _download_async(url, video_id))
+
+
+async def _shared_analysis(key: str, run: Callable[[], Awaitable], client: str):
+    """같은 키의 분석을 공유한다 (진행 중이면 합류)
+
+    합류한 분석이 다른 클라이언트의 한도로 거절되면 새 flight(이번엔 내 client)로
+    FLIGHT_RETRIES 번까지 물러났다가 다시 시도하고, 그래도 안 되면 429.
+    """
+    delay = FLIGHT_RETRY_BACKOFF_SEC
+    for attempt in range(FLIGHT_RETRIES + 1):
+        try:
+            return await _flights.do(key, run)
+        except AdmissionRejected as e:
+            if e.client is None or e.client == client or attempt == FLIGHT_RETRIES:
+                raise too_busy(e)
+        except Exception as e:
+            raise HTTPException(400, f"beatmap 생성 실패: {e}")
+        await anyio.sleep(delay)
+        delay *= 2
+
+
+def cancel_downloads():
+    """종료 시 진행 중인 다운로드·생성 취소 – ffmpeg 는 kill, yt-dlp 스레드는 다음 훅에서 중단"""
+    _flights.cancel_all()
+
+
+def _download(url: str, video_id: Optional[str]) -> Dict:
+    """워커 스레드(run_in_threadpool) 용 – 비동기 다운로드를 이벤트 루프에 맡기고 기다림"""
+    return anyio.from_thread.run(_fetch_mp3, url, video_id)
+
+
+def generate_from_url(url: str,
+                      progress: Optional[Callable[[str], None]] = None) -> Dict:
+    """작업 큐용 진입점 – 영상 ID 를 직접 추출해 _generate 호출"""
+    return profiled(_generate, url, extract_video_id(url), progress, label="job:generate")
+
+
+def _generate(url: str, video_id: Optional[str],
+              progress: Optional[Callable[[str], None]] = None,
+              meta: Optional[Dict] = None, client: Optional[str] = None) -> Dict:
+    """mp3 확보 → 디코딩 → 비트맵 생성/재사용 (스레드풀에서 실행)
+
+    meta: 호출 측이 이미 비동기로 받아 둔 mp3 메타 (없으면 여기서 다운로드)
+    client: 승인 제어 클라이언트 – 한도 초과면 AdmissionRejected (None 이면 대기)
+    """
+    with StageTimer(progress) as progress:
+        progress("download")
+        params = beatmap_cache.fingerprint()
+        entry = video_index.find_beatmap(video_id, params, SAVE_JSON_DIR) if video_id else None
+        if entry is None:
+            meta = meta or _download(url, video_id)
+            entry = video_index.find_beatmap(meta["id"], params, SAVE_JSON_DIR)
+        if entry is not None:
+            meta = entry["meta"]
+            return {
+                "beatmap_id": entry["beatmap_id"],
+                "mp3_path": meta["path"],
+                "title": meta["title"],
+                "duration": meta["duration"],
+                "cached": True,
+            }
+
+        # 비용 = _probe 가 알려 준 길이 × 분석 sr (스트리밍은 블록 하나만 메모리에 올라감)
+        duration = meta.get("duration") or os.path.getsize(meta["path"]) / MP3_BYTES_PER_SEC
+        sr = ANALYSIS_SR or meta.get("sample_rate") or 44100
+        stream = duration > STREAM_MIN_SEC
+        resident = RESIDENT_SEC if stream else None
+        with admission.admit(client, duration, sr, resident_sec=resident):
+            progress("decode")
+            if stream:
+                # 긴 곡: 전체 파형을 올리지 않고 블록 단위로 분석 (키는 mp3 파일 해시)
+                digest = BeatmapCache.file_digest(meta["path"])
+                beatmap_id = beatmap_cache.lookup(digest)
+                feats = None if beatmap_id else load_features(digest)
+                if beatmap_id is None and feats is None:
+                    feats = analysis_engine.extract_features_stream(meta["path"], sr,
+                                                                    progress=progress)
+                    AUDIO_SECONDS.labels("youtube").inc(feats.duration)
+                    save_features(digest, feats)
+            else:
+                # mp3 → ffmpeg 파이프 → numpy (임시 wav 없음, mp3는 보존)
+                y, sr = load_audio_file(meta["path"], sr=ANALYSIS_SR,
+                                        duration_hint=meta.get("duration"))
+                # 다른 영상이라도 음원이 같으면 비트맵 재사용
+                digest = BeatmapCache.audio_digest(y, sr)
+                beatmap_id = beatmap_cache.lookup(digest)
+                feats = None if beatmap_id else get_features(y, sr, digest, progress,
+                                                             source="youtube")
+
+        cached = beatmap_id is not None
+        if not cached:
+            beatmap = chart_from_features(feats, progress=progress)
+            progress("write")
+            beatmap_id = save_beatmap(SAVE_JSON_DIR, beatmap, meta={
+                "source": "youtube", "title": meta.get("title"), "source_url": url,
+                "video_id": meta.get("id"), "duration": feats.duration})
+            beatmap_cache.store(digest, beatmap_id)
+
+        video_index.put(meta["id"], meta, beatmap_id, params)
+        return {
+            "beatmap_id": beatmap_id,
+            "mp3_path": meta["path"],
+            "title": meta["title"],
+            "duration": meta["duration"],
+            "cached": cached,
+        }
+
+
 # ──────────────────────────────────────────────────────────
 # 1) 단순 다운로드 + 변환 엔드포인트 (기존)
 # ──────────────────────────────────────────────────────────
 @router.post("/download", tags=["audio"], summary="YouTube → mp3 & wav 다운로드")
 async def download_audio(url: str):
     """유튜브 링크를 받아 mp3 다운로드 후 wav 변환 경로를 반환합니다."""
-    dl = YoutubeDownloader(output_dir=SAVE_MP3_DIR)
+    video_id = extract_video_id(url)
     try:
-        meta = dl.download_mp3(url)
-        wav_path = mp3_to_wav(meta["path"])
+        meta = await _fetch_mp3(url, video_id)
+        wav_path = await mp3_to_wav_async(meta["path"])
 
         return {
             "mp3_path": meta["path"],
@@ -55,48 +207,27 @@ async def download_audio(url: str):
 # 2) 통합 한방 엔드포인트
 # ──────────────────────────────────────────────────────────
 @router.post("/generate", tags=["audio"], summary="YouTube → mp3 & beatmap(JSON) 생성")
-async def generate_beatmap(background_tasks: BackgroundTasks, url: str = Form(...)):
+async def generate_beatmap(request: Request, url: str = Form(...),
+                           client: str = Depends(admission_client)):
     """유튜브 링크 하나만으로 mp3 + 비트맵(json)까지 생성한다.
 
-    • mp3는 SAVE_MP3_DIR 에 남겨두고, wav 는 비트맵 생성 후 삭제한다.
+    • mp3는 SAVE_MP3_DIR 에 남겨두고, 디코딩은 임시 wav 없이 메모리로 바로 한다.
+    • 같은 영상 ID 의 동시 요청은 한 번의 다운로드·분석 결과를 공유한다.
+      분석은 처음 요청한 클라이언트 몫으로 승인되므로, 그 클라이언트의 한도 때문에
+      실패한 공유 분석에 합류했던 요청은 자기 클라이언트로 (횟수 제한) 다시 시도한다.
+    • 분석 한도(전체·클라이언트별)를 넘으면 429 + Retry-After.
+      (받아 둔 mp3 는 인덱스에 남으므로 재시도 때는 다운로드 없이 바로 분석)
     """
-    dl = YoutubeDownloader(output_dir=SAVE_MP3_DIR)
-    wav_path = None  # 예외 처리용 초기화
-
-    try:
-        # 1) mp3 다운로드
-        meta = dl.download_mp3(url)
-
-        # 2) wav 변환
-        wav_path = mp3_to_wav(meta["path"])
-
-        # 3) wav → numpy → beatmap
-        with open(wav_path, "rb") as f:
-            y, sr = load_audio_safe(f.read())
-
-        beatmap = await run_in_threadpool(make_beatmap, y, sr)
-
-        # 4) JSON 저장
-        beatmap_id = f"{uuid.uuid4()}.json"
-        json_path = os.path.join(SAVE_JSON_DIR, beatmap_id)
-        with open(json_path, "w", encoding="utf-8") as fp:
-            json.dump(beatmap, fp, ensure_ascii=False)
-
-        # 5) 백그라운드 작업으로 wav 삭제 (mp3는 보존)
-        background_tasks.add_task(os.remove, wav_path)
-
-        return {
-            "beatmap_id": beatmap_id,
-            "mp3_path": meta["path"],
-            "title": meta["title"],
-            "duration": meta["duration"],
-        }
-
-    except Exception as e:
-        # wav 가 남아 있으면 정리
-        if wav_path and os.path.exists(wav_path):
-            try:
-                os.remove(wav_path)
-            except Exception:
-                pass
-        raise HTTPException(400, f"beatmap 생성 실패: {e}")
+    video_id = extract_video_id(url)
+    force = request.headers.get(PROFILE_HEADER) == "1"
+
+    async def run():
+        # 이미 만든 비트맵이 없을 때만 다운로드 – 루프 위에서 기다리고 스레드는 분석에만
+        meta = None
+        if not (video_id and await run_in_threadpool(
+                video_index.find_beatmap, video_id, beatmap_cache.fingerprint(), SAVE_JSON_DIR)):
+            meta = await _fetch_mp3(url, video_id)
+        return await run_in_threadpool(profiled, _generate, url, video_id, meta=meta,
+                                       client=client, label="generate", force=force)
+
+    return await _shared_analysis(f"beatmap:{video_id or url}", run, client)
@@ -0,0 +1,143 @@
+# backend/ai-service/src/api/beatmaps.py
+"""비트맵 카탈로그 · 조회 (형식 협상 + 시간 구간 읽기)
+
+GET /?limit=&cursor=&min_tempo=&max_tempo=&min_duration=&max_duration=&since=&until=
+- 카탈로그(beatmap/catalog.py) 최신순 목록. 다음 페이지는 응답의 next_cursor 로 요청
+
+GET /{beatmap_id}?start=&end=
+- Accept: application/x-beatmap 이면 컬럼형 바이너리(.bmap), 그 외에는 JSON
+- start/end(초)가 있으면 [start, end) 구간 노트만 – 클라이언트는 첫 구간만 받아
+  재생을 시작하고 나머지를 이어서 받을 수 있다
+- /beatmaps 정적 마운트(JSON 전체)는 기존 클라이언트용으로 그대로 둔다
+- 구간 없는 요청은 api/static_files.py 와 같은 방식(ETag · immutable · 압축본)으로 전송
+"""
+
+import json
+import os
+import re
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
+
+from api.static_files import CachedFileResponse
+from beatmap import binary
+from beatmap.catalog import catalog_for
+from beatmap.store import binary_path
+
+router = APIRouter()
+
+SAVE_DIR = os.getenv("BEATMAP_DIR", "/tmp/audio_json")
+JSON_TYPE = "application/json"
+_ID_RE = re.compile(r"^[0-9A-Za-z_-]+(\.json)?$")
+
+
+def _quality(accept: str, media_type: str) -> float:
+    """Accept 헤더에서 media_type 의 q 값 (가장 구체적인 항목 기준)"""
+    main = media_type.split("/")[0]
+    best, best_rank = 0.0, -1
+    for item in accept.split(","):
+        parts = [p.strip() for p in item.split(";")]
+        rank = {media_type: 2, f"{main}/*": 1, "*/*": 0}.get(parts[0].lower())
+        if rank is None or rank < best_rank:
+            continue
+        q = 1.0
+        for p in parts[1:]:
+            if p.startswith("q="):
+                try:
+                    q = float(p[2:])
+                except ValueError:
+                    q = 0.0
+        best, best_rank = q, rank
+    return best
+
+
+def wants_binary(accept: Optional[str]) -> bool:
+    """바이너리를 JSON 보다 명시적으로 선호할 때만 True (동률이면 JSON)"""
+    if not accept:
+        return False
+    return _quality(accept, binary.MEDIA_TYPE) > _quality(accept, JSON_TYPE)
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    """ISO 8601 날짜/시각 → epoch 초 (시간대 없으면 UTC)"""
+    if value is None:
+        return None
+    try:
+        value = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(400, f"잘못된 날짜: {value}")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _item(row: dict) -> dict:
+    return {
+        **{k: v for k, v in row.items() if k not in ("created", "updated")},
+        "url": f"/beatmaps/{row['beatmap_id']}",
+        "created": datetime.fromtimestamp(row["created"], timezone.utc).isoformat(),
+    }
+
+
+@router.get("/", summary="비트맵 카탈로그 (최신순, 키셋 페이지네이션)")
+def list_beatmaps(limit: int = Query(50, ge=1, le=200),
+                  cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor"),
+                  min_tempo: Optional[float] = Query(None, ge=0),
+                  max_tempo: Optional[float] = Query(None, ge=0),
+                  min_duration: Optional[float] = Query(None, ge=0, description="초"),
+                  max_duration: Optional[float] = Query(None, ge=0, description="초"),
+                  since: Optional[str] = Query(None, description="생성 시각 이후 (ISO 8601)"),
+                  until: Optional[str] = Query(None, description="생성 시각 이전 (ISO 8601)"),
+                  source: Optional[str] = Query(None, description="upload | youtube | batch"),
+                  difficulty: Optional[str] = None):
+    try:
+        rows, next_cursor = catalog_for(SAVE_DIR).query(
+            limit, cursor, min_tempo, max_tempo, min_duration, max_duration,
+            _timestamp(since), _timestamp(until), source, difficulty)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return {"items": [_item(r) for r in rows], "next_cursor": next_cursor}
+
+
+@router.get("/{beatmap_id}", summary="비트맵 조회 (JSON / 바이너리, 시간 구간)")
+def get_beatmap(request: Request, beatmap_id: str,
+                start: Optional[float] = Query(None, ge=0, description="시작(초, 포함)"),
+                end: Optional[float] = Query(None, ge=0, description="끝(초, 제외)")):
+    if not _ID_RE.match(beatmap_id):
+        raise HTTPException(404, "비트맵을 찾을 수 없습니다")
+    if not beatmap_id.endswith(".json"):
+        beatmap_id += ".json"
+    json_path = os.path.join(SAVE_DIR, beatmap_id)
+    if not os.path.isfile(json_path):
+        raise HTTPException(404, "비트맵을 찾을 수 없습니다")
+
+    as_binary = wants_binary(request.headers.get("accept"))
+    headers = {"Vary": "Accept"}
+    ranged = start is not None or end is not None
+    bmap_path = binary_path(SAVE_DIR, beatmap_id)
+
+    if not ranged:
+        # 전체 파일은 정적 서빙과 같은 ETag · 캐시 헤더 · 사전 압축본 사용
+        if as_binary and bmap_path:
+            return CachedFileResponse(bmap_path, os.stat(bmap_path), request.scope,
+                                      headers=headers, media_type=binary.MEDIA_TYPE)
+        return CachedFileResponse(json_path, os.stat(json_path), request.scope,
+                                  headers=headers, media_type=JSON_TYPE, precompress=True)
+
+    if bmap_path:
+        with open(bmap_path, "rb") as fp:
+            beatmap = binary.read(fp, start, end)      # 구간 청크만 seek 해 읽는다
+    else:
+        # 바이너리로 표현할 수 없는 예전 JSON – 전체를 읽어 거른다
+        with open(json_path, "r", encoding="utf-8") as fp:
+            beatmap = json.load(fp)
+        lo = -float("inf") if start is None else start
+        hi = float("inf") if end is None else end
+        beatmap["events"] = [e for e in beatmap.get("events", [])
+                             if lo <= float(e.get("time", 0)) < hi]
+    if as_binary and bmap_path:
+        return Response(binary.encode(beatmap), media_type=binary.MEDIA_TYPE,
+                        headers=headers)
+    return JSONResponse(beatmap, headers=headers)
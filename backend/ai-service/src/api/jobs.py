@@ -0,0 +1,110 @@
+# backend/ai-service/src/api/jobs.py
+"""비동기 비트맵 생성 작업 API
+
+POST /analyze   : 오디오 업로드 → job_id 즉시 반환
+POST /generate  : YouTube URL   → job_id 즉시 반환
+GET  /{job_id}  : 상태(queued/running/done/failed), 진행 단계, 결과
+
+대기열이 JOB_MAX_QUEUE 를 넘으면 503 + Retry-After 로 거절한다.
+"""
+
+import logging
+import os
+from typing import Callable, Dict
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+
+from api.analyze import analyze_upload
+from api.audio_routes import generate_from_url
+from api.uploads import check_content_length, spool_upload
+from jobs.backends import QueueFullError, create_backend
+from jobs.manager import JobManager
+from monitoring.profiler import profiled
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+JOB_BACKEND = os.getenv("JOB_BACKEND", "memory")          # memory | redis
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_QUEUE = int(os.getenv("JOB_MAX_QUEUE", "32"))
+JOB_RETRY_AFTER = int(os.getenv("JOB_RETRY_AFTER", "10"))
+JOB_TTL_SEC = int(os.getenv("JOB_TTL_SEC", str(24 * 3600)))   # 마지막 갱신 후 상태 보관 시간
+# redis 백엔드로 여러 인스턴스를 돌릴 땐 공유 볼륨이어야 한다
+JOB_SPOOL_DIR = os.getenv("JOB_SPOOL_DIR", "/tmp/audio_jobs")
+
+
+# ──────────────────────────────────────────────────────────
+# 작업 핸들러 (워커 스레드에서 실행)
+# ──────────────────────────────────────────────────────────
+def _run_analyze(payload: Dict, progress: Callable[[str], None]) -> Dict:
+    path = payload["path"]
+    try:
+        return profiled(analyze_upload, path, progress=progress, label="job:analyze",
+                        title=payload.get("filename"), upload_digest=payload.get("digest"))
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _run_generate(payload: Dict, progress: Callable[[str], None]) -> Dict:
+    return generate_from_url(payload["url"], progress=progress)
+
+
+job_manager = JobManager(
+    create_backend(JOB_BACKEND, JOB_MAX_QUEUE,
+                   host=os.getenv("REDIS_HOST", "localhost"),
+                   port=int(os.getenv("REDIS_PORT", "6379")), ttl_sec=JOB_TTL_SEC),
+    handlers={"analyze": _run_analyze, "generate": _run_generate},
+    workers=JOB_WORKERS,
+)
+
+
+def _public(job: Dict) -> Dict:
+    """내부 payload(스풀 경로 등)는 응답에서 제외"""
+    return {k: v for k, v in job.items() if k != "payload"}
+
+
+async def _submit(kind: str, payload: Dict) -> Dict:
+    try:
+        job = await job_manager.submit(kind, payload)
+    except QueueFullError as e:
+        raise HTTPException(503, f"작업 대기열 초과: {e}",
+                            headers={"Retry-After": str(JOB_RETRY_AFTER)})
+    return _public(job)
+
+
+# ──────────────────────────────────────────────────────────
+# 엔드포인트
+# ──────────────────────────────────────────────────────────
+@router.post("/analyze", summary="오디오 업로드 → 비트맵 작업 등록",
+             dependencies=[Depends(check_content_length)])
+async def submit_analyze(file: UploadFile = File(...)):
+    # 큐가 찬 상태면 업로드를 디스크에 쓰기 전에 거절
+    if await job_manager.backend.depth() >= JOB_MAX_QUEUE:
+        raise HTTPException(503, "작업 대기열 초과",
+                            headers={"Retry-After": str(JOB_RETRY_AFTER)})
+    path, digest = await spool_upload(file, JOB_SPOOL_DIR)
+    try:
+        return await _submit("analyze", {"path": path, "filename": file.filename,
+                                         "digest": digest})
+    except HTTPException:
+        os.remove(path)
+        raise
+
+
+@router.post("/generate", summary="YouTube URL → 비트맵 작업 등록")
+async def submit_generate(url: str = Form(...)):
+    return await _submit("generate", {"url": url})
+
+
+@router.get("/stats", summary="대기열 상태")
+async def job_stats():
+    return await job_manager.stats()
+
+
+@router.get("/{job_id}", summary="작업 상태 조회")
+async def get_job(job_id: str):
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(404, "작업을 찾을 수 없습니다")
+    return _public(job)
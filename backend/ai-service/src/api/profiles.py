@@ -0,0 +1,27 @@
+# backend/ai-service/src/api/profiles.py
+"""저장된 분석 프로파일 조회
+
+GET /              : 최근 프로파일 목록 (beatmap_id, 소요 시간, 모드, 강제 여부)
+GET /{profile_id}  : 프로파일 텍스트 다운로드 (folded stack 또는 pstats)
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from monitoring.profiler import list_profiles, profile_path
+
+router = APIRouter()
+
+
+@router.get("/", summary="최근 프로파일 목록")
+def get_profiles(limit: int = Query(50, ge=1, le=500)):
+    return {"profiles": list_profiles(limit)}
+
+
+@router.get("/{profile_id}", summary="프로파일 다운로드")
+def download_profile(profile_id: str):
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(404, "프로파일을 찾을 수 없습니다")
+    return FileResponse(path, media_type="text/plain; charset=utf-8",
+                        filename=f"{profile_id}.txt")
@@ -0,0 +1,263 @@
+# backend/ai-service/src/api/static_files.py
+"""캐시 친화적인 정적 파일 서빙 (/audio, /beatmaps)
+
+- ETag       : 실제로 보내는 바이트(인코딩별)의 blake2b – (경로, mtime, 크기) 로 메모
+- 304        : If-None-Match(목록·약한 비교) / If-Modified-Since
+- 캐시 헤더  : UUID 이름(비트맵 · .bmap)은 1년 immutable, 그 외 STATIC_MAX_AGE + 재검증.
+               UUID 비트맵은 내용이 바뀌지 않는다 (재차트는 새 id 로 저장 – cli.rechart).
+               단 본 분석으로 교체될 미리보기 비트맵은 no-cache + X-Beatmap-Preview: 1
+- 압축       : 저장 시 만든 <name>.br / <name>.gz 를 Accept-Encoding 에 맞춰 그대로 전송
+               (요청마다 압축하지 않음). 압축본이 없는 예전 JSON 은 첫 요청 때 만든다
+- Range      : 단일 byte range 는 206 으로 그 구간만 전송 (mp3 탐색), If-Range 지원.
+               여러 구간 요청은 무시하고 200 전체 전송
+해시·stat·압축 같은 블로킹 I/O 는 전부 스레드에서 처리한다.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate
+from mimetypes import guess_type
+from typing import Dict, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+from beatmap.store import ENCODINGS, compress_variants, is_preview
+
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", "3600"))
+IMMUTABLE = "public, max-age=31536000, immutable"
+PREVIEW_HEADER = "x-beatmap-preview"
+COMPRESSIBLE = (".json",)
+MIN_COMPRESS_BYTES = 1024
+
+_UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\.",
+                      re.IGNORECASE)
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+# ──────────────────────────────────────────────────────────────
+# ETag (내용 해시 메모)
+# ──────────────────────────────────────────────────────────────
+class _DigestMemo:
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._memo: "OrderedDict[Tuple, str]" = OrderedDict()
+
+    def etag(self, path: str, st: os.stat_result) -> str:
+        key = (path, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as fp:
+            for chunk in iter(lambda: fp.read(1 << 20), b""):
+                h.update(chunk)
+        tag = f'"{h.hexdigest()}"'
+        with self._lock:
+            self._memo[key] = tag
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+        return tag
+
+
+_digests = _DigestMemo()
+
+
+# ──────────────────────────────────────────────────────────────
+# 헤더 파싱
+# ──────────────────────────────────────────────────────────────
+def _accepted_encodings(value: str) -> Dict[str, float]:
+    out = {}
+    for item in value.split(","):
+        parts = [p.strip() for p in item.split(";")]
+        if not parts[0]:
+            continue
+        q = 1.0
+        for p in parts[1:]:
+            if p.startswith("q="):
+                try:
+                    q = float(p[2:])
+                except ValueError:
+                    q = 0.0
+        out[parts[0].lower()] = q
+    return out
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    tags = [t.strip() for t in header.split(",")]
+    return any(t == etag or t == f"W/{etag}" for t in tags)
+
+
+def _parse_range(value: str, size: int) -> Optional[Tuple[int, int]]:
+    """단일 "bytes=a-b" → (start, end 포함). 형식 밖이면 None(무시), 만족 불가면 (size, size)"""
+    m = _RANGE_RE.match(value.strip())
+    if not m or m.group(1) == m.group(2) == "":
+        return None
+    first, last = m.group(1), m.group(2)
+    if first and last and int(last) < int(first):
+        return None
+    if first == "":                              # bytes=-N (마지막 N 바이트)
+        n = int(last)
+        return (max(size - n, 0), size - 1) if n > 0 and size else (size, size)
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        return (size, size)
+    return start, end
+
+
+# ──────────────────────────────────────────────────────────────
+# 응답
+# ──────────────────────────────────────────────────────────────
+class _RangeFileResponse(FileResponse):
+    """파일의 [start, end] 구간만 보내는 206 응답"""
+
+    def __init__(self, path: str, start: int, end: int, size: int, **kwargs):
+        super().__init__(path, status_code=206, **kwargs)
+        self.start, self.end = start, end
+        self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+        self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code,
+                    "headers": self.raw_headers})
+        if self.send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        remaining = self.end - self.start + 1
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk,
+                            "more_body": remaining > 0})
+        if remaining > 0:                        # 전송 중 파일이 줄어든 경우
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class CachedFileResponse(Response):
+    """요청 헤더를 보고 변형(압축본 / 구간 / 304)을 골라 보내는 파일 응답"""
+
+    def __init__(self, path: str, stat_result: os.stat_result, scope: Scope,
+                 headers: Optional[Dict[str, str]] = None, media_type: Optional[str] = None,
+                 precompress: bool = False):
+        self.path = path
+        self.stat_result = stat_result
+        self.request_headers = Headers(scope=scope)
+        self.method = scope["method"]
+        self.extra_headers = {k.lower(): v for k, v in (headers or {}).items()}
+        self.media_type = media_type or guess_type(path)[0] or "text/plain"
+        self.precompress = precompress
+        self.status_code = 200
+        self.background = None
+        self.init_headers({})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        response = await anyio.to_thread.run_sync(self._select)
+        await response(scope, receive, send)
+
+    def _cache_control(self) -> Dict[str, str]:
+        name = os.path.basename(self.path)
+        if _UUID_RE.match(name):
+            if is_preview(os.path.dirname(self.path), name):
+                # 곧 같은 이름으로 교체 – 매번 ETag 로 재검증
+                return {"cache-control": "no-cache", PREVIEW_HEADER: "1"}
+            return {"cache-control": IMMUTABLE}
+        return {"cache-control": f"public, max-age={STATIC_MAX_AGE}, must-revalidate"}
+
+    def _variant(self) -> Tuple[str, os.stat_result, Optional[str]]:
+        """Accept-Encoding 에 맞는 압축본 (없으면 원본)"""
+        if not self.path.endswith(COMPRESSIBLE) or "range" in self.request_headers:
+            return self.path, self.stat_result, None
+        accepted = _accepted_encodings(self.request_headers.get("accept-encoding", ""))
+        if not accepted:
+            return self.path, self.stat_result, None
+        if self.precompress and self.stat_result.st_size >= MIN_COMPRESS_BYTES \
+                and not os.path.exists(self.path + ENCODINGS["gzip"]):
+            with open(self.path, "rb") as fp:
+                compress_variants(self.path, fp.read())
+        for encoding, suffix in ENCODINGS.items():
+            if accepted.get(encoding, accepted.get("*", 0.0)) <= 0:
+                continue
+            try:
+                st = os.stat(self.path + suffix)
+            except FileNotFoundError:
+                continue
+            # 원본보다 오래된 압축본(덮어쓰기 도중)은 쓰지 않는다
+            if st.st_mtime_ns >= self.stat_result.st_mtime_ns:
+                return self.path + suffix, st, encoding
+        return self.path, self.stat_result, None
+
+    def _select(self) -> Response:
+        path, st, encoding = self._variant()
+        headers = {
+            "etag": _digests.etag(path, st),
+            "last-modified": formatdate(st.st_mtime, usegmt=True),
+            **self._cache_control(),
+            **self.extra_headers,
+        }
+        if self.path.endswith(COMPRESSIBLE):
+            vary = [v for v in [headers.get("vary"), "Accept-Encoding"] if v]
+            headers["vary"] = ", ".join(vary)
+        else:
+            headers["accept-ranges"] = "bytes"
+        if encoding:
+            headers["content-encoding"] = encoding
+
+        if self._not_modified(headers):
+            return NotModifiedResponse(Headers(headers))
+
+        byte_range = self._range(headers, st.st_size)
+        if byte_range is not None:
+            start, end = byte_range
+            if start >= st.st_size:
+                return Response(status_code=416, headers={
+                    "content-range": f"bytes */{st.st_size}", **headers})
+            return _RangeFileResponse(path, start, end, st.st_size, headers=headers,
+                                      media_type=self.media_type, stat_result=st,
+                                      method=self.method)
+        return FileResponse(path, headers=headers, media_type=self.media_type,
+                            stat_result=st, method=self.method)
+
+    def _not_modified(self, headers: Dict[str, str]) -> bool:
+        if_none_match = self.request_headers.get("if-none-match")
+        if if_none_match is not None:
+            return _etag_matches(if_none_match, headers["etag"])
+        since = parsedate(self.request_headers.get("if-modified-since", ""))
+        return since is not None and since >= parsedate(headers["last-modified"])
+
+    def _range(self, headers: Dict[str, str], size: int) -> Optional[Tuple[int, int]]:
+        value = self.request_headers.get("range")
+        if value is None or "accept-ranges" not in headers or self.method not in ("GET", "HEAD"):
+            return None
+        if_range = self.request_headers.get("if-range")
+        if if_range is not None and if_range.strip() not in (headers["etag"],
+                                                            headers["last-modified"]):
+            return None                          # 그 사이 바뀐 파일 → 전체 전송
+        return _parse_range(value, size)
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles + ETag · 캐시 헤더 · 사전 압축본 · Range"""
+
+    def __init__(self, *args, precompress: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.precompress = precompress
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope,
+                      status_code: int = 200) -> Response:
+        return CachedFileResponse(str(full_path), stat_result, scope,
+                                  precompress=self.precompress)
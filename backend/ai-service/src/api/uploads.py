@@ -0,0 +1,61 @@
+# backend/ai-service/src/api/uploads.py
+"""업로드 스풀링
+
+UploadFile 을 await file.read() 로 통째로 올리지 않고 UPLOAD_CHUNK 단위로 디스크에 쓰면서
+업로드 해시(BeatmapCache.bytes_digest 와 같은 값)를 함께 계산한다.
+MAX_UPLOAD_MB 를 넘으면 413. Content-Length 가 있으면 본문을 받기 전에 먼저 거절한다.
+"""
+
+import os
+import uuid
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from beatmap.cache import BeatmapCache
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "100")) * 1024 * 1024
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR", "/tmp/audio_uploads")
+UPLOAD_CHUNK = 1 << 20
+# multipart 경계·헤더 여유분
+_MULTIPART_OVERHEAD = 64 * 1024
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(413, f"업로드 크기 제한 초과 ({max_bytes // (1024 * 1024)} MB)")
+
+
+async def check_content_length(request: Request):
+    """라우트 의존성 – 선언된 본문 크기가 제한을 넘으면 multipart 파싱 전에 413"""
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > MAX_UPLOAD_BYTES + _MULTIPART_OVERHEAD:
+        raise _too_large(MAX_UPLOAD_BYTES)
+
+
+async def spool_upload(file: UploadFile, spool_dir: Optional[str] = None,
+                       max_bytes: int = MAX_UPLOAD_BYTES) -> Tuple[str, str]:
+    """업로드를 spool_dir 에 조각 단위로 저장 → (경로, 업로드 해시). 호출 측이 파일 삭제"""
+    spool_dir = spool_dir or UPLOAD_SPOOL_DIR
+    os.makedirs(spool_dir, exist_ok=True)
+    path = os.path.join(spool_dir, f"{uuid.uuid4().hex}.upload")
+    hasher = BeatmapCache.upload_hasher()
+    size = 0
+    try:
+        with open(path, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _too_large(max_bytes)
+                hasher.update(chunk)
+                await run_in_threadpool(out.write, chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    if size == 0:
+        os.remove(path)
+        raise HTTPException(400, "빈 업로드입니다")
+    return path, hasher.hexdigest()
@@ -1,6 +1,21 @@
 # backend/ai-service/src/audio/converters.py
+import asyncio
+import os
 import subprocess
+import tempfile
+import uuid
 from pathlib import Path
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+_READ_CHUNK = 1 << 20   # 1 MiB
+
+# 비동기 트랜스코딩 동시 실행 수 / 1회 제한 시간 (이벤트 루프는 막지 않음)
+TRANSCODE_CONCURRENCY = int(os.getenv("TRANSCODE_CONCURRENCY", "2"))
+TRANSCODE_TIMEOUT = float(os.getenv("TRANSCODE_TIMEOUT", "300"))
+_transcode_slots = asyncio.Semaphore(TRANSCODE_CONCURRENCY)
+
 
 def mp3_to_wav(mp3_path: str) -> str:
     mp3_path = Path(mp3_path)
@@ -8,3 +23,113 @@ def mp3_to_wav(mp3_path: str) -> str:
     cmd = ["ffmpeg", "-y", "-i", str(mp3_path), "-ar", "44100", "-ac", "2", str(wav_path)]
     subprocess.run(cmd, check=True)
     return str(wav_path)
+
+
+async def run_async(cmd: List[str], timeout: Optional[float] = None) -> bytes:
+    """asyncio 서브프로세스로 실행해 stdout 반환 – 타임아웃·취소되면 프로세스를 죽인다"""
+    proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE,
+                                                stderr=asyncio.subprocess.PIPE)
+    try:
+        out, err = await asyncio.wait_for(proc.communicate(), timeout)
+    except BaseException:                        # CancelledError · TimeoutError
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd,
+                                            stderr=err.decode(errors="replace"))
+    return out
+
+
+async def transcode_async(src: str, dst: str, args: List[str],
+                          timeout: Optional[float] = TRANSCODE_TIMEOUT) -> str:
+    """ffmpeg src → dst (args 에 -f 포함). 임시 파일에 쓴 뒤 교체, 동시 실행 수 제한"""
+    tmp_path = f"{dst}.{uuid.uuid4().hex}.tmp"
+    async with _transcode_slots:
+        try:
+            await run_async(["ffmpeg", "-v", "error", "-nostdin", "-y", "-i", str(src),
+                             *args, tmp_path], timeout)
+            os.replace(tmp_path, dst)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return str(dst)
+
+
+async def mp3_to_wav_async(mp3_path: str) -> str:
+    """mp3_to_wav 의 비동기판 (이벤트 루프를 막지 않음)"""
+    wav_path = Path(mp3_path).with_suffix(".wav")
+    return await transcode_async(mp3_path, str(wav_path),
+                                 ["-ar", "44100", "-ac", "2", "-f", "wav"])
+
+
+def decode_to_array(path: str, sr: int, duration_hint: Optional[float] = None) -> np.ndarray:
+    """ffmpeg 로 디코딩한 mono float32 PCM 을 파이프로 바로 읽어 NumPy 배열로 반환
+
+    임시 wav 없이, 출력은 미리 잡아 둔 버퍼 하나에 readinto 로 채운다.
+    (duration_hint 가 있으면 재할당 없이 한 번에 맞는 크기로 시작)
+    """
+    cmd = [
+        "ffmpeg", "-v", "error", "-nostdin", "-i", str(path),
+        "-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(int(sr)),
+        "pipe:1",
+    ]
+    est = int((duration_hint or 60) * sr * 4) + _READ_CHUNK
+    buf = bytearray(est)
+    n = 0
+    with tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err)
+        try:
+            while True:
+                if n + _READ_CHUNK > len(buf):
+                    buf.extend(bytes(len(buf)))          # 2배로 확장
+                got = proc.stdout.readinto(memoryview(buf)[n:n + _READ_CHUNK])
+                if not got:
+                    break
+                n += got
+        finally:
+            proc.stdout.close()
+            ret = proc.wait()
+        if ret != 0:
+            err.seek(0)
+            raise subprocess.CalledProcessError(ret, cmd, stderr=err.read().decode(errors="replace"))
+
+    n -= n % 4
+    if n == 0:
+        raise ValueError(f"디코딩 결과가 비어 있습니다: {path}")
+    del buf[n:]                                          # 남는 여유분 반환 (복사 없음)
+    return np.frombuffer(buf, dtype=np.float32)
+
+
+def stream_pcm(path: str, sr: int, chunk_sec: float = 10.0) -> Iterator[np.ndarray]:
+    """ffmpeg mono float32 PCM 을 chunk_sec 단위 배열로 순차 반환 (전체를 메모리에 올리지 않음)"""
+    cmd = [
+        "ffmpeg", "-v", "error", "-nostdin", "-i", str(path),
+        "-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(int(sr)),
+        "pipe:1",
+    ]
+    chunk_bytes = int(chunk_sec * sr) * 4
+    with tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err)
+        finished = False
+        try:
+            rest = b""
+            while True:
+                data = proc.stdout.read(chunk_bytes)
+                if not data:
+                    break
+                data = rest + data
+                usable = len(data) - len(data) % 4
+                rest = data[usable:]
+                if usable:
+                    yield np.frombuffer(data[:usable], dtype=np.float32)
+            finished = True
+        finally:
+            if not finished and proc.poll() is None:
+                proc.kill()                              # 소비자가 중간에 멈춘 경우
+            proc.stdout.close()
+            ret = proc.wait()
+        if ret != 0:
+            err.seek(0)
+            raise subprocess.CalledProcessError(ret, cmd, stderr=err.read().decode(errors="replace"))
@@ -0,0 +1,180 @@
+# backend/ai-service/src/audio/dedup.py
+"""YouTube 영상 ID 기반 중복 제거
+
+- extract_video_id : URL 에서 영상 ID 추출 (_probe 네트워크 왕복 없이)
+- VideoIndex       : 영상 ID → mp3 경로·메타·beatmap_id 영구 인덱스 (SQLite)
+- SingleFlight     : 같은 키의 동시 요청을 하나의 작업으로 합침
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from typing import Awaitable, Callable, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger(__name__)
+
+DB_NAME = ".video_index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id   TEXT PRIMARY KEY,
+    meta       TEXT NOT NULL,
+    beatmap_id TEXT,
+    params     TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_videos_beatmap ON videos(beatmap_id);
+"""
+
+# beatmap_id 없이 put 하면(다운로드만) 기존 비트맵 연결을 유지
+_UPSERT = """
+INSERT INTO videos (video_id, meta, beatmap_id, params) VALUES (?, ?, ?, ?)
+ON CONFLICT(video_id) DO UPDATE SET
+    meta       = excluded.meta,
+    params     = CASE WHEN excluded.beatmap_id IS NULL THEN params ELSE excluded.params END,
+    beatmap_id = COALESCE(excluded.beatmap_id, beatmap_id)
+"""
+
+_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+
+def extract_video_id(url: str) -> Optional[str]:
+    """youtube.com/watch?v=, youtu.be/, /shorts/, /embed/ 형태에서 ID 추출"""
+    try:
+        parsed = urlparse(url.strip())
+    except ValueError:
+        return None
+    host = (parsed.hostname or "").lower()
+    if host.startswith("www.") or host.startswith("m."):
+        host = host.split(".", 1)[1]
+
+    candidate = None
+    if host == "youtu.be":
+        candidate = parsed.path.lstrip("/").split("/")[0]
+    elif host in ("youtube.com", "music.youtube.com"):
+        if parsed.path == "/watch":
+            candidate = parse_qs(parsed.query).get("v", [None])[0]
+        else:
+            parts = parsed.path.strip("/").split("/")
+            if len(parts) >= 2 and parts[0] in ("shorts", "embed", "live", "v"):
+                candidate = parts[1]
+    return candidate if candidate and _ID_RE.match(candidate) else None
+
+
+class VideoIndex:
+    """영상 ID → {meta, beatmap_id, params} 인덱스 (SQLite, 행 단위 upsert)
+
+    <index_dir>/.video_index.sqlite3 (WAL). 항목 하나씩 읽고 쓰므로 여러 워커·프로세스가
+    동시에 put 해도 서로의 항목을 덮어쓰지 않는다. 스레드마다 연결을 따로 연다.
+    """
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        self.path = os.path.join(index_dir, DB_NAME)
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    def get(self, video_id: str) -> Optional[Dict]:
+        row = self._conn().execute(
+            "SELECT meta, beatmap_id, params FROM videos WHERE video_id = ?",
+            (video_id,)).fetchone()
+        if row is None:
+            return None
+        entry = {"meta": json.loads(row["meta"])}
+        if row["beatmap_id"]:
+            entry.update(beatmap_id=row["beatmap_id"], params=row["params"])
+        return entry
+
+    def find_mp3(self, video_id: str) -> Optional[Dict]:
+        """mp3 가 디스크에 남아 있으면 저장된 메타 반환"""
+        entry = self.get(video_id)
+        if entry and os.path.exists(entry["meta"]["path"]):
+            return entry["meta"]
+        return None
+
+    def find_beatmap(self, video_id: str, params: str, beatmap_dir: str) -> Optional[Dict]:
+        """현재 파라미터 지문으로 만든 비트맵이 남아 있으면 항목 반환"""
+        entry = self.get(video_id)
+        if not entry or not entry.get("beatmap_id") or entry.get("params") != params:
+            return None
+        if not os.path.exists(os.path.join(beatmap_dir, entry["beatmap_id"])):
+            return None
+        if not os.path.exists(entry["meta"]["path"]):
+            return None
+        return entry
+
+    def put(self, video_id: str, meta: Dict, beatmap_id: Optional[str] = None,
+            params: Optional[str] = None):
+        """meta 는 덮어쓰고, beatmap_id 를 안 주면 기존 비트맵 연결은 유지"""
+        self._conn().execute(_UPSERT, (video_id, json.dumps(meta, ensure_ascii=False),
+                                       beatmap_id, params))
+
+    def repoint(self, moved: Dict[str, str], params: str) -> int:
+        """재차트로 새 id 에 저장된 비트맵(옛 id → 새 id)을 가리키도록 항목을 옮긴다"""
+        conn = self._conn()
+        n = 0
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for old_id, new_id in moved.items():
+                n += conn.execute(
+                    "UPDATE videos SET beatmap_id = ?, params = ? WHERE beatmap_id = ?",
+                    (new_id, params, old_id)).rowcount
+        return n
+
+    # ──────────────────────────────────────────────────────────────
+    # INTERNAL
+    # ──────────────────────────────────────────────────────────────
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(self.index_dir, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._ready:
+            with self._init_lock:
+                if not self._ready:
+                    conn.executescript(_SCHEMA)
+                    self._ready = True
+        return conn
+
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 코루틴을 하나의 Task 로 합친다.
+
+    작업은 별도 Task 로 돌기 때문에 먼저 온 요청이 끊겨도(취소) 뒤따르는
+    요청들은 같은 결과를 계속 기다릴 수 있다.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._done(k, t))
+        else:
+            logger.info("[single-flight] %s 진행 중인 작업에 합류", key)
+        return await asyncio.shield(task)
+
+    def cancel_all(self):
+        """진행 중인 작업을 모두 취소 (종료 시)"""
+        for task in list(self._inflight.values()):
+            task.cancel()
+
+    def _done(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()   # 기다리던 요청이 모두 끊겨도 경고가 남지 않도록 소비
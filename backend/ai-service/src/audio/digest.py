@@ -0,0 +1,66 @@
+# backend/ai-service/src/audio/digest.py
+"""오디오 콘텐츠 해시 (캐시 키 · 신호별 메모 키)
+
+- audio_digest : 디코딩된 신호 + 샘플레이트 (AudioHasher 로 청크 단위 계산 가능)
+- bytes_digest : 업로드 원본 바이트 (upload_hasher 로 조각 단위 계산 가능)
+- file_digest  : 파일 바이트 (조각 단위로 읽음)
+beatmap.cache · models.beat_tracker · api 가 같은 값을 쓰도록 한곳에 둔다.
+"""
+
+import hashlib
+
+import numpy as np
+
+
+class AudioHasher:
+    """audio_digest 와 같은 값을 청크 단위로 계산 (스트리밍 분석용)
+
+    신호 바이트를 먼저, 길이를 아는 마지막에 샘플레이트·dtype·모양을 넣는다.
+    """
+
+    def __init__(self, sr: int):
+        self.sr = int(sr)
+        self.samples = 0
+        self.dtype = np.dtype(np.float32)
+        self._h = hashlib.blake2b(digest_size=20)
+
+    def update(self, chunk: np.ndarray):
+        chunk = np.ascontiguousarray(chunk)
+        self.dtype = chunk.dtype
+        self.samples += len(chunk)
+        self._h.update(memoryview(chunk).cast("B"))
+
+    def hexdigest(self) -> str:
+        h = self._h.copy()
+        h.update(f"{self.sr}:{self.dtype.str}:{(self.samples,)}".encode())
+        return h.hexdigest()
+
+
+def audio_digest(y: np.ndarray, sr: int) -> str:
+    """디코딩된 신호 + 샘플레이트 해시"""
+    h = AudioHasher(sr)
+    h.update(y)
+    return h.hexdigest()
+
+
+def upload_hasher():
+    """bytes_digest 와 같은 값을 조각 단위로 계산할 해시 객체 (업로드 스풀용)"""
+    return hashlib.blake2b(digest_size=20)
+
+
+def bytes_digest(data: bytes) -> str:
+    """업로드 원본 바이트 해시 (디코딩 전 빠른 조회용)"""
+    h = upload_hasher()
+    h.update(data)
+    return h.hexdigest()
+
+
+def file_digest(path: str, chunk: int = 1 << 20, prefix: str = "file-") -> str:
+    """파일 바이트 해시 (조각 단위로 읽어 메모리 일정) – 스트리밍 분석 곡의 키
+
+    prefix="" 면 같은 바이트의 bytes_digest 와 같은 값 (스풀된 업로드용)"""
+    h = upload_hasher()
+    with open(path, "rb") as fp:
+        for block in iter(lambda: fp.read(chunk), b""):
+            h.update(block)
+    return prefix + h.hexdigest()
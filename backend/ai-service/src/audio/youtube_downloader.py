@@ -1,19 +1,51 @@
 # backend/ai-service/src/audio/youtube_downloader.py
 
 import os, tempfile, logging, shutil
+import asyncio
+import json
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Awaitable, Dict, Optional
 
 import yt_dlp      # requirements.txt 에 이미 존재
 import subprocess  # ffprobe 정보 추출용
+from yt_dlp.utils import DownloadCancelled
+
+from audio.converters import run_async, transcode_async, TRANSCODE_TIMEOUT
+from monitoring.metrics import DOWNLOAD_BYTES, STAGE_LATENCY
 
 logger = logging.getLogger(__name__)
 
+# ──────────────────────────────────────────────────────────────
+# 비동기 경로 설정 (download_mp3_async)
+# yt-dlp 는 동기 라이브러리라 별도 스레드에서, ffmpeg/ffprobe 는 asyncio 서브프로세스로
+# ──────────────────────────────────────────────────────────────
+DOWNLOAD_CONCURRENCY = int(os.getenv("DOWNLOAD_CONCURRENCY", "4"))
+YT_PROBE_TIMEOUT = float(os.getenv("YT_PROBE_TIMEOUT", "30"))
+YT_DOWNLOAD_TIMEOUT = float(os.getenv("YT_DOWNLOAD_TIMEOUT", "600"))
+FFPROBE_TIMEOUT = float(os.getenv("FFPROBE_TIMEOUT", "30"))
+MP3_ARGS = ["-vn", "-codec:a", "libmp3lame", "-b:a", "192k", "-f", "mp3"]
+
+_download_slots = asyncio.Semaphore(DOWNLOAD_CONCURRENCY)
+
+
+async def _stage(name: str, aw: Awaitable, timeout: float):
+    """단계별 지연 기록 + 제한 시간 (초과 시 TimeoutError, 취소는 그대로 전파)"""
+    t0 = time.perf_counter()
+    try:
+        return await asyncio.wait_for(aw, timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"{name} 시간 초과 ({timeout:g}s)") from None
+    finally:
+        STAGE_LATENCY.labels(name).observe(time.perf_counter() - t0)
+
 
 class YoutubeDownloader:
-    def __init__(self, output_dir: Optional[str] = None):
+    def __init__(self, output_dir: Optional[str] = None, max_duration: int = 300):
         # output_dir 지정 안 하면 컨테이너 /tmp 하위 자동 생성
         self.output_dir = Path(output_dir or tempfile.mkdtemp())
+        self.max_duration = max_duration
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
     # ──────────────────────────────────────────────────────────────
@@ -33,9 +65,10 @@ class YoutubeDownloader:
         }
         """
         try:
-            info = self._probe(url)                         # ① 메타만 먼저
-            if info["duration"] > 300:
-                raise ValueError("5 분 초과 영상입니다")
+            with STAGE_LATENCY.labels("yt_probe").time():
+                info = self._probe(url)                     # ① 메타만 먼저
+            if info["duration"] > self.max_duration:
+                raise ValueError(f"{self.max_duration // 60} 분 초과 영상입니다")
 
             outtmpl = str(self.output_dir / "%(id)s.%(ext)s")
             ydl_opts = {
@@ -49,25 +82,81 @@ class YoutubeDownloader:
                 }],
             }
 
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:         # ② 다운로드
-                ydl.download([url])
-
-            # 실제 저장된 파일 경로 찾기
+            # 같은 영상 mp3 가 이미 있으면 다운로드·트랜스코딩 생략
             mp3_path = self._find_downloaded(info["id"], "mp3")
+            if mp3_path is None:
+                with STAGE_LATENCY.labels("yt_download").time(), \
+                        yt_dlp.YoutubeDL(ydl_opts) as ydl:  # ② 다운로드
+                    ydl.download([url])
+
+                # 실제 저장된 파일 경로 찾기
+                mp3_path = self._find_downloaded(info["id"], "mp3")
+                if mp3_path:
+                    DOWNLOAD_BYTES.inc(mp3_path.stat().st_size)
+            else:
+                logger.info(f"[YT-DL] '{info['id']}' mp3 재사용")
             if not mp3_path:
                 raise RuntimeError("다운로드된 mp3 파일을 찾지 못했습니다.")
 
             # ③ 최종 메타 구성
-            meta = {
-                "path": str(mp3_path),
-                **info,                                     # title, uploader, duration, id …
-                "file_size": mp3_path.stat().st_size,
-                "sample_rate": self._ffprobe(mp3_path, "sample_rate", 44100, int),
-                "channels":    self._ffprobe(mp3_path, "channels", 2, int),
-            }
+            meta = self._meta(info, mp3_path,
+                              self._ffprobe(mp3_path, "sample_rate", 44100, int),
+                              self._ffprobe(mp3_path, "channels", 2, int))
+            logger.info(f"[YT-DL] '{meta['title']}' mp3 저장 완료")
+            return meta
+
+        except Exception as e:
+            logger.error(f"[YT-DL] {e}")
+            raise
+
+    async def download_mp3_async(self, url: str) -> Dict:
+        """download_mp3 의 비동기판 – 이벤트 루프를 막지 않고 단계마다 취소 가능
+
+        ① probe    : yt-dlp 메타 조회 (스레드)
+        ② download : yt-dlp 원본 오디오 그대로 받기 (스레드, 진행 훅에서 취소 확인)
+        ③ transcode: ffmpeg → mp3 (asyncio 서브프로세스, 취소 시 kill)
+        ④ ffprobe  : sample_rate · channels (asyncio 서브프로세스)
+        ①② 는 DOWNLOAD_CONCURRENCY, ③ 은 TRANSCODE_CONCURRENCY 로 동시 실행 수 제한.
+        """
+        try:
+            mp3_path = None
+            async with _download_slots:
+                info = await _stage("yt_probe", asyncio.to_thread(self._probe, url),
+                                    YT_PROBE_TIMEOUT)
+                if info["duration"] > self.max_duration:
+                    raise ValueError(f"{self.max_duration // 60} 분 초과 영상입니다")
+                mp3_path = self._find_downloaded(info["id"], "mp3")
+                if mp3_path is None:
+                    cancel = threading.Event()
+                    try:
+                        src = await _stage(
+                            "yt_download",
+                            asyncio.to_thread(self._fetch_source, url, info["id"], cancel),
+                            YT_DOWNLOAD_TIMEOUT)
+                    except BaseException:
+                        cancel.set()                # 스레드는 다음 진행 훅에서 중단
+                        raise
+
+            if mp3_path is None:
+                mp3_path = self.output_dir / f"{info['id']}.mp3"
+                try:
+                    await _stage("yt_transcode",
+                                 transcode_async(str(src), str(mp3_path), MP3_ARGS),
+                                 TRANSCODE_TIMEOUT)
+                finally:
+                    src.unlink(missing_ok=True)
+                DOWNLOAD_BYTES.inc(mp3_path.stat().st_size)
+            else:
+                logger.info(f"[YT-DL] '{info['id']}' mp3 재사용")
+
+            sample_rate, channels = await self._ffprobe_async(mp3_path)
+            meta = self._meta(info, mp3_path, sample_rate, channels)
             logger.info(f"[YT-DL] '{meta['title']}' mp3 저장 완료")
             return meta
 
+        except asyncio.CancelledError:
+            logger.info(f"[YT-DL] 취소됨: {url}")
+            raise
         except Exception as e:
             logger.error(f"[YT-DL] {e}")
             raise
@@ -89,6 +178,36 @@ class YoutubeDownloader:
             "duration": info.get("duration", 0),
         }
 
+    @staticmethod
+    def _meta(info: Dict, mp3_path: Path, sample_rate: int, channels: int) -> Dict:
+        return {
+            "path": str(mp3_path),
+            **info,                                         # title, uploader, duration, id …
+            "file_size": mp3_path.stat().st_size,
+            "sample_rate": sample_rate,
+            "channels":    channels,
+        }
+
+    def _fetch_source(self, url: str, vid_id: str, cancel: threading.Event) -> Path:
+        """후처리 없이 원본 오디오만 받는다 (mp3 변환은 비동기 ffmpeg 로 따로)"""
+        def hook(_):
+            if cancel.is_set():
+                raise DownloadCancelled("다운로드 취소")
+
+        ydl_opts = {
+            "format": "bestaudio/best",
+            "quiet": True,
+            "noprogress": True,
+            "outtmpl": str(self.output_dir / f"{vid_id}.src.%(ext)s"),
+            "progress_hooks": [hook],
+        }
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            ydl.download([url])
+        for path in self.output_dir.glob(f"{vid_id}.src.*"):
+            if not path.name.endswith((".part", ".ytdl")):
+                return path
+        raise RuntimeError("다운로드된 오디오 파일을 찾지 못했습니다.")
+
     def _find_downloaded(self, vid_id: str, ext: str) -> Optional[Path]:
         candidate = self.output_dir / f"{vid_id}.{ext}"
         return candidate if candidate.exists() else None
@@ -100,3 +219,17 @@ class YoutubeDownloader:
         ]
         out = subprocess.run(cmd, capture_output=True, text=True).stdout.strip()
         return cast(out) if out else default
+
+    async def _ffprobe_async(self, path: Path):
+        """(sample_rate, channels) – 실패하면 기본값 (44100, 2)"""
+        cmd = [
+            "ffprobe", "-v", "quiet", "-select_streams", "a:0",
+            "-show_entries", "stream=sample_rate,channels", "-of", "json", str(path)
+        ]
+        try:
+            out = await run_async(cmd, FFPROBE_TIMEOUT)
+            stream = (json.loads(out or b"{}").get("streams") or [{}])[0]
+        except (subprocess.CalledProcessError, OSError, ValueError, TimeoutError) as e:
+            logger.warning(f"[YT-DL] ffprobe 실패: {e}")
+            stream = {}
+        return int(stream.get("sample_rate") or 44100), int(stream.get("channels") or 2)
@@ -0,0 +1,213 @@
+# backend/ai-service/src/beatmap/analysis.py
+"""오디오 → BeatmapFeatures (비싼 분석 단계)
+
+- AnalysisContext : 한 곡(또는 블록)의 STFT·HPSS·온셋·centroid 를 한 번씩만 계산
+- detect_beats    : madmom RNN+DBN (레지스트리 모델), 없으면 librosa
+- extract_features: 위 둘로 차트에 필요한 특징을 뽑는다 (차트는 beatmap.charting)
+api.analyze(업로드) · beatmap.engine(프로세스 워커) · beatmap.streaming(블록) 공용.
+"""
+
+import logging
+import os
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import librosa
+import numpy as np
+from scipy.signal import butter, sosfiltfilt
+
+from beatmap.charting import (NUM_LANES, BeatmapFeatures, chart_from_features,
+                              estimate_tempo, mix_onset_envs, report_progress)
+from models.registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+MADMOM_SR = 44100       # madmom RNN 은 44.1 kHz 입력을 가정
+# 분석 컨텍스트(STFT·HPSS 등) 캐시 상한 – 넘으면 오래된 항목부터 버리고 재계산
+CTX_MAX_BYTES = int(os.getenv("ANALYSIS_CTX_MAX_MB", "512")) * 1024 * 1024
+
+
+def resample_audio(y, orig_sr, target_sr):
+    """soxr(벡터화 C 구현) 리샘플, 없으면 scipy polyphase 로 대체"""
+    if target_sr is None or orig_sr == target_sr:
+        return y
+    try:
+        return librosa.resample(y, orig_sr=orig_sr, target_sr=target_sr,
+                                res_type="soxr_hq").astype(np.float32, copy=False)
+    except ImportError:
+        from math import gcd
+        from scipy.signal import resample_poly
+        g = gcd(int(orig_sr), int(target_sr))
+        return resample_poly(y, int(target_sr) // g, int(orig_sr) // g).astype(np.float32)
+
+
+# ──────────────────────────────────────────────────────────────
+# 전처리 뷰
+# ──────────────────────────────────────────────────────────────
+def bandpass_filter(y, sr, low=20, high=200, order=4):
+    nyq = sr / 2
+    sos = butter(order, [low / nyq, high / nyq], btype="band", output="sos")
+    return sosfiltfilt(sos, y)
+
+
+class AnalysisContext:
+    """한 곡의 STFT 를 한 번만 계산하고 파생 특징(HPSS·온셋·centroid)을 공유
+
+    - HPSS 는 파형(istft) 대신 복소 스펙트로그램에서 바로 분리해 온셋에 쓴다
+    - 캐시는 max_bytes 를 넘으면 가장 오래 안 쓴 항목부터 버리고 필요 시 재계산
+    - views["harm"] 처럼 파형 뷰도 필요할 때만 만들어 준다 (이전 dict 호환)
+    """
+
+    def __init__(self, y, sr, n_fft=2048, hop_length=512, max_bytes=CTX_MAX_BYTES):
+        self.y = y
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.max_bytes = max_bytes
+        self.hpss_failed = False
+        self._cache = OrderedDict()
+        self._bytes = 0
+
+    # ---- 캐시 ----------------------------------------------------
+    @staticmethod
+    def _nbytes(value):
+        if isinstance(value, tuple):
+            return sum(getattr(v, "nbytes", 0) for v in value)
+        return getattr(value, "nbytes", 0)
+
+    def _get(self, key, compute):
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        value = compute()
+        self._cache[key] = value
+        self._bytes += self._nbytes(value)
+        while self._bytes > self.max_bytes and len(self._cache) > 1:
+            old_key, old = self._cache.popitem(last=False)
+            self._bytes -= self._nbytes(old)
+        return value
+
+    def drop(self, *keys):
+        """더 이상 쓰지 않을 중간 결과를 즉시 해제"""
+        for key in keys:
+            if key in self._cache:
+                self._bytes -= self._nbytes(self._cache.pop(key))
+
+    # ---- 스펙트럼 ------------------------------------------------
+    def stft(self):
+        return self._get("stft", lambda: librosa.stft(
+            self.y, n_fft=self.n_fft, hop_length=self.hop_length))
+
+    def hpss(self):
+        def _split():
+            try:
+                return librosa.decompose.hpss(self.stft())
+            except Exception:
+                logger.warning("HPSS 실패 – harm/full 동일 사용")
+                self.hpss_failed = True
+                return None
+        return self._get("hpss", _split)
+
+    def magnitude(self, view="full"):
+        def _mag():
+            if view == "full":
+                return np.abs(self.stft())
+            if view in ("harm", "perc"):
+                parts = self.hpss()
+                if parts is None:               # HPSS 실패 시 harm=full, perc=low
+                    return self.magnitude("full" if view == "harm" else "low")
+                return np.abs(parts[0 if view == "harm" else 1])
+            return np.abs(librosa.stft(self[view], n_fft=self.n_fft,
+                                       hop_length=self.hop_length))
+        return self._get(f"mag:{view}", _mag)
+
+    def onset_env(self, view="full"):
+        def _onset():
+            mel = librosa.feature.melspectrogram(S=self.magnitude(view) ** 2, sr=self.sr,
+                                                 n_fft=self.n_fft, hop_length=self.hop_length)
+            return librosa.onset.onset_strength(S=librosa.power_to_db(mel), sr=self.sr,
+                                                hop_length=self.hop_length)
+        return self._get(f"onset:{view}", _onset)
+
+    def centroid(self):
+        return self._get("centroid", lambda: librosa.feature.spectral_centroid(
+            S=self.magnitude("full"), sr=self.sr, n_fft=self.n_fft,
+            hop_length=self.hop_length).flatten())
+
+    # ---- 파형 뷰 (필요할 때만) -----------------------------------
+    def __getitem__(self, view):
+        if view == "full":
+            return self.y
+        if view == "low":
+            return self._get("wave:low", lambda: bandpass_filter(self.y, self.sr, 20, 200))
+        parts = self.hpss()
+        if parts is None:
+            return self.y if view == "harm" else self["low"]
+        idx = 0 if view == "harm" else 1
+        return self._get(f"wave:{view}", lambda: librosa.istft(
+            parts[idx], hop_length=self.hop_length, length=len(self.y)))
+
+
+def preprocess_views(y, sr):
+    """STFT + 스펙트럼 HPSS 를 미리 계산한 분석 컨텍스트 반환"""
+    ctx = AnalysisContext(y, sr)
+    ctx.hpss()
+    return ctx
+
+
+# ──────────────────────────────────────────────────────────────
+# 비트 트래킹 · 온셋
+# ──────────────────────────────────────────────────────────────
+def detect_beats(y, sr, ctx=None, use_madmom=True, onset_env=None, hop_length=512):
+    # madmom 모델은 레지스트리에서 프로세스당 한 번만 로드 (use_madmom=False: librosa 강제)
+    # onset_env: librosa 경로에서 쓸 전체 대역 온셋 (ctx 대신 – 구간 블록용)
+    if use_madmom:
+        with model_registry.use("madmom_beats") as processors:
+            if processors is not None:
+                rnn, dbn = processors
+                # madmom 은 배열의 레이트를 44.1 kHz 로 간주 → 맞춰서 넘겨야 비트 시간이 맞다
+                act = rnn(resample_audio(y, sr, MADMOM_SR))
+                logger.info("✅ madmom beat detector 사용")
+                return dbn(act)
+    if ctx is not None:
+        hop_length = ctx.hop_length
+    if onset_env is not None:
+        o_env = onset_env
+    elif ctx is not None:
+        o_env = ctx.onset_env("full")
+    else:
+        o_env = librosa.onset.onset_strength(y=y, sr=sr)
+    _, beat_frames = librosa.beat.beat_track(onset_envelope=o_env, sr=sr,
+                                             hop_length=hop_length)
+    return librosa.frames_to_time(beat_frames, sr=sr, hop_length=hop_length)
+
+
+def mixed_onset_env(views, sr, w_perc=0.7, w_harm=0.3):
+    return mix_onset_envs(views.onset_env("perc"), views.onset_env("harm"),
+                          w_perc, w_harm)
+
+
+# ──────────────────────────────────────────────────────────────
+# 특징 추출
+# ──────────────────────────────────────────────────────────────
+def extract_features(y, sr, progress: Optional[Callable[[str], None]] = None):
+    """오디오 → BeatmapFeatures (비싼 단계 전부)"""
+    report_progress(progress, "beats")
+    views       = preprocess_views(y, sr)
+    beat_times  = detect_beats(views["full"], sr, ctx=views)
+    report_progress(progress, "onsets")
+    onset_env   = mixed_onset_env(views, sr)
+    views.drop("hpss", "mag:harm", "mag:perc")      # 이후 단계에선 불필요
+    centroid    = views.centroid()
+    return BeatmapFeatures(
+        sr=sr, hop_length=views.hop_length, duration=len(y) / sr,
+        tempo=estimate_tempo(onset_env, sr, views.hop_length),
+        beat_times=np.asarray(beat_times, dtype=float),
+        onset_env=onset_env, centroid=centroid,
+    )
+
+
+def make_beatmap(y, sr, num_lanes: int = NUM_LANES,
+                 progress: Optional[Callable[[str], None]] = None):
+    feats = extract_features(y, sr, progress=progress)
+    return chart_from_features(feats, num_lanes, progress=progress)
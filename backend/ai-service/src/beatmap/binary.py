@@ -0,0 +1,204 @@
+# backend/ai-service/src/beatmap/binary.py
+"""비트맵 컬럼형 바이너리 포맷 (.bmap, application/x-beatmap)
+
+JSON 의 이벤트 dict 목록 대신 열(column) 단위로 저장한다.
+
+    헤더 32 바이트 (리틀 엔디언)
+        magic "BMAP" | u8 version | u8 lanes | u8 difficulty | pad
+        f64 tempo | u32 n_events | u32 first_id | f32 chunk_sec | u32 n_chunks
+    청크 인덱스  n_chunks × (u32 첫 이벤트 번호, u32 times 구간 내 바이트 오프셋)
+    codes        n_events × u8  = (type << 4) | lane   (type: 0 normal, 1 strong)
+    times        LEB128 varint, 0.1 ms 단위 시간 차. 청크마다 첫 값은 절대 시각
+
+- 청크 k 는 [k·chunk_sec, (k+1)·chunk_sec) 의 이벤트 → 시간 구간 읽기는 해당 청크만 디코딩
+  (read() 는 파일에서 그 청크의 codes · times 만 seek 해 읽는다)
+- id 는 first_id 부터 연속 (JSON 저장 시 1..N)
+- JSON 시각이 소수 4자리(0.1 ms)로 반올림되어 있으므로 왕복 손실 없음
+- 이 구조로 정확히 표현할 수 없는 비트맵(예전 형식, 추가 키, id 불연속)은
+  encode 가 ValueError → 호출 측은 JSON 만 쓴다
+"""
+
+import struct
+from typing import BinaryIO, Dict, Optional
+
+import numpy as np
+
+MAGIC = b"BMAP"
+VERSION = 1
+MEDIA_TYPE = "application/x-beatmap"
+TIME_UNIT = 1e-4            # 0.1 ms
+CHUNK_SEC = 10.0
+
+_HEADER = struct.Struct("<4sBBBxdIIfI")
+_INDEX = np.dtype([("first", "<u4"), ("offset", "<u4")])
+_TYPES = ("normal", "strong")
+_DIFFICULTIES = (None, "easy", "normal", "hard", "expert")
+_KEYS = {"tempo", "lanes", "events", "difficulty"}
+_EVENT_KEYS = {"id", "time", "type", "lane"}
+
+
+# ──────────────────────────────────────────────────────────────
+# varint
+# ──────────────────────────────────────────────────────────────
+def _varint_encode(values: np.ndarray):
+    """부호 없는 정수 배열 → (LEB128 바이트, 값별 시작 오프셋)"""
+    values = values.astype(np.uint64)
+    nbytes = np.ones(len(values), dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        nbytes += rest > 0
+        rest >>= np.uint64(7)
+    starts = np.concatenate([[0], np.cumsum(nbytes)[:-1]]).astype(np.int64)
+    out = np.zeros(int(nbytes.sum()), dtype=np.uint8)
+    for b in range(int(nbytes.max(initial=0))):
+        m = nbytes > b
+        byte = (values[m] >> np.uint64(7 * b)) & np.uint64(0x7F)
+        out[starts[m] + b] = byte.astype(np.uint8) | ((nbytes[m] > b + 1) << 7).astype(np.uint8)
+    return out.tobytes(), starts
+
+
+def _varint_decode(buf: np.ndarray, count: int) -> np.ndarray:
+    """buf 앞에서부터 count 개 값을 디코딩"""
+    if count == 0:
+        return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero((buf & 0x80) == 0)[:count]
+    buf = buf[:ends[-1] + 1].astype(np.int64)
+    group = np.zeros(len(buf), dtype=np.int64)
+    group[ends[:-1] + 1] = 1
+    group = np.cumsum(group)
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    shift = 7 * (np.arange(len(buf)) - starts[group])
+    return np.bincount(group, weights=(buf & 0x7F) << shift, minlength=count).astype(np.int64)
+
+
+# ──────────────────────────────────────────────────────────────
+# PUBLIC
+# ──────────────────────────────────────────────────────────────
+def encode(beatmap: Dict, chunk_sec: float = CHUNK_SEC) -> bytes:
+    """비트맵 dict(JSON 과 같은 구조) → .bmap 바이트 (표현 불가면 ValueError)"""
+    events = beatmap.get("events", [])
+    n = len(events)
+    difficulty = beatmap.get("difficulty")
+    if set(beatmap) - _KEYS or difficulty not in _DIFFICULTIES \
+            or any(set(e) != _EVENT_KEYS for e in events):
+        raise ValueError("바이너리로 표현할 수 없는 비트맵 구조")
+    units = np.array([round(e["time"] / TIME_UNIT) for e in events], dtype=np.int64)
+    ids = np.array([e["id"] for e in events], dtype=np.int64)
+    if n and (np.any(np.diff(units) < 0) or units[0] < 0
+              or np.any(np.diff(ids) != 1) or ids[0] < 0
+              or any(not 0 <= e["lane"] < 16 or e["type"] not in _TYPES for e in events)):
+        raise ValueError("바이너리로 표현할 수 없는 이벤트 (시간 역순·id 불연속·lane 범위)")
+    codes = np.array([(_TYPES.index(e["type"]) << 4) | e["lane"] for e in events],
+                     dtype=np.uint8)
+    chunk_units = round(chunk_sec / TIME_UNIT)
+    chunk_of = units // chunk_units
+    n_chunks = int(chunk_of[-1]) + 1 if n else 0
+    first = np.searchsorted(chunk_of, np.arange(n_chunks), side="left")
+
+    # 청크 첫 이벤트는 절대값, 나머지는 직전 이벤트와의 차
+    deltas = np.diff(units, prepend=0)
+    deltas[first[first < n]] = units[first[first < n]]
+    times, starts = _varint_encode(deltas)
+    index = np.empty(n_chunks, dtype=_INDEX)
+    index["first"] = first
+    index["offset"] = np.append(starts, len(times))[first]
+
+    header = _HEADER.pack(MAGIC, VERSION, int(beatmap.get("lanes", 4)),
+                          _DIFFICULTIES.index(difficulty),
+                          float(beatmap.get("tempo") or 0.0), n,
+                          int(ids[0]) if n else 1, chunk_sec, n_chunks)
+    return header + index.tobytes() + codes.tobytes() + times
+
+
+def decode(data: bytes, start: Optional[float] = None, end: Optional[float] = None) -> Dict:
+    """.bmap 바이트 → 비트맵 dict. start/end(초)가 있으면 [start, end) 이벤트만"""
+    header = _unpack_header(data)
+    n, n_chunks = header[5], header[8]
+    buf = np.frombuffer(data, dtype=np.uint8)
+    index = np.frombuffer(data, dtype=_INDEX, count=n_chunks, offset=_HEADER.size)
+    k0, k1, e0, e1, t0, t1 = _span(header, index, start, end)
+    pos = _HEADER.size + index.nbytes
+    times = buf[pos + n:]
+    return _assemble(header, index, k0, k1, e0, buf[pos + e0:pos + e1],
+                     times[t0:len(times) if t1 is None else t1], start, end)
+
+
+def read(fp: BinaryIO, start: Optional[float] = None, end: Optional[float] = None) -> Dict:
+    """열린 .bmap 파일에서 헤더 · 청크 인덱스와 [start, end) 청크의 레코드만 seek 해 읽는다
+
+    decode(fp.read(), start, end) 와 결과가 같고, 읽는 양은 구간 길이에 비례한다.
+    """
+    header = _unpack_header(fp.read(_HEADER.size))
+    n, n_chunks = header[5], header[8]
+    index = np.frombuffer(fp.read(n_chunks * _INDEX.itemsize), dtype=_INDEX)
+    if len(index) != n_chunks:
+        raise ValueError("잘린 beatmap 바이너리")
+    k0, k1, e0, e1, t0, t1 = _span(header, index, start, end)
+    pos = _HEADER.size + index.nbytes
+    fp.seek(pos + e0)
+    codes = np.frombuffer(fp.read(e1 - e0), dtype=np.uint8)
+    fp.seek(pos + n + t0)
+    times = np.frombuffer(fp.read() if t1 is None else fp.read(t1 - t0), dtype=np.uint8)
+    return _assemble(header, index, k0, k1, e0, codes, times, start, end)
+
+
+# ──────────────────────────────────────────────────────────────
+# INTERNAL (decode / read 공통)
+# ──────────────────────────────────────────────────────────────
+def _unpack_header(data: bytes) -> tuple:
+    if len(data) < _HEADER.size:
+        raise ValueError("잘린 beatmap 바이너리")
+    header = _HEADER.unpack_from(data, 0)
+    if header[0] != MAGIC or header[1] != VERSION:
+        raise ValueError("지원하지 않는 beatmap 바이너리")
+    return header
+
+
+def _span(header: tuple, index: np.ndarray, start: Optional[float], end: Optional[float]):
+    """필요한 청크 구간 [k0, k1) → 이벤트 구간 [e0, e1) 와 times 바이트 구간 [t0, t1)
+
+    t1 이 None 이면 times 끝까지 (마지막 청크 포함)
+    """
+    n, chunk_sec, n_chunks = header[5], header[7], header[8]
+    k0 = 0 if start is None else min(max(int(start // chunk_sec), 0), n_chunks)
+    k1 = n_chunks if end is None else min(max(int(np.ceil(end / chunk_sec)), k0), n_chunks)
+    e0 = int(index["first"][k0]) if k0 < n_chunks else n
+    e1 = int(index["first"][k1]) if k1 < n_chunks else n
+    if e1 <= e0:
+        return k0, k1, e0, e0, 0, 0
+    t0 = int(index["offset"][k0])
+    t1 = int(index["offset"][k1]) if k1 < n_chunks else None
+    return k0, k1, e0, e1, t0, t1
+
+
+def _assemble(header: tuple, index: np.ndarray, k0: int, k1: int, e0: int,
+              codes: np.ndarray, times: np.ndarray,
+              start: Optional[float], end: Optional[float]) -> Dict:
+    """이벤트 [e0, e0+len(codes)) 의 codes · times 바이트 → 비트맵 dict"""
+    _, _, lanes, diff, tempo, _, first_id, _, _ = header
+    m = len(codes)
+    vals = _varint_decode(times, m)
+
+    # 청크 첫 이벤트(절대값)마다 누적합을 다시 시작
+    reset = np.zeros(m, dtype=bool)
+    heads = index["first"][k0:k1].astype(np.int64) - e0
+    reset[heads[heads < m]] = True
+    cs = np.cumsum(vals)
+    group = np.cumsum(reset) - 1
+    sec = (cs - (cs - vals)[reset][group]) * TIME_UNIT if m else cs * TIME_UNIT
+
+    sel = np.ones(m, dtype=bool)
+    if start is not None:
+        sel &= sec >= start - TIME_UNIT / 2
+    if end is not None:
+        sel &= sec < end - TIME_UNIT / 2
+    idx = np.flatnonzero(sel)
+    events = [
+        {"id": first_id + e0 + int(i), "time": round(float(t), 4),
+         "type": _TYPES[int(code) >> 4], "lane": int(code) & 0x0F}
+        for i, t, code in zip(idx.tolist(), sec[idx].tolist(), codes[idx].tolist())
+    ]
+    beatmap = {"tempo": tempo, "lanes": lanes, "events": events}
+    if _DIFFICULTIES[diff]:
+        beatmap["difficulty"] = _DIFFICULTIES[diff]
+    return beatmap
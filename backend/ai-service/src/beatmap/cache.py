@@ -0,0 +1,304 @@
+# backend/ai-service/src/beatmap/cache.py
+"""콘텐츠 주소 기반 비트맵 캐시
+
+키 = (디코딩된 오디오 해시, 분석 파라미터 지문).
+- 같은 음원이 다시 올라오면 make_beatmap 을 건너뛰고 기존 beatmap_id 를 돌려준다.
+- 파라미터 지문이 키에 포함되므로 상수(TARGET_DENSITY 등)가 바뀌면 기존 항목은
+  더 이상 적중하지 않고, LRU 꼬리로 밀려 자연스럽게 제거된다.
+- 인덱스는 cache_dir/.beatmap_cache.sqlite3 (WAL) 에 둔다. 항목 하나 단위로 읽고 쓰므로
+  여러 uvicorn 워커 · cli.batch · cli.rechart 가 같은 디렉터리를 써도 서로의 항목을
+  덮어쓰지 않는다.
+- 항목 크기에는 비트맵 JSON · 압축본(.gz/.br) · .bmap 과 <오디오 해시>.feat 가 포함된다
+  (밀려날 때 delete_beatmap 이 같은 파일들을 지운다). .feat 는 난이도별 항목
+  (<해시>/<난이도>)이 함께 쓰므로 처음 등록한 항목 하나에만 더하고, 마지막 항목이 밀려날 때 지운다.
+- 적중 시각(atime)은 메모리에 모았다가 CACHE_ATIME_FLUSH_SEC 마다 한 번에 기록한다
+  (적중마다 디스크에 쓰지 않음, LRU 순서가 그만큼 늦게 반영될 뿐).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from audio.digest import audio_digest, bytes_digest, file_digest, upload_hasher
+from beatmap.features import feature_path
+from beatmap.store import beatmap_files, delete_beatmap
+
+logger = logging.getLogger(__name__)
+
+DB_NAME = ".beatmap_cache.sqlite3"
+ATIME_FLUSH_SEC = float(os.getenv("CACHE_ATIME_FLUSH_SEC", "30"))
+ATIME_FLUSH_MAX = 256                     # 이만큼 쌓이면 주기와 무관하게 기록
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    digest      TEXT NOT NULL,
+    params      TEXT NOT NULL,
+    beatmap_id  TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    atime       REAL NOT NULL,
+    PRIMARY KEY (digest, params)
+);
+CREATE INDEX IF NOT EXISTS idx_entries_atime ON entries(atime);
+CREATE TABLE IF NOT EXISTS aliases (
+    upload      TEXT NOT NULL,
+    params      TEXT NOT NULL,
+    digest      TEXT NOT NULL,
+    PRIMARY KEY (upload, params)
+);
+CREATE INDEX IF NOT EXISTS idx_aliases_digest ON aliases(digest, params);
+"""
+
+
+class BeatmapCache:
+    """SAVE_DIR 위에서 동작하는 크기 제한 LRU 캐시"""
+
+    def __init__(self, cache_dir: str, params: Callable[[], Dict],
+                 max_bytes: int = 512 * 1024 * 1024, max_entries: int = 5000):
+        self.cache_dir = cache_dir
+        self.params = params                  # 호출 시점의 분석 파라미터 dict
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._local = threading.local()       # 스레드별 sqlite 연결
+        self._ready = False
+        self._touched: Dict[Tuple[str, str], float] = {}   # 아직 기록 안 한 atime
+        self._flushed = time.monotonic()
+
+    # ──────────────────────────────────────────────────────────────
+    # 키 계산
+    # ──────────────────────────────────────────────────────────────
+    # 해시 함수는 audio.digest 에 있다 (models 등 캐시와 무관한 모듈도 쓰는 키)
+    audio_digest = staticmethod(audio_digest)
+    upload_hasher = staticmethod(upload_hasher)
+    bytes_digest = staticmethod(bytes_digest)
+    file_digest = staticmethod(file_digest)
+
+    def fingerprint(self) -> str:
+        """분석 파라미터 지문"""
+        blob = json.dumps(self.params(), sort_keys=True, default=str)
+        return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+    # ──────────────────────────────────────────────────────────────
+    # PUBLIC
+    # ──────────────────────────────────────────────────────────────
+    def lookup(self, audio_digest: str) -> Optional[str]:
+        """오디오 해시로 beatmap_id 조회 (없으면 None, 적중·실패 모두 집계)"""
+        beatmap_id = self._get(audio_digest, self.fingerprint())
+        with self._lock:
+            if beatmap_id is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return beatmap_id
+
+    def lookup_upload(self, upload_digest: str) -> Optional[str]:
+        """업로드 바이트 해시로 조회 – 디코딩 없이 수 ms 안에 끝난다
+
+        적중만 집계한다. 놓치면 호출 측이 오디오 해시로 다시 lookup 하므로
+        한 요청의 실패가 두 번 세지지 않도록."""
+        fp = self.fingerprint()
+        digest = self.resolve_upload(upload_digest, fp)
+        beatmap_id = self._get(digest, fp) if digest else None
+        if beatmap_id is not None:
+            with self._lock:
+                self.hits += 1
+        return beatmap_id
+
+    def resolve_upload(self, upload_digest: str, fp: Optional[str] = None) -> Optional[str]:
+        """업로드 해시 → 연결된 오디오 해시 (.feat 조회용, 적중 통계에는 반영 안 함)"""
+        row = self._conn().execute(
+            "SELECT digest FROM aliases WHERE upload = ? AND params = ?",
+            (upload_digest, fp or self.fingerprint())).fetchone()
+        return row[0] if row else None
+
+    def store(self, audio_digest: str, beatmap_id: str,
+              upload_digest: Optional[str] = None):
+        """새 비트맵 등록 후 한도를 넘으면 LRU 제거"""
+        fp = self.fingerprint()
+        conn = self._conn()
+        self._flush_atime()
+        with self._write(conn):
+            size = self._entry_size(conn, audio_digest, fp, beatmap_id)
+            conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                         (audio_digest, fp, beatmap_id, size, time.time()))
+            if upload_digest:
+                conn.execute("INSERT OR REPLACE INTO aliases VALUES (?, ?, ?)",
+                             (upload_digest, fp, audio_digest))
+            evicted = self._evict_locked(conn)
+        for beatmap_id, feature_digest in evicted:
+            delete_beatmap(self.cache_dir, beatmap_id, feature_digest=feature_digest)
+            logger.info("[cache] evict %s", beatmap_id)
+
+    def alias(self, upload_digest: str, audio_digest: str):
+        """다른 인코딩으로 올라온 같은 음원의 업로드 해시를 연결"""
+        fp = self.fingerprint()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO aliases SELECT ?, params, digest FROM entries"
+            " WHERE digest = ? AND params = ?", (upload_digest, audio_digest, fp))
+
+    def entries(self) -> List[Tuple[str, str, Dict]]:
+        """(digest, 지문, 항목) 스냅샷 – 재차트 도구용"""
+        self._flush_atime(force=True)
+        rows = self._conn().execute(
+            "SELECT digest, params, beatmap_id, size, atime FROM entries").fetchall()
+        return [(r["digest"], r["params"],
+                 {"beatmap_id": r["beatmap_id"], "size": r["size"],
+                  "atime": r["atime"], "params": r["params"]}) for r in rows]
+
+    def refresh(self, digest: str, old_fp: str, beatmap_id: Optional[str] = None) -> bool:
+        """옛 지문의 항목(과 업로드 별칭)을 현재 지문으로 옮긴다
+
+        beatmap_id: 다시 차트한 새 파일 (주면 항목이 그 파일을 가리키게 한다)
+        현재 지문 항목이 이미 있으면 옮기지 않고 False (옛 항목은 LRU 로 정리)
+        """
+        fp = self.fingerprint()
+        conn = self._conn()
+        with self._write(conn):
+            row = conn.execute("SELECT beatmap_id FROM entries WHERE digest = ? AND params = ?",
+                               (digest, old_fp)).fetchone()
+            if row is None:
+                return False
+            if old_fp != fp and conn.execute(
+                    "SELECT 1 FROM entries WHERE digest = ? AND params = ?",
+                    (digest, fp)).fetchone():
+                return False
+            beatmap_id = beatmap_id or row["beatmap_id"]
+            size = self._entry_size(conn, digest, old_fp, beatmap_id)
+            conn.execute("UPDATE entries SET params = ?, beatmap_id = ?, size = ?, atime = ?"
+                         " WHERE digest = ? AND params = ?",
+                         (fp, beatmap_id, size, time.time(), digest, old_fp))
+            conn.execute("UPDATE OR REPLACE aliases SET params = ?"
+                         " WHERE digest = ? AND params = ?", (fp, digest, old_fp))
+            return True
+
+    def stats(self) -> Dict:
+        entries, total = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "fingerprint": self.fingerprint(),
+        }
+
+    # ──────────────────────────────────────────────────────────────
+    # INTERNAL
+    # ──────────────────────────────────────────────────────────────
+    def _entry_size(self, conn: sqlite3.Connection, digest: str, fp: str,
+                    beatmap_id: str) -> int:
+        """비트맵 파일(JSON · 압축본 · .bmap) 크기 + (이 오디오를 쓰는 다른 항목이 없으면) .feat 크기"""
+        size = sum(map(self._file_size, beatmap_files(self.cache_dir, beatmap_id)))
+        audio = digest.partition("/")[0]
+        if not self._audio_refs(conn, audio, exclude=(digest, fp)):
+            size += self._file_size(feature_path(self.cache_dir, audio))
+        return size
+
+    @staticmethod
+    def _file_size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _audio_refs(conn: sqlite3.Connection, audio: str,
+                    exclude: Tuple[str, str] = ("", "")) -> bool:
+        """<audio> 또는 <audio>/<난이도> 항목이 (exclude 말고) 남아 있는지 – '0' 은 '/' 다음 문자"""
+        return conn.execute(
+            "SELECT 1 FROM entries WHERE (digest = ? OR (digest > ? AND digest < ?))"
+            " AND NOT (digest = ? AND params = ?) LIMIT 1",
+            (audio, audio + "/", audio + "0") + exclude).fetchone() is not None
+
+    def _get(self, digest: str, fp: str) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT beatmap_id FROM entries WHERE digest = ? AND params = ?",
+            (digest, fp)).fetchone()
+        if row is None:
+            return None
+        beatmap_id = row["beatmap_id"]
+        if not os.path.exists(os.path.join(self.cache_dir, beatmap_id)):
+            # 외부에서 지워진 경우
+            self._drop(self._conn(), digest, fp)
+            return None
+        with self._lock:
+            self._touched[(digest, fp)] = time.time()
+        self._flush_atime()
+        return beatmap_id
+
+    def _flush_atime(self, force: bool = False):
+        """모아 둔 atime 을 한 트랜잭션으로 기록 (주기·개수 조건을 넘었을 때만)"""
+        with self._lock:
+            due = (force or len(self._touched) >= ATIME_FLUSH_MAX
+                   or time.monotonic() - self._flushed >= ATIME_FLUSH_SEC)
+            if not due or not self._touched:
+                return
+            touched, self._touched = self._touched, {}
+            self._flushed = time.monotonic()
+        conn = self._conn()
+        with self._write(conn):
+            conn.executemany("UPDATE entries SET atime = MAX(atime, ?)"
+                             " WHERE digest = ? AND params = ?",
+                             [(t, d, p) for (d, p), t in touched.items()])
+
+    def _evict_locked(self, conn: sqlite3.Connection) -> List[Tuple[str, Optional[str]]]:
+        """한도를 넘은 만큼 atime 오래된 순으로 항목 삭제 → 지울 (beatmap_id, .feat 해시) 목록"""
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        evicted = []
+        if total <= self.max_bytes and count <= self.max_entries:
+            return evicted
+        # 지문이 바뀐 항목은 atime 이 갱신되지 않으므로 먼저 밀려난다
+        for row in conn.execute("SELECT digest, params, beatmap_id, size FROM entries"
+                                " ORDER BY atime").fetchall():
+            if total <= self.max_bytes and count <= self.max_entries:
+                break
+            total -= row["size"]
+            count -= 1
+            self._drop(conn, row["digest"], row["params"])
+            # 같은 비트맵을 가리키는 다른 항목(이전 지문 등)이 없을 때만 파일 삭제
+            if not conn.execute("SELECT 1 FROM entries WHERE beatmap_id = ?",
+                                (row["beatmap_id"],)).fetchone():
+                # .feat 는 같은 오디오의 마지막 항목이 나갈 때 함께 삭제
+                audio = row["digest"].partition("/")[0]
+                evicted.append((row["beatmap_id"],
+                                None if self._audio_refs(conn, audio) else audio))
+        return evicted
+
+    @staticmethod
+    def _drop(conn: sqlite3.Connection, digest: str, fp: str):
+        conn.execute("DELETE FROM entries WHERE digest = ? AND params = ?", (digest, fp))
+        conn.execute("DELETE FROM aliases WHERE digest = ? AND params = ?", (digest, fp))
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection):
+        """BEGIN IMMEDIATE ~ COMMIT – 다른 프로세스의 쓰기와 직렬화"""
+        conn.execute("BEGIN IMMEDIATE")
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.cache_dir, DB_NAME), timeout=10,
+                                   isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    conn.executescript(_SCHEMA)
+                    self._ready = True
+        return conn
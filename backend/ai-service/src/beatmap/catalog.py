@@ -0,0 +1,215 @@
+# backend/ai-service/src/beatmap/catalog.py
+"""비트맵 카탈로그 (SQLite 인덱스)
+
+beatmap_id → 제목·출처·길이·템포·난이도·생성 시각. store.save_beatmap /
+delete_beatmap 이 갱신하므로 분석·YouTube 생성·배치·재차트 모두 같은 경로로 들어온다.
+
+- 파일: <BEATMAP_DIR>/.catalog.sqlite3 (WAL, 여러 프로세스 동시 접근 가능)
+- 목록은 (created, beatmap_id) 키셋 페이지네이션 → 비트맵 수와 무관하게
+  페이지당 인덱스 탐색 + limit 행만 읽는다 (OFFSET 없음)
+- DB 가 처음 만들어질 때 디렉터리의 기존 JSON 을 한 번 적재한다
+- 카탈로그는 보조 인덱스라 쓰기 실패는 로그만 남기고 비트맵 저장은 계속한다
+"""
+
+import base64
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DB_NAME = ".catalog.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS beatmaps (
+    beatmap_id  TEXT PRIMARY KEY,
+    title       TEXT,
+    source      TEXT,
+    source_url  TEXT,
+    video_id    TEXT,
+    duration    REAL,
+    tempo       REAL,
+    lanes       INTEGER,
+    n_events    INTEGER,
+    difficulty  TEXT,
+    created     REAL NOT NULL,
+    updated     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_beatmaps_created  ON beatmaps(created, beatmap_id);
+CREATE INDEX IF NOT EXISTS idx_beatmaps_tempo    ON beatmaps(tempo);
+CREATE INDEX IF NOT EXISTS idx_beatmaps_duration ON beatmaps(duration);
+CREATE INDEX IF NOT EXISTS idx_beatmaps_video    ON beatmaps(video_id);
+"""
+
+# 재차트처럼 meta 없이 다시 저장될 때는 기존 값을 유지
+_UPSERT = """
+INSERT INTO beatmaps (beatmap_id, title, source, source_url, video_id, duration,
+                      tempo, lanes, n_events, difficulty, created, updated)
+VALUES (:beatmap_id, :title, :source, :source_url, :video_id, :duration,
+        :tempo, :lanes, :n_events, :difficulty, :created, :updated)
+ON CONFLICT(beatmap_id) DO UPDATE SET
+    title      = COALESCE(excluded.title, title),
+    source     = COALESCE(excluded.source, source),
+    source_url = COALESCE(excluded.source_url, source_url),
+    video_id   = COALESCE(excluded.video_id, video_id),
+    duration   = COALESCE(excluded.duration, duration),
+    tempo      = excluded.tempo,
+    lanes      = excluded.lanes,
+    n_events   = excluded.n_events,
+    difficulty = excluded.difficulty,
+    updated    = excluded.updated
+"""
+
+_COLUMNS = ("beatmap_id", "title", "source", "source_url", "video_id", "duration",
+            "tempo", "lanes", "n_events", "difficulty", "created", "updated")
+_META_KEYS = ("title", "source", "source_url", "video_id", "duration")
+
+
+def _row(beatmap_id: str, beatmap: Dict, meta: Dict, now: float) -> Dict:
+    events = beatmap.get("events") or []
+    duration = meta.get("duration") or beatmap.get("duration")
+    if duration is None and events:
+        duration = events[-1].get("time")        # 예전 JSON – 마지막 노트 시각으로 근사
+    row = {k: meta.get(k) for k in _META_KEYS}
+    row.update(beatmap_id=beatmap_id,
+               duration=float(duration) if duration is not None else None,
+               tempo=float(beatmap["tempo"]) if beatmap.get("tempo") is not None else None,
+               lanes=beatmap.get("lanes"), n_events=len(events),
+               difficulty=beatmap.get("difficulty"),
+               created=meta.get("created", now), updated=now)
+    return row
+
+
+def encode_cursor(created: float, beatmap_id: str) -> str:
+    raw = json.dumps([created, beatmap_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """잘못된 커서면 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created, beatmap_id = json.loads(raw)
+        return float(created), str(beatmap_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"잘못된 cursor: {cursor}") from e
+
+
+class BeatmapCatalog:
+    """스레드마다 연결을 따로 여는 SQLite 카탈로그"""
+
+    def __init__(self, save_dir: str):
+        self.save_dir = save_dir
+        self.path = os.path.join(save_dir, DB_NAME)
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    # ──────────────────────────────────────────────────────────────
+    # 연결
+    # ──────────────────────────────────────────────────────────────
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(self.save_dir, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._ready:
+            with self._init_lock:
+                if not self._ready:
+                    self._init_schema(conn)
+                    self._ready = True
+        return conn
+
+    def _init_schema(self, conn: sqlite3.Connection):
+        new = conn.execute("SELECT 1 FROM sqlite_master WHERE name='beatmaps'").fetchone() is None
+        conn.executescript(_SCHEMA)
+        if new:
+            n = self._backfill(conn)
+            logger.info("[catalog] %s 생성 – 기존 비트맵 %d개 적재", self.path, n)
+
+    def _backfill(self, conn: sqlite3.Connection) -> int:
+        rows = []
+        for name in os.listdir(self.save_dir):
+            if name.startswith(".") or not name.endswith(".json"):
+                continue
+            path = os.path.join(self.save_dir, name)
+            try:
+                with open(path, "r", encoding="utf-8") as fp:
+                    beatmap = json.load(fp)
+                created = os.path.getmtime(path)
+            except (OSError, ValueError):
+                continue
+            if isinstance(beatmap, dict):
+                rows.append(_row(name, beatmap, {"created": created}, created))
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(_UPSERT, rows)
+        return len(rows)
+
+    # ──────────────────────────────────────────────────────────────
+    # PUBLIC
+    # ──────────────────────────────────────────────────────────────
+    def put(self, beatmap_id: str, beatmap: Dict, meta: Optional[Dict] = None):
+        self._conn().execute(_UPSERT, _row(beatmap_id, beatmap, meta or {}, time.time()))
+
+    def remove(self, beatmap_id: str):
+        self._conn().execute("DELETE FROM beatmaps WHERE beatmap_id = ?", (beatmap_id,))
+
+    def get(self, beatmap_id: str) -> Optional[Dict]:
+        row = self._conn().execute("SELECT * FROM beatmaps WHERE beatmap_id = ?",
+                                   (beatmap_id,)).fetchone()
+        return dict(row) if row else None
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM beatmaps").fetchone()[0]
+
+    def query(self, limit: int = 50, cursor: Optional[str] = None,
+              min_tempo: Optional[float] = None, max_tempo: Optional[float] = None,
+              min_duration: Optional[float] = None, max_duration: Optional[float] = None,
+              since: Optional[float] = None, until: Optional[float] = None,
+              source: Optional[str] = None, difficulty: Optional[str] = None
+              ) -> Tuple[List[Dict], Optional[str]]:
+        """최신순 목록 한 페이지와 다음 페이지 커서 (없으면 None)"""
+        where, args = [], []
+        for column, op, value in (("tempo", ">=", min_tempo), ("tempo", "<=", max_tempo),
+                                  ("duration", ">=", min_duration),
+                                  ("duration", "<=", max_duration),
+                                  ("created", ">=", since), ("created", "<", until),
+                                  ("source", "=", source), ("difficulty", "=", difficulty)):
+            if value is not None:
+                where.append(f"{column} {op} ?")
+                args.append(value)
+        if cursor:
+            created, beatmap_id = decode_cursor(cursor)
+            where.append("(created < ? OR (created = ? AND beatmap_id < ?))")
+            args += [created, created, beatmap_id]
+        sql = (f"SELECT {', '.join(_COLUMNS)} FROM beatmaps"
+               f"{' WHERE ' + ' AND '.join(where) if where else ''}"
+               " ORDER BY created DESC, beatmap_id DESC LIMIT ?")
+        rows = [dict(r) for r in self._conn().execute(sql, (*args, limit + 1))]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created"], rows[-1]["beatmap_id"])
+        return rows, next_cursor
+
+
+_catalogs: Dict[str, BeatmapCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def catalog_for(save_dir: str) -> BeatmapCatalog:
+    """디렉터리별 카탈로그 싱글턴"""
+    key = os.path.abspath(save_dir)
+    with _catalogs_lock:
+        if key not in _catalogs:
+            _catalogs[key] = BeatmapCatalog(key)
+        return _catalogs[key]
@@ -0,0 +1,515 @@
+# backend/ai-service/src/beatmap/charting.py
+"""특징(BeatmapFeatures) → 비트맵 차트
+
+오디오·모델 없이 돌아가는 순수 차트 단계 (스냅·병합·밀도·레인, 곡당 수 ms).
+api.analyze · beatmap.streaming · cli.rechart 가 같은 구현과 상수를 쓴다.
+상수를 바꾸면 api.analyze.analysis_params 지문이 바뀌어 캐시된 비트맵이 무효화된다.
+
+- chart_from_features : 곡 전체 통계(강도 백분위·정규화·템포)로 만드는 차트 (/api/analyze)
+- SpanCharter         : SPAN_SEC 구간 순서로 받아 지금까지 본 구간 통계로만 만드는 차트
+                        (/segments 전용 – 곡 끝을 기다리지 않는 대신 노트가 조금 다르다)
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import librosa
+import numpy as np
+from scipy.signal import argrelextrema, medfilt
+
+NUM_LANES = 4
+TARGET_DENSITY = 2.5    # 초당 최대 이벤트
+WINDOW_SEC = 2.5
+MAX_FACTOR = 2.0
+BEAT_TOL = 0.05         # strong 판정용 비트 근접 오차(초)
+SNAP_TOL = 0.04         # 그리드 스냅 오차(초)
+CLOSE_EVENT_THR = 0.02 # 너무 가까운 이벤트 병합(초)
+SUBDIVISIONS = [1, 2, 4, 8]
+SPAN_SEC = 15.0         # 구간 차트·정규화 단위(초)
+SPAN_MARGIN_SEC = 5.0   # 구간 비트 추적 시 앞뒤로 붙이는 문맥(초)
+CANDIDATE_LAG_SEC = 0.2 # 온셋 후보는 구간 끝에서 이만큼 앞까지만 확정 (peak pick 창·backtrack 여유)
+STRENGTH_BINS = 1024    # 강도 기준선(백분위)용 히스토그램 칸 수
+
+
+def report_progress(progress, stage: str):
+    """진행 단계 콜백 (download/decode/beats/onsets/lanes/write)"""
+    if progress is not None:
+        progress(stage)
+
+
+@dataclass
+class BeatmapFeatures:
+    """차트 생성에 필요한 분석 결과 (오디오 없이 재차트 가능)"""
+    sr: int
+    hop_length: int
+    duration: float
+    tempo: float
+    beat_times: np.ndarray      # 초
+    onset_env: np.ndarray       # 정규화된 perc/harm 혼합 온셋 (프레임)
+    centroid: np.ndarray        # spectral centroid (프레임, Hz)
+
+    @property
+    def frame_rate(self) -> float:
+        return self.sr / self.hop_length
+
+
+def frame_time(frame, sr, hop_length=512) -> float:
+    """프레임 번호 → 초 (구간 경계 계산은 모두 이 식을 쓴다)"""
+    return frame * hop_length / sr
+
+
+def span_length(sr, hop_length=512) -> int:
+    """SPAN_SEC 의 프레임 수"""
+    return max(1, int(SPAN_SEC * sr) // hop_length)
+
+
+def span_chunks(n_frames: int, span: int) -> Iterator[Tuple[int, int, bool]]:
+    """[0, n_frames) 를 span 프레임씩 (start, end, last) – 마지막은 나머지"""
+    start = 0
+    while n_frames - start > span:
+        yield start, start + span, False
+        start += span
+    yield start, n_frames, True
+
+
+def estimate_tempo(onset_env, sr, hop_length=512):
+    try:
+        return float(librosa.beat.tempo(onset_envelope=onset_env, sr=sr,
+                                        hop_length=hop_length)[0])
+    except Exception:
+        return 120.0
+
+
+# ──────────────────────────────────────────────────────────────
+# 온셋 후보
+# ──────────────────────────────────────────────────────────────
+def mix_onset_envs(o_perc, o_harm, w_perc=0.7, w_harm=0.3):
+    """perc/harm 온셋을 메디안 필터 후 각각 0~1 정규화해 가중합"""
+    o_perc = medfilt(o_perc, kernel_size=5)
+    o_harm = medfilt(o_harm, kernel_size=5)
+    n_perc = (o_perc - o_perc.min()) / (o_perc.ptp() + 1e-8)
+    n_harm = (o_harm - o_harm.min()) / (o_harm.ptp() + 1e-8)
+    return w_perc * n_perc + w_harm * n_harm
+
+
+def gather_times(beat_times, onset_env, sr, hop_length=512):
+    onset_frames = librosa.onset.onset_detect(onset_envelope=onset_env, sr=sr,
+                                              hop_length=hop_length, backtrack=True)
+    onset_times = librosa.frames_to_time(onset_frames, sr=sr, hop_length=hop_length)
+
+    peak_frames = argrelextrema(onset_env, np.greater, order=4)[0]
+    peak_times = librosa.frames_to_time(peak_frames, sr=sr, hop_length=hop_length)
+
+    return np.unique(np.concatenate([beat_times, onset_times, peak_times]))
+
+
+# ──────────────────────────────────────────────────────────────
+# 스냅 / 병합 / 밀도제어
+# ──────────────────────────────────────────────────────────────
+def snap_to_grid(times, beat_times, bpm):
+    """각 시각을 가장 가까운 비트 분할(SUBDIVISIONS)로 스냅 – 전 원소 일괄 계산
+
+    분할 후보 중 오차가 가장 작은 첫 번째(동률이면 작은 분할)를 고르고,
+    SNAP_TOL 을 넘으면 원래 시각 유지. (이전 루프 구현과 결과 동일)
+    """
+    if len(beat_times) < 2 or bpm is None or np.isnan(bpm):
+        return times
+    times = np.asarray(times)
+    if times.size == 0:
+        return np.array([])
+    beat_dur = 60.0 / bpm
+    idx = np.maximum(np.searchsorted(beat_times, times) - 1, 0)
+    base = np.asarray(beat_times)[idx]
+    rel = times - base
+
+    steps = np.array([beat_dur / div for div in SUBDIVISIONS])[:, None]   # (D, 1)
+    cands = base + np.round(rel / steps) * steps                          # (D, N)
+    diffs = np.abs(cands - times)
+    best = np.argmin(diffs, axis=0)                                       # 동률 → 앞쪽
+    cols = np.arange(times.size)
+    best_diff = diffs[best, cols]
+    return np.where(best_diff <= SNAP_TOL, cands[best, cols], times)
+
+
+def merge_close(times, thr=CLOSE_EVENT_THR):
+    if len(times) == 0:
+        return times
+    merged = [times[0]]
+    for t in times[1:]:
+        if t - merged[-1] < thr:
+            merged[-1] = (merged[-1] + t) / 2.0
+        else:
+            merged.append(t)
+    return np.array(merged)
+
+
+def adaptive_prune_density(times, onset_env, time_axis,
+                           target_density, window_sec=WINDOW_SEC,
+                           max_factor=MAX_FACTOR):
+    win_edges  = np.arange(0, time_axis[-1] + window_sec, window_sec)
+    center_e   = np.interp((win_edges[:-1] + win_edges[1:]) / 2,
+                           time_axis, onset_env)
+    energy_norm = (center_e - center_e.min()) / (center_e.ptp() + 1e-8)
+    local_fac   = 1 + energy_norm * (max_factor - 1)
+
+    pruned = []
+    for i in range(len(win_edges) - 1):
+        lo, hi    = win_edges[i], win_edges[i+1]
+        w_times   = times[(times >= lo) & (times < hi)]
+        limit     = int(window_sec * target_density * local_fac[i])
+        if len(w_times) > limit:
+            idx  = np.linspace(0, len(w_times) - 1, num=limit, dtype=int)
+            w_times = w_times[idx]
+        pruned.append(w_times)
+    return np.concatenate(pruned) if pruned else times
+
+
+# ──────────────────────────────────────────────────────────────
+# 노트 타입 · 레인 결정 (일괄 계산)
+# ──────────────────────────────────────────────────────────────
+# 버킷별 라운드로빈 → lane 매핑 표
+LANE_MAP = np.array([
+    [0, 1, 0, 1],   # 저음: 0↔1
+    [1, 0, 1, 0],   # 중저: 1↔0
+    [2, 3, 2, 3],   # 중고: 2↔3
+    [3, 2, 3, 2],   # 고음: 3↔2
+])
+
+
+def near_beat(times, beat_times, tol=BEAT_TOL):
+    """각 시각이 어떤 비트와 tol 미만으로 가까운지 (정렬 후 양옆 비트만 비교)"""
+    times = np.asarray(times, dtype=float)
+    if len(beat_times) == 0 or times.size == 0:
+        return np.zeros(times.size, dtype=bool)
+    beats = np.sort(np.asarray(beat_times, dtype=float))
+    idx = np.searchsorted(beats, times)
+    left = beats[np.clip(idx - 1, 0, len(beats) - 1)]
+    right = beats[np.clip(idx, 0, len(beats) - 1)]
+    return (np.abs(times - left) < tol) | (np.abs(times - right) < tol)
+
+
+def assign_lanes(times, beat_times, onset_env, time_axis, strong_thr,
+                 centroid_norm, frame_times, first_id=1, counts=None):
+    """(strong 여부, lane) 배열 반환
+
+    - strong : 비트 근처 & 온셋 강도 ≥ strong_thr → 1→2→1→2… (이벤트 번호 기준)
+    - normal : sqrt(centroid) 로 4버킷 → 버킷마다 LANE_MAP 라운드로빈
+    first_id / counts: 앞 구간에서 이어지는 이벤트 번호와 버킷별 normal 노트 수
+                       (counts 는 이번 노트만큼 늘려 둔다)
+    """
+    times = np.asarray(times, dtype=float)
+    strength = np.interp(times, time_axis, onset_env,
+                         left=onset_env[0], right=onset_env[-1])
+    is_strong = near_beat(times, beat_times) & (strength >= strong_thr)
+
+    ids = np.arange(first_id, first_id + times.size)
+    lanes = np.where(ids % 2, 1, 2)                      # strong은 1→2→1→2…
+
+    c_val = np.interp(times, frame_times, centroid_norm,
+                      left=centroid_norm[0], right=centroid_norm[-1])
+    bucket = np.clip(np.floor(np.sqrt(c_val) * 4), 0, 3).astype(int)   # 0~3
+    normal = ~is_strong
+    # 버킷별로 지금까지 나온 normal 노트 수 = 라운드로빈 인덱스
+    onehot = (bucket[:, None] == np.arange(4)) & normal[:, None]
+    rr = np.cumsum(onehot, axis=0)[np.arange(times.size), bucket] - 1
+    if counts is not None:
+        rr = rr + counts[bucket]
+        counts += onehot.sum(axis=0)
+    lanes = np.where(normal, LANE_MAP[bucket, rr % LANE_MAP.shape[1]], lanes)
+    return is_strong, lanes
+
+
+# ──────────────────────────────────────────────────────────────
+# 구간 단위 상태 (템포 · 이력)
+# ──────────────────────────────────────────────────────────────
+class TempoTracker:
+    """librosa tempo 와 같은 추정(tempogram 평균 + log-normal prior)을 누적으로
+
+    새로 들어온 프레임의 tempogram 열만 계산해 합을 쌓는다 (곡 끝 패딩은 librosa 와
+    같은 linear_ramp). 구간마다 곡 처음부터 다시 추정하지 않으므로 전체 비용 O(n).
+    """
+
+    def __init__(self, sr, hop_length=512, ac_size=8.0):
+        self.sr = sr
+        self.hop_length = hop_length
+        self.win = int(librosa.time_to_frames(ac_size, sr=sr, hop_length=hop_length))
+        self.half = self.win // 2
+        self.tempo = 120.0
+        self._sum = np.zeros(self.win)
+        self._count = 0
+        self._done = 0                  # tempogram 열을 계산한 프레임 수
+
+    def _ramp(self, edge, width, left):
+        pad = np.pad(np.array([edge], dtype=float), (self.half, self.half),
+                     mode="linear_ramp", end_values=(0, 0))
+        return pad[self.half - width:self.half] if left else pad[self.half + 1:self.half + 1 + width]
+
+    def update(self, onset_env, last=False) -> float:
+        """onset_env: 지금까지의 전체 온셋 (앞부분은 이미 반영됨)"""
+        n = len(onset_env)
+        stop = n if last else max(self._done, n - (self.win - self.half) + 1)
+        if stop <= self._done:
+            return self.tempo
+        lo, hi = self._done - self.half, stop - self.half + self.win - 1
+        part = np.asarray(onset_env[max(lo, 0):min(hi, n)], dtype=float)
+        if lo < 0:
+            part = np.concatenate([self._ramp(onset_env[0], -lo, True), part])
+        if hi > n:
+            part = np.concatenate([part, self._ramp(onset_env[-1], hi - n, False)])
+        tg = librosa.feature.tempogram(onset_envelope=part, sr=self.sr,
+                                       hop_length=self.hop_length,
+                                       win_length=self.win, center=False)
+        self._sum += tg.sum(axis=1)
+        self._count += tg.shape[1]
+        self._done = stop
+        try:
+            self.tempo = float(librosa.feature.tempo(
+                tg=(self._sum / self._count)[:, None], sr=self.sr,
+                hop_length=self.hop_length)[0])
+        except Exception:
+            self.tempo = 120.0
+        return self.tempo
+
+
+class _History:
+    """구간마다 늘어나는 1차원 배열 (용량을 두 배씩 늘려 복사 총량 O(n))"""
+
+    def __init__(self):
+        self._buf = np.empty(1024)
+        self._n = 0
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=float)
+        need = self._n + values.size
+        if need > self._buf.size:
+            buf = np.empty(max(need, 2 * self._buf.size))
+            buf[:self._n] = self._buf[:self._n]
+            self._buf = buf
+        self._buf[self._n:need] = values
+        self._n = need
+
+    @property
+    def view(self) -> np.ndarray:
+        return self._buf[:self._n]
+
+
+def beats_between(beat_times, t0, t1, last=False) -> np.ndarray:
+    """정렬된 비트 중 [t0, t1) (last 면 t0 이후 전부)"""
+    lo = np.searchsorted(beat_times, t0)
+    hi = len(beat_times) if last else np.searchsorted(beat_times, t1)
+    return beat_times[lo:hi]
+
+
+# ──────────────────────────────────────────────────────────────
+# 차트
+# ──────────────────────────────────────────────────────────────
+class SpanCharter:
+    """특징을 SPAN_SEC 구간 순서로 받아 확정된 노트부터 낸다 (beatmap.streaming.iter_segments)
+
+    규칙은 chart_from_features 와 같고 통계만 지금까지 본 구간으로 잡으므로, 구간을
+    어떻게 나눠 먹여도 같은 노트가 나온다. 구간 사이에 이어지는 상태:
+    - 온셋·centroid·비트 이력, 강도 기준선(70 백분위 히스토그램)·centroid·창 에너지 min/max
+    - 템포 (TempoTracker)
+    - 끝에서 CANDIDATE_LAG_SEC 안의 후보, 스냅 후 순서가 안 정해진 시각, 병합 중인 값
+    - 밀도 창 위치, 이벤트 번호(strong 1↔2 교대), 버킷별 레인 라운드로빈 위치
+    """
+
+    def __init__(self, sr, hop_length=512, target_density=TARGET_DENSITY):
+        self.sr = sr
+        self.hop_length = hop_length
+        self.target_density = target_density
+        self.lag = int(np.ceil(CANDIDATE_LAG_SEC * sr / hop_length))
+        self.tempo_tracker = TempoTracker(sr, hop_length)
+        self.final_until = 0.0          # 이 시각 전의 노트는 모두 나갔다
+
+        self._env, self._cent, self._beats = _History(), _History(), _History()
+        self._hist = np.zeros(STRENGTH_BINS, dtype=np.int64)
+        self._c_range = [np.inf, -np.inf]
+        self._e_range = [np.inf, -np.inf]
+        self._done = 0                  # 후보를 뽑은 프레임 수
+        self._pending = np.empty(0)     # 스냅됐지만 뒤 후보와 순서가 안 정해진 시각
+        self._head: Optional[float] = None  # merge_close 진행 중인 값
+        self._merged: List[float] = []  # 병합 확정, 밀도 창 대기
+        self._window = 0
+        self._next_id = 1
+        self._rr = np.zeros(LANE_MAP.shape[0], dtype=np.int64)
+
+    @property
+    def tempo(self) -> float:
+        return self.tempo_tracker.tempo
+
+    def _time(self, frame) -> float:
+        return frame_time(frame, self.sr, self.hop_length)
+
+    def _frames(self, times, n):
+        """times 를 보간하는 데 필요한 프레임 구간 [lo, hi) 와 그 시각 축"""
+        frames = np.asarray(times) * self.sr / self.hop_length
+        lo = min(max(int(np.floor(frames.min())) - 1, 0), n - 1)
+        hi = max(min(int(np.ceil(frames.max())) + 2, n), lo + 1)
+        return lo, hi, librosa.frames_to_time(np.arange(lo, hi), sr=self.sr,
+                                              hop_length=self.hop_length)
+
+    def _interp(self, values, times):
+        """np.interp(times, 프레임 시각, values) – 필요한 프레임 구간만 잘라서"""
+        lo, hi, axis = self._frames(times, len(values))
+        return np.interp(times, axis, values[lo:hi])
+
+    # ---- 단계 ----------------------------------------------------
+    def _candidates(self, env, beats, lo, hi, last):
+        """[lo, hi) 프레임의 후보 시각 = 비트 ∪ 온셋(backtrack) ∪ 국소 최대"""
+        start = max(lo - 4 * self.lag, 0)
+        part = env[start:]
+        frames = np.empty(0, dtype=int)
+        if part.any():
+            onsets = librosa.onset.onset_detect(onset_envelope=part, sr=self.sr,
+                                                hop_length=self.hop_length,
+                                                backtrack=True, normalize=False)
+            peaks = argrelextrema(part, np.greater, order=4)[0]
+            frames = np.concatenate([onsets, peaks]) + start
+            frames = frames[(frames >= lo) & (frames < hi)]
+        return np.unique(np.concatenate([
+            beats_between(beats, self._time(lo), self._time(hi), last),
+            librosa.frames_to_time(frames, sr=self.sr, hop_length=self.hop_length)]))
+
+    def _merge(self, times, last):
+        for t in times.tolist():
+            if self._head is None:
+                self._head = t
+            elif t - self._head < CLOSE_EVENT_THR:
+                self._head = (self._head + t) / 2.0
+            else:
+                self._merged.append(self._head)
+                self._head = t
+        if last and self._head is not None:
+            self._merged.append(self._head)
+            self._head = None
+
+    def _prune(self, env, safe, last):
+        """끝난 WINDOW_SEC 창마다 에너지 비례 상한으로 솎기 (adaptive_prune_density 와 같은 규칙)"""
+        merged = np.asarray(self._merged, dtype=float)
+        if last:
+            n_windows = len(np.arange(0, self._time(len(env) - 1) + WINDOW_SEC, WINDOW_SEC)) - 1
+            if n_windows == 0:
+                self._merged = []
+                return merged
+        kept, used = [], 0
+        while True:
+            lo, hi = self._window * WINDOW_SEC, (self._window + 1) * WINDOW_SEC
+            if (last and self._window >= n_windows) or (not last and hi > safe):
+                break
+            end = int(np.searchsorted(merged, hi))
+            w_times = merged[used:end]
+            w_times = w_times[w_times >= lo]
+            used = end
+            centre = float(self._interp(env, [(lo + hi) / 2])[0])
+            self._e_range = [min(self._e_range[0], centre), max(self._e_range[1], centre)]
+            e_min, e_max = self._e_range
+            local_fac = 1 + (centre - e_min) / (e_max - e_min + 1e-8) * (MAX_FACTOR - 1)
+            limit = int(WINDOW_SEC * self.target_density * local_fac)
+            if len(w_times) > limit:
+                w_times = w_times[np.linspace(0, len(w_times) - 1, num=limit, dtype=int)]
+            kept.append(w_times)
+            self._window += 1
+        self._merged = [] if last else self._merged[used:]
+        self.final_until = self._window * WINDOW_SEC
+        return np.concatenate(kept) if kept else np.empty(0)
+
+    def _strong_thr(self) -> float:
+        """지금까지 온셋의 70 백분위 (히스토그램 칸 중앙)"""
+        cum = np.cumsum(self._hist)
+        k = int(np.searchsorted(cum, 0.7 * cum[-1]))
+        return (k + 0.5) / STRENGTH_BINS
+
+    def _events(self, times, env, beats) -> List[Dict]:
+        if times.size == 0:
+            return []
+        lo, hi, axis = self._frames(times, len(env))
+        c_min, c_max = self._c_range
+        centroid_norm = (self._cent.view[lo:hi] - c_min) / (c_max - c_min + 1e-8)
+        is_strong, lanes = assign_lanes(times, beats, env[lo:hi], axis, self._strong_thr(),
+                                        centroid_norm, axis,
+                                        first_id=self._next_id, counts=self._rr)
+        events = [
+            {
+                "id"  : i,
+                "time": round(t, 4),
+                "type": "strong" if strong else "normal",
+                "lane": lane,
+            }
+            for i, (t, strong, lane) in enumerate(
+                zip(times.tolist(), is_strong.tolist(), lanes.tolist()), start=self._next_id)
+        ]
+        self._next_id += len(events)
+        return events
+
+    # ---- PUBLIC --------------------------------------------------
+    def feed(self, onset_env, centroid, beat_times, last=False) -> List[Dict]:
+        """다음 구간의 특징 → 이번에 확정된 노트 (last=True 면 남은 노트 전부)"""
+        self._env.extend(onset_env)
+        self._cent.extend(centroid)
+        self._beats.extend(beat_times)
+        env, beats = self._env.view, self._beats.view
+        if len(onset_env):
+            self._hist += np.histogram(np.clip(onset_env, 0, 1), bins=STRENGTH_BINS,
+                                       range=(0, 1))[0]
+        if len(centroid):
+            self._c_range = [min(self._c_range[0], float(np.min(centroid))),
+                             max(self._c_range[1], float(np.max(centroid)))]
+        bpm = self.tempo_tracker.update(env, last)
+        if len(env) == 0:
+            return []
+
+        bound = len(env) if last else max(self._done, len(env) - self.lag)
+        times = self._candidates(env, beats, self._done, bound, last)
+        self._done = bound
+        pending = np.sort(np.concatenate([self._pending, snap_to_grid(times, beats, bpm)]))
+        cut = np.inf if last else self._time(bound) - SNAP_TOL
+        self._pending = pending[pending >= cut]
+        self._merge(pending[pending < cut], last)
+
+        safe = cut if self._head is None else min(self._head, cut)
+        return self._events(self._prune(env, safe, last), env, beats)
+
+
+def chart_from_features(feats: BeatmapFeatures, num_lanes: int = NUM_LANES,
+                        target_density: float = TARGET_DENSITY,
+                        progress: Optional[Callable[[str], None]] = None):
+    """BeatmapFeatures → 비트맵 dict (스냅·병합·밀도·레인, 수 ms)"""
+    sr, hop     = feats.sr, feats.hop_length
+    beat_times  = feats.beat_times
+    onset_env   = feats.onset_env
+    bpm         = feats.tempo
+    all_times   = gather_times(beat_times, onset_env, sr, hop)
+
+    snapped     = snap_to_grid(all_times, beat_times, bpm)
+    snapped     = merge_close(np.sort(snapped))          # 병합 thr 0.02 초
+    time_axis   = librosa.frames_to_time(np.arange(len(onset_env)), sr=sr, hop_length=hop)
+    final_times = adaptive_prune_density(snapped, onset_env, time_axis,
+                                         target_density, WINDOW_SEC, MAX_FACTOR)
+
+    report_progress(progress, "lanes")
+    # ---------- Spectral Centroid (lane 후보 값) ----------
+    centroid        = feats.centroid
+    centroid_norm   = (centroid - centroid.min()) / (centroid.ptp() + 1e-8)
+    frame_times     = librosa.frames_to_time(np.arange(len(centroid_norm)), sr=sr, hop_length=hop)
+
+    # 강도 기준선 ---------------------------------------------------
+    strong_thr  = np.percentile(onset_env, 70)
+
+    is_strong, lanes = assign_lanes(final_times, beat_times,
+                                    onset_env, time_axis, strong_thr,
+                                    centroid_norm, frame_times)
+
+    events = [
+        {
+            "id"  : i,
+            "time": round(t, 4),
+            "type": "strong" if strong else "normal",
+            "lane": lane,
+        }
+        for i, (t, strong, lane) in enumerate(
+            zip(np.asarray(final_times, dtype=float).tolist(),
+                is_strong.tolist(), lanes.tolist()), start=1)
+    ]
+
+    return {"tempo": bpm, "lanes": num_lanes, "events": events}
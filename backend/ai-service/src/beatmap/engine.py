@@ -0,0 +1,233 @@
+# backend/ai-service/src/beatmap/engine.py
+"""make_beatmap 실행 엔진
+
+ANALYSIS_EXECUTOR=thread  (기본) : 호출한 스레드에서 그대로 실행
+ANALYSIS_EXECUTOR=process        : ProcessPoolExecutor 로 실행
+  - 워커는 시작 시 librosa / madmom 을 import 하고 비트 모델을 한 번 만들어 둔다
+  - 디코딩된 y 는 pickle 대신 공유 메모리(SharedMemory)로 넘긴다
+  - 워커 하나는 한 번에 분석 하나만 돌리므로 동시에 맡기는 작업 수 = 워커 수
+    (초과 요청은 호출 스레드에서 대기 → 프로세스 큐에 대용량 작업이 쌓이지 않음)
+thread 모드의 동시 실행 수는 워커 수 × ANALYSIS_PER_WORKER (capacity, 승인 제어 슬롯 기준)
+
+HPSS·sosfiltfilt·RNN·파이썬 루프가 GIL 을 잡고 있어 스레드풀로는 코어 하나만 쓰는
+문제를 피하기 위한 것이다.
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# ──────────────────────────────────────────────────────────────
+# 워커 프로세스 측
+# ──────────────────────────────────────────────────────────────
+def _init_worker():
+    """무거운 import · 모델 생성 · numba JIT 를 미리 끝내 둔다"""
+    import librosa
+    from models.registry import model_registry
+
+    model_registry.warm_up()
+    noise = np.random.default_rng(0).standard_normal(22050).astype(np.float32)
+    librosa.onset.onset_strength(y=noise, sr=22050)
+    logger.info("[engine] 워커 %d 준비 완료", os.getpid())
+
+
+def _warm() -> int:
+    return os.getpid()
+
+
+def _run_shared(shm_name: str, shape, dtype: str, sr: int, task: str,
+                kwargs: Dict, progress_q=None):
+    """task = "make_beatmap" (비트맵 dict) | "extract_features" (BeatmapFeatures)"""
+    import beatmap.analysis
+
+    # spawn 워커는 부모의 resource_tracker 를 공유하므로 unlink 는 부모만 한다
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        y = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        progress = progress_q.put if progress_q is not None else None
+        result = getattr(beatmap.analysis, task)(y, sr, progress=progress, **kwargs)
+        del y
+        return result
+    finally:
+        shm.close()
+
+
+def _run_stream(path: str, sr: int, progress_q=None):
+    from audio.converters import stream_pcm
+    from beatmap.streaming import extract_features_streaming
+
+    progress = progress_q.put if progress_q is not None else None
+    return extract_features_streaming(stream_pcm(path, sr), sr, progress=progress)
+
+
+# ──────────────────────────────────────────────────────────────
+# 부모 프로세스 측
+# ──────────────────────────────────────────────────────────────
+class AnalysisEngine:
+    def __init__(self, mode: str = "thread", workers: Optional[int] = None,
+                 per_worker: int = 1, max_tasks_per_child: Optional[int] = None):
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        # process 워커는 작업을 하나씩만 실행 – 더 맡겨 봐야 풀 큐에서 기다릴 뿐
+        self.per_worker = 1 if mode == "process" else per_worker
+        self.max_tasks_per_child = max_tasks_per_child
+        self.inflight = 0
+
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+
+    @classmethod
+    def from_env(cls) -> "AnalysisEngine":
+        workers = int(os.getenv("ANALYSIS_WORKERS", "0")) or None
+        max_tasks = int(os.getenv("ANALYSIS_MAX_TASKS_PER_CHILD", "0")) or None
+        return cls(mode=os.getenv("ANALYSIS_EXECUTOR", "thread"),
+                   workers=workers,
+                   per_worker=int(os.getenv("ANALYSIS_PER_WORKER", "1")),
+                   max_tasks_per_child=max_tasks)
+
+    # ──────────────────────────────────────────────────────────────
+    # PUBLIC
+    # ──────────────────────────────────────────────────────────────
+    @property
+    def capacity(self) -> int:
+        """실제로 동시에 실행되는 분석 수"""
+        return self.workers * self.per_worker
+
+    def start(self):
+        """process 모드면 워커를 전부 띄워 미리 데워 둔다"""
+        if self.mode != "process":
+            return
+        pool = self._ensure_pool()
+        pids = {f.result() for f in [pool.submit(_warm) for _ in range(self.workers)]}
+        logger.info("[engine] process 워커 %d개 가동 (%s)", len(pids), sorted(pids))
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None
+
+    def make_beatmap(self, y: np.ndarray, sr: int, num_lanes: Optional[int] = None,
+                     progress: Optional[Callable[[str], None]] = None) -> Dict:
+        """동기 호출 – 스레드풀(run_in_threadpool)에서 부르는 것을 전제로 한다"""
+        from beatmap.analysis import make_beatmap
+        from beatmap.charting import NUM_LANES
+
+        num_lanes = num_lanes or NUM_LANES
+        with self._slots:
+            with self._lock:
+                self.inflight += 1
+            try:
+                if self.mode != "process":
+                    return make_beatmap(y, sr, num_lanes=num_lanes, progress=progress)
+                return self._run_in_pool(y, sr, "make_beatmap",
+                                         {"num_lanes": num_lanes}, progress)
+            finally:
+                with self._lock:
+                    self.inflight -= 1
+
+    def extract_features(self, y: np.ndarray, sr: int,
+                         progress: Optional[Callable[[str], None]] = None):
+        """비싼 분석 단계만 실행해 BeatmapFeatures 반환 (차트는 호출 측에서 여러 번)"""
+        from beatmap.analysis import extract_features
+
+        with self._slots:
+            with self._lock:
+                self.inflight += 1
+            try:
+                if self.mode != "process":
+                    return extract_features(y, sr, progress=progress)
+                return self._run_in_pool(y, sr, "extract_features", {}, progress)
+            finally:
+                with self._lock:
+                    self.inflight -= 1
+
+    def extract_features_stream(self, path: str, sr: int,
+                                progress: Optional[Callable[[str], None]] = None):
+        """긴 곡용 – 파일을 블록 단위로 흘려 읽으며 특징 추출 (전체 파형을 올리지 않음)"""
+        with self._slots:
+            with self._lock:
+                self.inflight += 1
+            try:
+                if self.mode != "process":
+                    from audio.converters import stream_pcm
+                    from beatmap.streaming import extract_features_streaming
+                    return extract_features_streaming(stream_pcm(path, sr), sr,
+                                                      progress=progress)
+                pool = self._ensure_pool()
+                progress_q = self._manager.Queue() if progress is not None else None
+                fut = pool.submit(_run_stream, str(path), int(sr), progress_q)
+                return self._wait(fut, progress_q, progress)
+            finally:
+                with self._lock:
+                    self.inflight -= 1
+
+    def stats(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "workers": self.workers if self.mode == "process" else None,
+            "per_worker": self.per_worker,
+            "capacity": self.capacity,
+            "inflight": self.inflight,
+        }
+
+    # ──────────────────────────────────────────────────────────────
+    # INTERNAL
+    # ──────────────────────────────────────────────────────────────
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # uvicorn 스레드가 떠 있는 상태에서 fork 는 위험하므로 spawn 사용
+                ctx = multiprocessing.get_context("spawn")
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=ctx,
+                    initializer=_init_worker,
+                    max_tasks_per_child=self.max_tasks_per_child,
+                )
+                self._manager = ctx.Manager()      # 진행 단계 전달용
+            return self._pool
+
+    def _run_in_pool(self, y, sr, task, kwargs, progress):
+        pool = self._ensure_pool()
+        y = np.ascontiguousarray(y, dtype=np.float32)
+        shm = shared_memory.SharedMemory(create=True, size=max(y.nbytes, 1))
+        progress_q = self._manager.Queue() if progress is not None else None
+        try:
+            np.ndarray(y.shape, dtype=y.dtype, buffer=shm.buf)[:] = y
+            fut = pool.submit(_run_shared, shm.name, y.shape, y.dtype.str,
+                              int(sr), task, kwargs, progress_q)
+            return self._wait(fut, progress_q, progress)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    @staticmethod
+    def _wait(fut, progress_q, progress):
+        """워커 결과를 기다리는 동안 진행 단계를 호출 스레드의 콜백으로 옮긴다"""
+        if progress_q is not None:
+            while not fut.done():
+                try:
+                    progress(progress_q.get(timeout=0.2))
+                except queue.Empty:
+                    pass
+            while not progress_q.empty():
+                progress(progress_q.get_nowait())
+        return fut.result()
+
+
+analysis_engine = AnalysisEngine.from_env()
@@ -0,0 +1,129 @@
+# backend/ai-service/src/beatmap/features.py
+"""분석 특징(BeatmapFeatures) 캐시 · 파일 포맷
+
+차트 생성(스냅·밀도·레인)은 수 ms 지만 특징 추출(STFT·HPSS·비트)은 수 초가 걸린다.
+- FeatureCache : 최근 곡의 특징을 메모리 LRU 로 보관 (난이도별 차트 팬아웃용)
+- .feat 파일   : 곡별 특징을 비트맵 JSON 옆에 저장해 파라미터 변경 시 재분석 없이 재차트
+
+.feat 레이아웃 (리틀 엔디언)
+    [0:8)   매직 b"BMFEAT01"
+    [8:12)  uint32 헤더 길이 N
+    [12:12+N) JSON 헤더 {"meta": {...}, "arrays": {이름: {offset, dtype, shape}}}
+    이후    배열 원본 바이트, 각각 64 바이트 정렬 → np.memmap 으로 복사 없이 읽는다
+"""
+
+import json
+import os
+import struct
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+FEATURE_MAGIC = b"BMFEAT01"
+_ALIGN = 64
+
+
+class FeatureCache:
+    """스레드 안전 메모리 LRU – 항목 하나는 곡 길이에 비례하는 1차원 배열 몇 개"""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, Any]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            feats = self._items.get(key)
+            if feats is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return feats
+
+    def put(self, key: str, feats: Any):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._items[key] = feats
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# ──────────────────────────────────────────────────────────────
+# .feat 파일
+# ──────────────────────────────────────────────────────────────
+def feature_path(save_dir: str, digest: str) -> str:
+    """오디오 해시의 .feat 경로 – 난이도별 비트맵이 같은 파일을 공유한다"""
+    return os.path.join(save_dir, f"{digest}.feat")
+
+
+def _aligned(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def write_features(path: str, meta: Dict, arrays: Dict[str, np.ndarray]):
+    """스칼라 meta + 1차원 배열들을 .feat 로 원자적으로 저장"""
+    arrays = {k: np.ascontiguousarray(v) for k, v in arrays.items()}
+    # 헤더 길이가 오프셋에 영향을 주므로 자리 수가 안정될 때까지 계산
+    header_len = 0
+    while True:
+        offset = _aligned(len(FEATURE_MAGIC) + 4 + header_len)
+        layout = {}
+        for name, arr in arrays.items():
+            layout[name] = {"offset": offset, "dtype": arr.dtype.str, "shape": list(arr.shape)}
+            offset = _aligned(offset + arr.nbytes)
+        header = json.dumps({"meta": meta, "arrays": layout}).encode()
+        if len(header) == header_len:
+            break
+        header_len = len(header)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "wb") as fp:
+            fp.write(FEATURE_MAGIC + struct.pack("<I", len(header)) + header)
+            for name, arr in arrays.items():
+                fp.seek(layout[name]["offset"])
+                fp.write(memoryview(arr).cast("B"))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read_features(path: str, mmap: bool = True) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """(meta, 배열 dict) 반환 – mmap=True 면 배열은 읽기 전용 메모리 맵 뷰"""
+    with open(path, "rb") as fp:
+        if fp.read(len(FEATURE_MAGIC)) != FEATURE_MAGIC:
+            raise ValueError(f"feature 파일이 아닙니다: {path}")
+        (header_len,) = struct.unpack("<I", fp.read(4))
+        header = json.loads(fp.read(header_len))
+        if not mmap:
+            fp.seek(0)
+            buf = fp.read()
+    if mmap:
+        buf = np.memmap(path, dtype=np.uint8, mode="r")
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        arrays[name] = np.frombuffer(buf, dtype=dtype, count=count,
+                                     offset=spec["offset"]).reshape(spec["shape"])
+    return header["meta"], arrays
@@ -0,0 +1,163 @@
+# backend/ai-service/src/beatmap/store.py
+"""비트맵 JSON 저장 유틸리티
+
+모든 비트맵 쓰기는 여기를 거친다. 임시 파일에 쓴 뒤 os.replace 로 교체하므로
+정적 서빙(/beatmaps) 중인 클라이언트가 반쯤 쓰인 JSON 을 받는 일이 없다.
+
+JSON(<uuid>.json) 옆에 같은 이름의 컬럼형 바이너리(<uuid>.bmap, beatmap/binary.py)도
+함께 쓴다. 바이너리를 먼저 쓰고 JSON 을 나중에 교체하므로 JSON 이 보이면 .bmap 도 있다.
+예전에 저장된 JSON 은 처음 요청될 때 binary_path 가 변환한다.
+
+정적 서빙(api/static_files.py)이 요청마다 압축하지 않도록 JSON 의 압축본
+<uuid>.json.gz (와 brotli 가 설치돼 있으면 <uuid>.json.br) 도 저장 시점에 만든다.
+압축본은 JSON 다음에 쓰므로, 덮어쓰기 도중 JSON 보다 오래된 압축본은 서빙 측이 무시한다.
+
+저장·삭제 시 카탈로그(beatmap/catalog.py)도 함께 갱신한다.
+
+미리보기 비트맵(preview=True)은 <uuid>.preview 표시 파일을 JSON 보다 먼저 만들고,
+같은 id 로 본 결과를 저장할 때 JSON · 압축본을 다 쓴 뒤 지운다. 정적 서빙은 표시가
+있는 동안 immutable 대신 매번 재검증하도록 응답한다.
+"""
+
+import gzip
+import json
+import logging
+import os
+import sqlite3
+import uuid
+from typing import Dict, List, Optional
+
+from beatmap import binary
+from beatmap.catalog import catalog_for
+from beatmap.features import feature_path
+
+try:
+    import brotli
+except ImportError:                      # optional – 없으면 gzip 만
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+GZIP_LEVEL = int(os.getenv("BEATMAP_GZIP_LEVEL", "9"))
+BROTLI_QUALITY = int(os.getenv("BEATMAP_BROTLI_QUALITY", "9"))   # 11 은 수백 ms
+# 파일명 접미사 → Content-Encoding (서빙 측 우선순위 순)
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+
+def new_beatmap_id() -> str:
+    """UUID 기반 비트맵 파일명 생성"""
+    return f"{uuid.uuid4()}.json"
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "wb") as fp:
+            fp.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _bmap_name(beatmap_id: str) -> str:
+    return f"{os.path.splitext(beatmap_id)[0]}.bmap"
+
+
+def _preview_name(beatmap_id: str) -> str:
+    return f"{beatmap_id.split('.', 1)[0]}.preview"
+
+
+def is_preview(save_dir: str, name: str) -> bool:
+    """name(<uuid>.json · .json.gz · .bmap 등)이 아직 미리보기 비트맵인지"""
+    return os.path.exists(os.path.join(save_dir, _preview_name(name)))
+
+
+def _write_binary(path: str, beatmap: Dict) -> bool:
+    try:
+        _write_atomic(path, binary.encode(beatmap))
+        return True
+    except ValueError as e:
+        logger.info("[store] 바이너리 생략 %s: %s", os.path.basename(path), e)
+        return False
+
+
+def compress_variants(path: str, data: bytes):
+    """path 내용(data)의 .gz / .br 압축본을 원자적으로 저장"""
+    _write_atomic(path + ENCODINGS["gzip"], gzip.compress(data, GZIP_LEVEL, mtime=0))
+    if brotli is not None:
+        _write_atomic(path + ENCODINGS["br"], brotli.compress(data, quality=BROTLI_QUALITY))
+
+
+def _catalog(save_dir: str, method: str, *args):
+    try:
+        getattr(catalog_for(save_dir), method)(*args)
+    except sqlite3.Error as e:
+        logger.warning("[store] 카탈로그 %s 실패 %s: %s", method, args[0], e)
+
+
+def save_beatmap(save_dir: str, beatmap: Dict, beatmap_id: Optional[str] = None,
+                 meta: Optional[Dict] = None, preview: bool = False) -> str:
+    """비트맵을 save_dir 에 원자적으로 저장(JSON + 압축본 + .bmap)하고 파일명(beatmap_id)을 반환
+
+    meta: 카탈로그용 {title, source, source_url, video_id, duration} (생략 시 기존 값 유지)
+    preview: 나중에 같은 id 로 교체될 미리보기 (표시 파일은 preview=False 저장 시 제거)
+    """
+    os.makedirs(save_dir, exist_ok=True)
+    beatmap_id = beatmap_id or new_beatmap_id()
+    path = os.path.join(save_dir, beatmap_id)
+    marker = os.path.join(save_dir, _preview_name(beatmap_id))
+    if preview:
+        _write_atomic(marker, b"")
+    if not _write_binary(os.path.join(save_dir, _bmap_name(beatmap_id)), beatmap):
+        # 덮어쓰기(미리보기 교체) 시 옛 바이너리가 남아 JSON 과 어긋나지 않도록
+        _remove(os.path.join(save_dir, _bmap_name(beatmap_id)))
+    data = json.dumps(beatmap, ensure_ascii=False).encode("utf-8")
+    _write_atomic(path, data)
+    compress_variants(path, data)
+    if not preview:
+        _remove(marker)
+    _catalog(save_dir, "put", beatmap_id, beatmap, meta)
+    return beatmap_id
+
+
+def binary_path(save_dir: str, beatmap_id: str) -> Optional[str]:
+    """beatmap_id 의 .bmap 경로 – 없으면 JSON 에서 만들고, 표현 불가면 None"""
+    path = os.path.join(save_dir, _bmap_name(beatmap_id))
+    if os.path.isfile(path):
+        return path
+    try:
+        with open(os.path.join(save_dir, beatmap_id), "r", encoding="utf-8") as fp:
+            beatmap = json.load(fp)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(beatmap, dict):
+        return None
+    return path if _write_binary(path, beatmap) else None
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def beatmap_files(save_dir: str, beatmap_id: str) -> List[str]:
+    """비트맵 하나가 디스크에 남기는 파일 경로 – JSON, 압축본, .bmap (캐시 크기 · 삭제 기준)"""
+    path = os.path.join(save_dir, beatmap_id)
+    return ([path] + [path + suffix for suffix in ENCODINGS.values()]
+            + [os.path.join(save_dir, _bmap_name(beatmap_id))])
+
+
+def delete_beatmap(save_dir: str, beatmap_id: str, feature_digest: Optional[str] = None):
+    """비트맵 JSON 과 파생 파일(.bmap, 압축본)을 모두 삭제
+
+    feature_digest: 주면 <digest>.feat 도 삭제 (그 특징을 쓰는 다른 비트맵이 없을 때만 넘길 것)
+    """
+    for path in beatmap_files(save_dir, beatmap_id):
+        _remove(path)
+    _remove(os.path.join(save_dir, _preview_name(beatmap_id)))
+    if feature_digest:
+        _remove(feature_path(save_dir, feature_digest))
+    _catalog(save_dir, "remove", beatmap_id)
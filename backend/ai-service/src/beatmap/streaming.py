@@ -0,0 +1,325 @@
+# backend/ai-service/src/beatmap/streaming.py
+"""블록 단위 스트리밍 분석 (긴 곡 · DJ 믹스 · 앨범)
+
+오디오를 STREAM_BLOCK_SEC 블록으로 나누고 앞뒤 STREAM_MARGIN_SEC 만큼 겹쳐 분석한다.
+각 블록에서는 프레임 단위 특징(perc/harm 온셋, centroid, 비트 활성도)만 뽑아
+겹침 구간을 잘라낸 뒤 이어 붙이고, 파형·STFT·HPSS 는 블록이 끝나면 버린다.
+→ 최대 메모리는 블록 크기로 고정되고, 곡 길이에 비례해 늘어나는 것은
+   초당 수십 프레임짜리 1차원 특징 배열뿐이다.
+
+블록 경계 상태:
+- HPSS 메디안 필터(31 프레임)·온셋 lag·STFT 센터 패딩은 겹침 여백 안에서 흡수
+- 비트는 블록별 온셋(librosa) 또는 RNN 활성도(madmom)를 이어 붙인 뒤
+  마지막에 전체 시퀀스로 한 번 추적 (DBN/DP 는 저렴하고 곡 전체 문맥이 필요)
+
+구간 출력(iter_segments, /segments 전용): 곡 전체를 기다리지 않고 SEGMENT_SEC 마다 차트를
+내보낸다. SPAN_SEC 블록(앞뒤 SPAN_MARGIN_SEC + FEATURE_CONTEXT 여백)마다 프레임 특징과
+구간 비트를 뽑아 SpanAssembler 로 정규화하고, 구간 순서대로 SpanCharter 에 먹인다.
+통계가 지금까지 본 구간까지라 make_beatmap(곡 전체 통계)과 노트가 조금 다르지만,
+청크 크기·구간 길이와 무관하게 같은 노트가 나온다.
+"""
+
+import logging
+import os
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import librosa
+import numpy as np
+
+from audio.converters import stream_pcm
+from scipy.signal import medfilt
+
+from beatmap.analysis import MADMOM_SR, AnalysisContext, detect_beats, resample_audio
+from beatmap.charting import (NUM_LANES, SPAN_MARGIN_SEC, SPAN_SEC, TARGET_DENSITY,
+                              BeatmapFeatures, SpanCharter, beats_between,
+                              chart_from_features, estimate_tempo, frame_time,
+                              mix_onset_envs, report_progress, span_chunks, span_length)
+from models.registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+STREAM_BLOCK_SEC = float(os.getenv("STREAM_BLOCK_SEC", "30"))
+STREAM_MARGIN_SEC = float(os.getenv("STREAM_MARGIN_SEC", "5"))
+SEGMENT_SEC = float(os.getenv("SEGMENT_SEC", "15"))
+MADMOM_FPS = 100
+FEATURE_CONTEXT = 32    # 구간 블록 프레임 특징에 붙이는 여백(프레임, STFT·HPSS·온셋 lag)
+# 블록 하나가 메모리에 올리는 오디오 길이(초) – 승인 제어 resident_sec
+RESIDENT_SEC = STREAM_BLOCK_SEC + 2 * STREAM_MARGIN_SEC
+SEGMENT_RESIDENT_SEC = SPAN_SEC + 2 * SPAN_MARGIN_SEC + 1
+
+Block = Tuple[int, int, int, np.ndarray, bool]   # (pad_start, core_start, core_end, padded, last)
+
+
+def iter_blocks(chunks: Iterable[np.ndarray], block: int, margin: int) -> Iterator[Block]:
+    """임의 크기 청크 스트림 → 앞뒤 margin 이 붙은 고정 크기 블록
+
+    core 구간은 겹치지 않고 이어지며, 버퍼에는 블록 + 여백 + 청크 하나만 남는다.
+    """
+    buf = np.empty(0, dtype=np.float32)
+    buf_start = 0                      # buf[0] 의 전역 샘플 위치
+    core = 0
+    for chunk in chunks:
+        buf = np.concatenate([buf, np.asarray(chunk, dtype=np.float32)])
+        while buf_start + len(buf) >= core + block + margin:
+            pad0 = max(core - margin, 0)
+            yield pad0, core, core + block, buf[pad0 - buf_start:core + block + margin - buf_start], False
+            core += block
+            drop = max(core - margin, 0) - buf_start
+            buf = buf[drop:]
+            buf_start += drop
+    total = buf_start + len(buf)
+    if total > core:
+        pad0 = max(core - margin, 0)
+        yield pad0, core, total, buf[pad0 - buf_start:], True
+
+
+class _BeatStream:
+    """블록별 비트 근거(madmom 활성도 또는 온셋)를 모아 마지막에 추적"""
+
+    def __init__(self, sr: int, hop_length: int):
+        self.sr = sr
+        self.hop_length = hop_length
+        self.madmom = model_registry.available("madmom_beats")
+        self._parts: List[np.ndarray] = []
+
+    def feed(self, ctx: AnalysisContext, pad0: int, core: int, core_end: int,
+             last: bool, f0: int, f1: int):
+        if not self.madmom:
+            self._parts.append(ctx.onset_env("full")[f0:f1])
+            return
+        with model_registry.use("madmom_beats") as (rnn, _dbn):
+            act = np.asarray(rnn(resample_audio(ctx.y, self.sr, MADMOM_SR)))
+        a0 = int(round((core - pad0) / self.sr * MADMOM_FPS))
+        a1 = None if last else a0 + int(round((core_end - core) / self.sr * MADMOM_FPS))
+        self._parts.append(act[a0:a1])
+
+    def finish(self) -> np.ndarray:
+        env = np.concatenate(self._parts) if self._parts else np.zeros(1)
+        if self.madmom:
+            with model_registry.use("madmom_beats") as (_rnn, dbn):
+                logger.info("✅ madmom beat detector 사용 (streaming)")
+                return np.asarray(dbn(env.astype(np.float32)), dtype=float)
+        _, beat_frames = librosa.beat.beat_track(onset_envelope=env, sr=self.sr,
+                                                 hop_length=self.hop_length)
+        return librosa.frames_to_time(beat_frames, sr=self.sr, hop_length=self.hop_length)
+
+
+def extract_features_streaming(chunks: Iterable[np.ndarray], sr: int,
+                               block_sec: float = STREAM_BLOCK_SEC,
+                               margin_sec: float = STREAM_MARGIN_SEC,
+                               hop_length: int = 512,
+                               progress: Optional[Callable[[str], None]] = None) -> BeatmapFeatures:
+    """청크 스트림 → BeatmapFeatures (extract_features 의 블록 버전)"""
+    # 블록·여백을 hop 배수로 맞춰야 블록별 프레임 격자가 전역 격자와 일치한다
+    block = max(1, int(block_sec * sr) // hop_length) * hop_length
+    margin = max(1, int(margin_sec * sr) // hop_length) * hop_length
+
+    report_progress(progress, "beats")
+    beats = _BeatStream(sr, hop_length)
+    perc, harm, cent = [], [], []
+    total = 0
+    for pad0, core, core_end, padded, last in iter_blocks(chunks, block, margin):
+        ctx = AnalysisContext(padded, sr, hop_length=hop_length)
+        f0 = (core - pad0) // hop_length
+        f1 = None if last else f0 + (core_end - core) // hop_length
+        perc.append(ctx.onset_env("perc")[f0:f1])
+        harm.append(ctx.onset_env("harm")[f0:f1])
+        ctx.drop("hpss", "mag:harm", "mag:perc")
+        cent.append(ctx.centroid()[f0:f1])
+        beats.feed(ctx, pad0, core, core_end, last, f0, f1)
+        total = core_end
+        del ctx, padded
+
+    if total == 0:
+        raise ValueError("디코딩된 오디오가 비어 있습니다")
+    beat_times = beats.finish()
+    report_progress(progress, "onsets")
+    onset_env = mix_onset_envs(np.concatenate(perc), np.concatenate(harm))
+    return BeatmapFeatures(
+        sr=sr, hop_length=hop_length, duration=total / sr,
+        tempo=estimate_tempo(onset_env, sr, hop_length),
+        beat_times=np.asarray(beat_times, dtype=float),
+        onset_env=onset_env, centroid=np.concatenate(cent),
+    )
+
+
+def make_beatmap_streaming(path: str, sr: int, num_lanes: int = NUM_LANES,
+                           progress: Optional[Callable[[str], None]] = None):
+    """파일을 ffmpeg 로 흘려 읽으며 분석 – 메모리가 곡 길이에 비례하지 않음"""
+    feats = extract_features_streaming(stream_pcm(path, sr), sr, progress=progress)
+    return chart_from_features(feats, num_lanes, progress=progress)
+
+
+
+# ──────────────────────────────────────────────────────────────
+# 구간 특징 (/segments)
+# ──────────────────────────────────────────────────────────────
+def margin_length(sr, hop_length=512) -> int:
+    """SPAN_MARGIN_SEC 의 프레임 수"""
+    return max(1, int(SPAN_MARGIN_SEC * sr) // hop_length)
+
+
+def block_frames(ctx: AnalysisContext):
+    """블록 → (메디안 필터한 perc 온셋, harm 온셋, 전체 대역 온셋, centroid) 프레임"""
+    perc = medfilt(ctx.onset_env("perc"), kernel_size=5)
+    harm = medfilt(ctx.onset_env("harm"), kernel_size=5)
+    ctx.drop("hpss", "mag:harm", "mag:perc")      # 이후 단계에선 불필요
+    return perc, harm, ctx.onset_env("full"), ctx.centroid()
+
+
+def span_beats(y, sr, onset_env, p0: int, hop_length=512) -> np.ndarray:
+    """[p0, …) 프레임 블록의 비트 (곡 시각). y · onset_env 는 같은 블록"""
+    beats = detect_beats(y, sr, onset_env=onset_env, hop_length=hop_length)
+    return np.asarray(beats, dtype=float) + frame_time(p0, sr, hop_length)
+
+
+Span = Tuple[np.ndarray, np.ndarray, np.ndarray, bool]    # (onset_env, centroid, beats, last)
+
+
+class SpanAssembler:
+    """비트 추적 구간 → 차트 구간(SPAN_SEC) 특징
+
+    - 비트: 구간 [t0, t1) 안의 것만, 앞 구간 마지막 비트와 블록 비트 간격 절반보다
+      가까운 것은 버린다 (구간 경계 양쪽 블록이 같은 비트를 조금 다르게 잡는 경우)
+    - 온셋: perc/harm 을 차트 구간마다 지금까지의 min/max 로 0~1 정규화해 0.7/0.3 혼합
+    """
+
+    def __init__(self, sr, hop_length=512, w_perc=0.7, w_harm=0.3):
+        self.sr = sr
+        self.hop_length = hop_length
+        self.w_perc, self.w_harm = w_perc, w_harm
+        self.span = span_length(sr, hop_length)
+        self._range = np.array([[np.inf, -np.inf], [np.inf, -np.inf]])
+        self._last_beat = -np.inf
+
+    def _normalise(self, perc, harm):
+        for row, x in zip(self._range, (perc, harm)):
+            row[:] = min(row[0], x.min()), max(row[1], x.max())
+        (p_min, p_max), (h_min, h_max) = self._range
+        return (self.w_perc * (perc - p_min) / (p_max - p_min + 1e-8)
+                + self.w_harm * (harm - h_min) / (h_max - h_min + 1e-8))
+
+    def _keep_beats(self, beats, t0, t1, last):
+        if len(beats) == 0:
+            return beats
+        gap = 0.5 * float(np.median(np.diff(beats))) if len(beats) > 1 else 0.0
+        beats = beats_between(beats, t0, t1, last)
+        beats = beats[beats - self._last_beat >= gap]
+        if len(beats):
+            self._last_beat = float(beats[-1])
+        return beats
+
+    def add(self, c0: int, perc, harm, centroid, beats, last: bool) -> List[Span]:
+        """core 프레임 [c0, c0 + len(perc)) 의 특징 + 블록 비트 → 차트 구간 목록"""
+        sr, hop = self.sr, self.hop_length
+        c1 = c0 + len(perc)
+        beats = self._keep_beats(np.asarray(beats, dtype=float),
+                                 frame_time(c0, sr, hop), frame_time(c1, sr, hop), last)
+        out = []
+        for a, b, end in span_chunks(len(perc), self.span):
+            out.append((self._normalise(perc[a:b], harm[a:b]), centroid[a:b],
+                        beats_between(beats, frame_time(c0 + a, sr, hop),
+                                      frame_time(c0 + b, sr, hop), end),
+                        last and end))
+        return out
+
+
+class SpanStream:
+    """청크 스트림 → 차트 구간 특징 (onset_env, centroid, beat_times, last)
+
+    블록 분할은 청크 크기와 무관하다 (iter_blocks). 다 돈 뒤 duration 사용 가능.
+    """
+
+    def __init__(self, chunks: Iterable[np.ndarray], sr: int, hop_length: int = 512):
+        self.chunks = chunks
+        self.sr = sr
+        self.hop_length = hop_length
+        self.duration = 0.0
+        self.assembler = SpanAssembler(sr, hop_length)
+
+    def __iter__(self):
+        sr, hop = self.sr, self.hop_length
+        margin = margin_length(sr, hop)
+        total = 0
+        for pad0, core, core_end, padded, last in iter_blocks(
+                self.chunks, span_length(sr, hop) * hop, (margin + FEATURE_CONTEXT) * hop):
+            off, c0 = pad0 // hop, core // hop
+            ctx = AnalysisContext(padded, sr, hop_length=hop)
+            perc, harm, full, centroid = block_frames(ctx)
+            c1 = off + len(perc) if last else core_end // hop
+            p0, p1 = max(c0 - margin, 0), c1 if last else c1 + margin
+            beats = span_beats(padded[(p0 - off) * hop:(p1 - off) * hop], sr,
+                               full[p0 - off:p1 - off], p0, hop)
+            total = core_end
+            del ctx, padded
+            yield from self.assembler.add(c0, perc[c0 - off:c1 - off], harm[c0 - off:c1 - off],
+                                          centroid[c0 - off:c1 - off], beats, last)
+        if total == 0:
+            raise ValueError("디코딩된 오디오가 비어 있습니다")
+        self.duration = total / sr
+
+
+# ──────────────────────────────────────────────────────────────
+# 구간 출력
+# ──────────────────────────────────────────────────────────────
+def iter_segments(chunks: Iterable[np.ndarray], sr: int,
+                  segment_sec: float = SEGMENT_SEC,
+                  hop_length: int = 512, num_lanes: int = NUM_LANES,
+                  target_density: float = TARGET_DENSITY) -> Iterator[Dict]:
+    """청크 스트림 → 시간순 비트맵 구간 (slice_segments 와 같은 경계)
+
+    {"segment": i, "start": 초, "end": 초, "tempo", "lanes", "events", "last"}
+    구간 i 는 그 끝 시각까지의 노트가 확정되면(대략 끝 + 여백 + 밀도 창 하나) 나온다.
+    """
+    stream = SpanStream(chunks, sr, hop_length)
+    charter = SpanCharter(sr, hop_length, target_density)
+    pending: List[Dict] = []
+    index = 0
+
+    def segment(end, last):
+        nonlocal pending, index
+        cut = len(pending) if last else next(
+            (i for i, ev in enumerate(pending) if ev["time"] >= end), len(pending))
+        seg = {"segment": index, "start": round(index * segment_sec, 4),
+               "end": round(end, 4), "tempo": charter.tempo, "lanes": num_lanes,
+               "events": pending[:cut], "last": last}
+        pending = pending[cut:]
+        index += 1
+        return seg
+
+    for onset_env, centroid, beat_times, last in stream:
+        pending.extend(charter.feed(onset_env, centroid, beat_times, last))
+        if not last:
+            # 확정 시각이 경계를 넘었으면 곡이 경계 뒤로 이어진다 → 마지막 구간이 아님
+            while charter.final_until > (index + 1) * segment_sec:
+                yield segment((index + 1) * segment_sec, False)
+
+    duration = max(stream.duration, pending[-1]["time"] if pending else 0.0)
+    n = max(index + 1, int(np.ceil(duration / segment_sec)))
+    while index < n - 1:
+        yield segment((index + 1) * segment_sec, False)
+    yield segment(duration, True)
+
+
+def slice_segments(beatmap: Dict, duration: float,
+                   segment_sec: float = SEGMENT_SEC) -> Iterator[Dict]:
+    """이미 있는 비트맵을 iter_segments 와 같은 모양의 구간으로 나눈다 (캐시 적중 시)"""
+    events = beatmap.get("events") or []
+    duration = max(duration, events[-1]["time"] if events else 0.0)
+    n = max(1, int(np.ceil(duration / segment_sec)))
+    times = np.array([ev["time"] for ev in events], dtype=float)
+    for index in range(n):
+        start, end = index * segment_sec, (index + 1) * segment_sec
+        last = index == n - 1
+        lo = np.searchsorted(times, start)
+        hi = len(times) if last else np.searchsorted(times, end)
+        yield {"segment": index, "start": round(start, 4),
+               "end": round(duration if last else end, 4),
+               "tempo": beatmap.get("tempo"), "lanes": beatmap.get("lanes", NUM_LANES),
+               "events": events[lo:hi], "last": last}
+
+
+def join_segments(segments: List[Dict]) -> Dict:
+    """구간들을 하나의 비트맵으로 (템포는 마지막 구간의 곡 전체 추정치)"""
+    return {"tempo": segments[-1]["tempo"], "lanes": segments[-1]["lanes"],
+            "events": [ev for seg in segments for ev in seg["events"]]}
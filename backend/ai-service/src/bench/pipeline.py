@@ -0,0 +1,230 @@
+# backend/ai-service/src/bench/pipeline.py
+"""make_beatmap 단계별 벤치마크 (합성 오디오, 네트워크·샘플 파일 불필요)
+
+사용법 (src 디렉터리에서):
+    python -m bench.pipeline --seconds 180 --bpm 128 --density 0.6
+    python -m bench.pipeline --save-baseline /tmp/bench_base.json
+    python -m bench.pipeline --baseline /tmp/bench_base.json --tolerance 0.2
+
+시드 고정 합성 트랙(킥·스네어·하이햇 + 화음 패드)을 만들고, make_beatmap 과 같은 순서로
+preprocess_views → detect_beats(madmom / librosa) → mixed_onset_env → centroid
+→ gather_times → snap_merge → prune_density → assign_lanes (chart_from_features 와 같은 인자)
+를 각각 재고, /segments 경로(iter_segments 전체)도 한 단계로 잰다.
+단계마다 wall · CPU 시간과 단계 중 최대 RSS 를 출력한다.
+--repeat 회 반복 중 wall 최솟값을 쓴다.
+기준선과 비교해 wall 이 tolerance 비율 이상(그리고 5 ms 이상) 늘어난 단계가 있으면 종료 코드 1.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import threading
+import time
+import warnings
+
+import librosa
+import numpy as np
+
+from beatmap.analysis import detect_beats, mixed_onset_env, preprocess_views
+from beatmap.charting import (BEAT_TOL, MAX_FACTOR, NUM_LANES, TARGET_DENSITY, WINDOW_SEC,
+                              adaptive_prune_density, assign_lanes, estimate_tempo,
+                              gather_times, merge_close, snap_to_grid)
+from beatmap.streaming import iter_segments
+from models.registry import _rss_bytes, model_registry
+
+MIN_REGRESSION_SEC = 0.005
+SEPARATE_STAGES = {"iter_segments"}     # make_beatmap 합계(실시간 배율)에서 빼는 단계
+
+
+# ──────────────────────────────────────────────────────────────
+# 합성 오디오
+# ──────────────────────────────────────────────────────────────
+def synth_track(seconds: float, sr: int = 22050, bpm: float = 128.0,
+                density: float = 0.5, seed: int = 0) -> np.ndarray:
+    """density = 16분음표 자리마다 타격이 들어갈 확률 (킥·스네어는 박마다 고정)"""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sr)
+    y = np.zeros(n, dtype=np.float32)
+    t = np.arange(int(0.25 * sr)) / sr
+    kick = np.sin(2 * np.pi * 55 * t * np.exp(-t * 8)) * np.exp(-t * 18)
+    snare = rng.standard_normal(t.size) * np.exp(-t * 30) * 0.5
+    hat = rng.standard_normal(int(0.05 * sr)) * np.exp(-np.arange(int(0.05 * sr)) / sr * 90) * 0.25
+
+    def hit(at, sound):
+        i = int(at * sr)
+        if i < n:
+            seg = sound[:n - i]
+            y[i:i + seg.size] += seg
+
+    step = 60.0 / bpm / 4
+    for k in range(int(seconds / step)):
+        at = k * step
+        if k % 4 == 0:
+            hit(at, kick if (k // 4) % 2 == 0 else snare)
+        elif rng.random() < density:
+            hit(at, hat)
+
+    # 화음 패드 (2마디마다 근음 변경) – harm 성분
+    bar = 60.0 / bpm * 4
+    tt = np.arange(n) / sr
+    roots = 220.0 * 2 ** (rng.integers(0, 12, int(seconds / (2 * bar)) + 1) / 12)
+    f0 = roots[(tt // (2 * bar)).astype(int)]
+    pad = sum(np.sin(2 * np.pi * f0 * r * tt) for r in (1.0, 1.25, 1.5)) * 0.05
+    y += pad.astype(np.float32)
+    return y / (np.abs(y).max() + 1e-9)
+
+
+# ──────────────────────────────────────────────────────────────
+# 측정
+# ──────────────────────────────────────────────────────────────
+class _Stage:
+    """wall · CPU 시간과 구간 중 최대 RSS (5 ms 간격 샘플링)"""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self.peak = 0
+
+    def _poll(self):
+        while not self._stop.wait(0.005):
+            self.peak = max(self.peak, _rss_bytes())
+
+    def __enter__(self):
+        self.peak = _rss_bytes()
+        self._thread = threading.Thread(target=self._poll, daemon=True)
+        self._thread.start()
+        self.wall0, self.cpu0 = time.perf_counter(), time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall = time.perf_counter() - self.wall0
+        self.cpu = time.process_time() - self.cpu0
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_bytes())
+
+
+def run_once(y, sr):
+    """make_beatmap 과 같은 순서로 단계별 측정 – {단계: (wall, cpu, peak_rss)}"""
+    out = {}
+
+    def stage(name, fn):
+        with _Stage() as s:
+            result = fn()
+        out[name] = (s.wall, s.cpu, s.peak)
+        return result
+
+    views = stage("preprocess_views", lambda: preprocess_views(y, sr))
+    hop = views.hop_length
+    if model_registry.available("madmom_beats"):
+        stage("detect_beats[madmom]", lambda: detect_beats(views["full"], sr, ctx=views))
+    # 차트는 librosa 비트로 (madmom 유무와 무관하게 같은 이벤트 수)
+    beat_times = np.asarray(stage("detect_beats[librosa]", lambda: detect_beats(
+        views["full"], sr, ctx=views, use_madmom=False)), dtype=float)
+    onset_env = stage("mixed_onset_env", lambda: mixed_onset_env(views, sr))
+    views.drop("hpss", "mag:harm", "mag:perc")
+    centroid = stage("centroid", views.centroid)
+    bpm = estimate_tempo(onset_env, sr, hop)
+    times = stage("gather_times", lambda: gather_times(beat_times, onset_env, sr, hop))
+    snapped = stage("snap_merge", lambda: merge_close(np.sort(snap_to_grid(times, beat_times, bpm))))
+    time_axis = librosa.frames_to_time(np.arange(len(onset_env)), sr=sr, hop_length=hop)
+    final = stage("prune_density", lambda: adaptive_prune_density(
+        snapped, onset_env, time_axis, TARGET_DENSITY, WINDOW_SEC, MAX_FACTOR))
+    c_norm = (centroid - centroid.min()) / (centroid.ptp() + 1e-8)
+    frame_times = librosa.frames_to_time(np.arange(len(c_norm)), sr=sr, hop_length=hop)
+    stage("assign_lanes", lambda: assign_lanes(
+        final, beat_times, onset_env, time_axis, np.percentile(onset_env, 70),
+        c_norm, frame_times))
+    del views
+    stage("iter_segments", lambda: list(iter_segments(iter([y]), sr, hop_length=hop)))
+    return out, len(final)
+
+
+def run(seconds, sr, bpm, density, seed, repeat):
+    y = synth_track(seconds, sr, bpm, density, seed)
+    run_once(synth_track(5, sr, bpm, density, seed), sr)     # import · JIT 워밍업
+    best = {}
+    for _ in range(repeat):
+        stages, n_events = run_once(y, sr)
+        for name, vals in stages.items():
+            if name not in best or vals[0] < best[name][0]:
+                best[name] = vals
+    return {
+        "config": {"seconds": seconds, "sr": sr, "bpm": bpm, "density": density,
+                   "seed": seed, "num_lanes": NUM_LANES, "beat_tol": BEAT_TOL},
+        "host": {"python": platform.python_version(), "machine": platform.machine(),
+                 "librosa": librosa.__version__, "numpy": np.__version__},
+        "events": n_events,
+        "stages": {k: {"wall": w, "cpu": c, "peak_rss": p} for k, (w, c, p) in best.items()},
+    }
+
+
+def compare(result, baseline, tolerance):
+    """기준선 대비 느려진 단계 목록"""
+    slower = []
+    for name, cur in result["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if base is None:
+            continue
+        if cur["wall"] > base["wall"] * (1 + tolerance) and \
+                cur["wall"] - base["wall"] > MIN_REGRESSION_SEC:
+            slower.append(name)
+    return slower
+
+
+def report(result, baseline=None):
+    print(f"{'stage':<24}{'wall':>10}{'cpu':>10}{'peak RSS':>11}{'vs base':>10}")
+    total = 0.0
+    for name, s in result["stages"].items():
+        if name not in SEPARATE_STAGES:
+            total += s["wall"]
+        ratio = ""
+        base = (baseline or {}).get("stages", {}).get(name)
+        if base:
+            ratio = f"{s['wall'] / max(base['wall'], 1e-9):.2f}x"
+        print(f"{name:<24}{s['wall'] * 1000:>8.1f}ms{s['cpu'] * 1000:>8.1f}ms"
+              f"{s['peak_rss'] / 2**20:>9.0f}MB{ratio:>10}")
+    sec = result["config"]["seconds"]
+    print(f"{'make_beatmap total':<24}{total * 1000:>8.1f}ms  ({sec / total:.1f}x realtime, "
+          f"{result['events']} events)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--seconds", type=float, default=120.0)
+    ap.add_argument("--sr", type=int, default=22050)
+    ap.add_argument("--bpm", type=float, default=128.0)
+    ap.add_argument("--density", type=float, default=0.5)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--baseline", help="비교할 기준선 JSON")
+    ap.add_argument("--tolerance", type=float, default=0.2)
+    ap.add_argument("--save-baseline", help="결과를 기준선 JSON 으로 저장")
+    args = ap.parse_args()
+
+    warnings.filterwarnings("ignore", category=FutureWarning)
+    result = run(args.seconds, args.sr, args.bpm, args.density, args.seed, args.repeat)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as fp:
+            baseline = json.load(fp)
+        if baseline.get("config") != result["config"]:
+            print("⚠️  기준선과 합성 설정이 다릅니다 – 비교가 의미 없을 수 있음")
+    report(result, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as fp:
+            json.dump(result, fp, indent=2)
+        print(f"baseline saved: {args.save_baseline}")
+    if baseline:
+        slower = compare(result, baseline, args.tolerance)
+        if slower:
+            print(f"REGRESSION (>{args.tolerance:.0%}): {', '.join(slower)}")
+            sys.exit(1)
+        print("no regression")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# backend/ai-service/src/bench/sample_rate.py
+"""분석 샘플레이트별 처리량 비교
+
+사용법 (src 디렉터리에서):
+    python -m bench.sample_rate ../../audio_mp3 --rates 0 22050 16000
+
+각 파일을 원본 레이트로 한 번 디코딩한 뒤, 레이트마다
+리샘플 + make_beatmap 시간을 재고 원본 대비 속도 향상과 비트 시각 차이를 출력한다.
+(0 = 원본 레이트 그대로)
+"""
+
+import argparse
+import glob
+import os
+import time
+import warnings
+
+import numpy as np
+
+from api.analyze import load_audio_safe
+from beatmap.analysis import make_beatmap, resample_audio
+
+
+def _events(beatmap):
+    return np.array([e["time"] for e in beatmap["events"]])
+
+
+def run(paths, rates, repeat=1):
+    rows = []
+    for path in paths:
+        with open(path, "rb") as f:
+            y_native, sr_native = load_audio_safe(f.read(), sr=None)
+        dur = len(y_native) / sr_native
+        ref_times = None
+        for rate in rates:
+            target = rate or sr_native
+            best = None
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                y = resample_audio(y_native, sr_native, target)
+                t1 = time.perf_counter()
+                beatmap = make_beatmap(y, target)
+                t2 = time.perf_counter()
+                if best is None or t2 - t0 < best[0]:
+                    best = (t2 - t0, t1 - t0, beatmap)
+            total, t_res, beatmap = best
+            times = _events(beatmap)
+            if ref_times is None:
+                ref_times = times
+            # 원본 레이트 결과의 각 이벤트에서 가장 가까운 이벤트까지 거리 (초)
+            if len(times) and len(ref_times):
+                idx = np.clip(np.searchsorted(times, ref_times), 1, len(times) - 1)
+                near = np.minimum(np.abs(times[idx] - ref_times),
+                                  np.abs(times[idx - 1] - ref_times))
+                drift = float(np.median(near))
+            else:
+                drift = float("nan")
+            rows.append((os.path.basename(path), sr_native, target, dur,
+                         t_res, total, len(times), beatmap["tempo"], drift))
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("audio_dir", nargs="?", default="../../audio_mp3")
+    ap.add_argument("--rates", type=int, nargs="+", default=[0, 22050])
+    ap.add_argument("--repeat", type=int, default=1)
+    args = ap.parse_args()
+
+    warnings.filterwarnings("ignore", category=FutureWarning)
+    paths = sorted(glob.glob(os.path.join(args.audio_dir, "*.mp3")))
+    if not paths:
+        raise SystemExit(f"mp3 없음: {args.audio_dir}")
+
+    rows = run(paths, args.rates, args.repeat)
+    base = {}
+    print(f"{'file':<20}{'native':>8}{'sr':>8}{'resample':>10}{'total':>9}"
+          f"{'x realtime':>12}{'speedup':>9}{'events':>8}{'bpm':>8}{'drift ms':>10}")
+    for name, native, sr, dur, t_res, total, n, bpm, drift in rows:
+        base.setdefault(name, total)
+        print(f"{name:<20}{native:>8}{sr:>8}{t_res:>9.2f}s{total:>8.2f}s"
+              f"{dur / total:>11.1f}x{base[name] / total:>8.2f}x{n:>8}{bpm:>8.1f}"
+              f"{drift * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# backend/ai-service/src/cli/batch.py
+"""카탈로그 일괄 분석 (HTTP 업로드 없이 프로세스 풀로 병렬 처리)
+
+사용법 (src 디렉터리에서):
+    python -m cli.batch ../../audio_mp3
+    python -m cli.batch --manifest songs.txt --workers 8 --beatmap-dir /data/audio_json
+
+- 입력: 디렉터리(하위 포함) 또는 파일 경로, --manifest 는 한 줄에 경로 하나 (# 주석)
+- 워커: 파일을 한 번 읽어 업로드 해시 → 캐시 조회 → (없으면) 같은 바이트로 디코딩
+  (load_audio_safe) + 특징 추출 + 차트까지 수행하고 .feat 를 저장
+- 부모: 비트맵 JSON 저장 · 캐시 인덱스 등록
+- 재개: BEATMAP_DIR/.batch_state.json 에 (경로, 크기, mtime) → beatmap_id 를 기록해
+  다시 실행하면 끝난 파일은 건너뛴다. API 로 이미 올라온 같은 파일도 업로드 해시로 건너뜀
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List
+
+AUDIO_EXTS = {".mp3", ".wav", ".flac", ".ogg", ".m4a", ".aac", ".opus"}
+STATE_NAME = ".batch_state.json"
+
+
+# ──────────────────────────────────────────────────────────────
+# 입력 수집
+# ──────────────────────────────────────────────────────────────
+def collect(inputs: List[str], manifest: str = None) -> List[str]:
+    paths = []
+    if manifest:
+        base = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest, "r", encoding="utf-8") as fp:
+            for line in fp:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    paths.append(os.path.join(base, line))
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.extend(os.path.join(root, f) for f in files
+                             if os.path.splitext(f)[1].lower() in AUDIO_EXTS)
+        else:
+            paths.append(item)
+    return sorted(dict.fromkeys(os.path.abspath(p) for p in paths))
+
+
+# ──────────────────────────────────────────────────────────────
+# 워커 프로세스 측
+# ──────────────────────────────────────────────────────────────
+def _init_worker():
+    from models.registry import model_registry
+    model_registry.warm_up()
+
+
+def _analyze_file(path: str) -> Dict:
+    """이미 캐시에 있는 파일이면 {"path", "cached"} 만 돌려준다"""
+    from api.analyze import beatmap_cache, load_audio_safe, load_features, save_features
+    from beatmap.analysis import extract_features
+    from beatmap.charting import chart_from_features
+    from beatmap.cache import BeatmapCache
+
+    t0 = time.perf_counter()
+    with open(path, "rb") as f:
+        data = f.read()
+    upload_digest = BeatmapCache.bytes_digest(data)
+    cached = beatmap_cache.lookup_upload(upload_digest)
+    if cached:
+        return {"path": path, "cached": cached}
+    y, sr = load_audio_safe(data)
+    del data
+    t1 = time.perf_counter()
+    digest = BeatmapCache.audio_digest(y, sr)
+    feats = load_features(digest)
+    if feats is None:
+        feats = extract_features(y, sr)
+        save_features(digest, feats)
+    beatmap = chart_from_features(feats)
+    t2 = time.perf_counter()
+    return {
+        "path": path,
+        "upload_digest": upload_digest,
+        "audio_digest": digest,
+        "beatmap": beatmap,
+        "duration": len(y) / sr,
+        "decode_sec": t1 - t0,
+        "analyze_sec": t2 - t1,
+    }
+
+
+# ──────────────────────────────────────────────────────────────
+# 부모 프로세스 측
+# ──────────────────────────────────────────────────────────────
+class BatchState:
+    """(경로 → 크기·mtime·beatmap_id) 재개용 상태 파일"""
+
+    def __init__(self, save_dir: str):
+        self.save_dir = save_dir
+        self.path = os.path.join(save_dir, STATE_NAME)
+        try:
+            with open(self.path, "r", encoding="utf-8") as fp:
+                self.items = json.load(fp)
+        except FileNotFoundError:
+            self.items = {}
+
+    @staticmethod
+    def _stamp(path: str) -> Dict:
+        st = os.stat(path)
+        return {"size": st.st_size, "mtime": st.st_mtime}
+
+    def done(self, path: str) -> bool:
+        entry = self.items.get(path)
+        return bool(entry
+                    and {k: entry.get(k) for k in ("size", "mtime")} == self._stamp(path)
+                    and os.path.exists(os.path.join(self.save_dir, entry["beatmap_id"])))
+
+    def put(self, path: str, beatmap_id: str):
+        self.items[path] = {**self._stamp(path), "beatmap_id": beatmap_id}
+        tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fp:
+            json.dump(self.items, fp, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+def run(paths: List[str], workers: int) -> int:
+    from api.analyze import SAVE_DIR, beatmap_cache
+    from beatmap.store import save_beatmap
+
+    state = BatchState(SAVE_DIR)
+    todo = [path for path in paths if not state.done(path)]
+    print(f"{len(paths)} files, {len(paths) - len(todo)} already done, "
+          f"{len(todo)} to analyze on {workers} workers")
+    if not todo:
+        return 0
+
+    failed = 0
+    skipped = 0
+    audio_sec = 0.0
+    t0 = time.perf_counter()
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker) as pool:
+        futures = {pool.submit(_analyze_file, p): p for p in todo}
+        for i, fut in enumerate(as_completed(futures), start=1):
+            path = futures[fut]
+            name = os.path.basename(path)
+            try:
+                res = fut.result()
+            except Exception as e:
+                failed += 1
+                print(f"[{i}/{len(todo)}] FAIL {name}: {e}")
+                continue
+            if "cached" in res:
+                skipped += 1
+                state.put(path, res["cached"])
+                print(f"[{i}/{len(todo)}] {name:<40} cached  -> {res['cached']}")
+                continue
+            beatmap_id = save_beatmap(SAVE_DIR, res["beatmap"], meta={
+                "source": "batch", "title": os.path.splitext(name)[0],
+                "duration": res["duration"]})
+            beatmap_cache.store(res["audio_digest"], beatmap_id,
+                                upload_digest=res["upload_digest"])
+            state.put(path, beatmap_id)
+            audio_sec += res["duration"]
+            total = res["decode_sec"] + res["analyze_sec"]
+            print(f"[{i}/{len(todo)}] {name:<40} {res['duration']:7.1f}s audio  "
+                  f"decode {res['decode_sec']:6.2f}s  analyze {res['analyze_sec']:6.2f}s  "
+                  f"({res['duration'] / max(total, 1e-9):.1f}x realtime)  -> {beatmap_id}")
+
+    wall = time.perf_counter() - t0
+    ok = len(todo) - failed - skipped
+    print(f"done {ok}/{len(todo)} in {wall:.1f}s  "
+          f"{ok / wall * 60:.1f} songs/min  {audio_sec / wall:.1f}x realtime overall"
+          + (f"  ({skipped} cached)" if skipped else "")
+          + (f"  ({failed} failed)" if failed else ""))
+    return failed
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("inputs", nargs="*", help="오디오 파일 또는 디렉터리")
+    ap.add_argument("--manifest", help="경로 목록 파일 (한 줄에 하나)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--beatmap-dir", help="BEATMAP_DIR (기본: 환경 변수)")
+    args = ap.parse_args()
+    if args.beatmap_dir:
+        os.environ["BEATMAP_DIR"] = args.beatmap_dir    # 워커도 같은 값을 상속
+
+    paths = collect(args.inputs, args.manifest)
+    if not paths:
+        raise SystemExit("분석할 오디오 파일이 없습니다")
+    sys.exit(1 if run(paths, max(1, args.workers)) else 0)
+
+
+if __name__ == "__main__":
+    main()
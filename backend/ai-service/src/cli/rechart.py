@@ -0,0 +1,89 @@
+# backend/ai-service/src/cli/rechart.py
+"""저장된 특징(.feat)으로 전체 비트맵을 다시 차트 (재디코딩·재분석 없음)
+
+사용법 (src 디렉터리에서):
+    python -m cli.rechart                     # 지문이 바뀐 항목만
+    python -m cli.rechart --all               # 전부 다시
+    python -m cli.rechart --beatmap-dir /data/audio_json --dry-run
+
+TARGET_DENSITY · WINDOW_SEC · MAX_FACTOR · 레인 매핑 등 차트 단계 상수를 바꾼 뒤 실행한다.
+캐시 인덱스의 항목마다 <digest>.feat 를 메모리 맵으로 읽어 chart_from_features
+(난이도 항목은 chart_difficulty) 를 돌리고, 새 beatmap_id 로 저장한 다음 항목·영상
+인덱스를 새 id 와 현재 파라미터 지문으로 옮기고 옛 파일을 지운다.
+UUID 비트맵은 정적 서빙이 1년 immutable 로 내보내므로 같은 id 에 덮어쓰지 않는다
+(브라우저·CDN 이 옛 차트를 계속 쓰게 된다). 카탈로그 항목은 제목·생성 시각을 이어받는다.
+.feat 가 없거나 FEATURE_VERSION 이 다른 곡은 건너뛴다 (다음 요청 때 재분석).
+"""
+
+import argparse
+import os
+import time
+
+
+def rechart(force: bool = False, dry_run: bool = False):
+    from api.analyze import (SAVE_DIR, beatmap_cache, chart_difficulty,
+                             chart_from_features, load_features)
+    from audio.dedup import VideoIndex
+    from beatmap.catalog import catalog_for
+    from beatmap.generator import Difficulty
+    from beatmap.store import delete_beatmap, save_beatmap
+
+    fp = beatmap_cache.fingerprint()
+    entries = sorted(beatmap_cache.entries(), key=lambda e: -e[2].get("atime", 0))
+    current = {digest for digest, old_fp, _ in entries if old_fp == fp}
+    done, moved = set(), {}
+    counts = {"rechart": 0, "current": 0, "no_features": 0, "superseded": 0}
+
+    t0 = time.perf_counter()
+    for digest, old_fp, entry in entries:
+        if old_fp == fp and not force:
+            counts["current"] += 1
+            continue
+        if digest in done or (old_fp != fp and digest in current):
+            counts["superseded"] += 1      # 같은 곡의 더 최근 항목이 이미 있음
+            continue
+        audio, _, level = digest.partition("/")
+        feats = load_features(audio)
+        if feats is None:
+            counts["no_features"] += 1
+            continue
+        beatmap = (chart_difficulty(feats, Difficulty(level)) if level
+                   else chart_from_features(feats))
+        done.add(digest)
+        counts["rechart"] += 1
+        if dry_run:
+            continue
+        old_id = entry["beatmap_id"]
+        meta = catalog_for(SAVE_DIR).get(old_id) or {}
+        new_id = save_beatmap(SAVE_DIR, beatmap, meta=meta)
+        if beatmap_cache.refresh(digest, old_fp, beatmap_id=new_id):
+            moved[old_id] = new_id
+        else:
+            delete_beatmap(SAVE_DIR, new_id)       # 그 사이 현재 지문 항목이 생김
+    elapsed = time.perf_counter() - t0
+
+    if moved:
+        counts["video_index"] = VideoIndex(SAVE_DIR).repoint(moved, fp)
+    for old_id in moved:
+        delete_beatmap(SAVE_DIR, old_id)
+    return counts, elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__,
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--beatmap-dir", help="BEATMAP_DIR (기본: 환경 변수)")
+    ap.add_argument("--all", action="store_true", help="지문이 같은 항목도 다시 차트")
+    ap.add_argument("--dry-run", action="store_true", help="파일·인덱스를 쓰지 않음")
+    args = ap.parse_args()
+    if args.beatmap_dir:
+        os.environ["BEATMAP_DIR"] = args.beatmap_dir    # api.analyze import 전에 설정
+
+    counts, elapsed = rechart(force=args.all, dry_run=args.dry_run)
+    n = counts["rechart"]
+    print(" ".join(f"{k}={v}" for k, v in counts.items()))
+    print(f"{n} charts in {elapsed:.2f}s ({n / max(elapsed, 1e-9):.0f}/s)")
+
+
+if __name__ == "__main__":
+    main()
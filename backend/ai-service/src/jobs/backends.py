@@ -0,0 +1,123 @@
+# backend/ai-service/src/jobs/backends.py
+"""작업 큐 백엔드
+
+- MemoryBackend : 프로세스 내부 asyncio.Queue (기본값)
+- RedisBackend  : docker-compose 의 Redis 를 사용하는 리스트 큐 + 작업 상태 저장
+
+두 백엔드 모두 max_depth 를 넘으면 QueueFullError 를 던져 역압(backpressure)을 건다.
+작업 상태는 마지막 저장 후 ttl_sec 이 지나면 사라진다 (Redis 는 키 만료, 메모리는 저장 순서로 정리).
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """대기열이 max_depth 에 도달"""
+
+
+class MemoryBackend:
+    """단일 프로세스용 백엔드 – 재시작 시 작업 상태는 사라진다"""
+
+    def __init__(self, max_depth: int = 32, ttl_sec: int = 24 * 3600,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_depth = max_depth
+        self.ttl_sec = ttl_sec
+        self._clock = clock
+        self._queue: Optional[asyncio.Queue] = None
+        # job_id → (만료 시각, 작업). TTL 이 일정하므로 마지막 저장 순서 = 만료 순서
+        self._jobs: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+
+    def _q(self) -> asyncio.Queue:
+        # 이벤트 루프가 뜬 뒤에 생성해야 한다
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_depth)
+        return self._queue
+
+    async def enqueue(self, job_id: str):
+        try:
+            self._q().put_nowait(job_id)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"대기열 가득 참 ({self.max_depth})")
+
+    async def dequeue(self) -> str:
+        return await self._q().get()
+
+    async def depth(self) -> int:
+        return self._q().qsize()
+
+    async def save(self, job: Dict):
+        now = self._clock()
+        self._jobs[job["id"]] = (now + self.ttl_sec, dict(job))
+        self._jobs.move_to_end(job["id"])
+        self._expire(now)
+
+    async def load(self, job_id: str) -> Optional[Dict]:
+        self._expire(self._clock())
+        item = self._jobs.get(job_id)
+        return dict(item[1]) if item else None
+
+    async def close(self):
+        pass
+
+    def _expire(self, now: float):
+        while self._jobs:
+            job_id, (expires, _) = next(iter(self._jobs.items()))
+            if expires > now:
+                break
+            del self._jobs[job_id]
+
+
+class RedisBackend:
+    """Redis 리스트(LPUSH/BRPOP) 큐 – 여러 서비스 인스턴스가 같은 큐를 소비할 수 있다"""
+
+    QUEUE_KEY = "rhythm:jobs:queue"
+    JOB_KEY = "rhythm:jobs:{}"
+
+    def __init__(self, host: str = "localhost", port: int = 6379,
+                 max_depth: int = 32, ttl_sec: int = 24 * 3600):
+        import redis.asyncio as aioredis     # 선택 의존성 – redis 백엔드일 때만 필요
+        self.max_depth = max_depth
+        self.ttl_sec = ttl_sec
+        self._redis = aioredis.Redis(host=host, port=port, decode_responses=True)
+
+    async def enqueue(self, job_id: str):
+        # LLEN 확인과 LPUSH 사이 경합으로 max_depth 를 약간 넘을 수 있다 (허용)
+        if await self._redis.llen(self.QUEUE_KEY) >= self.max_depth:
+            raise QueueFullError(f"대기열 가득 참 ({self.max_depth})")
+        await self._redis.lpush(self.QUEUE_KEY, job_id)
+
+    async def dequeue(self) -> str:
+        while True:
+            item = await self._redis.brpop(self.QUEUE_KEY, timeout=5)
+            if item:
+                return item[1]
+
+    async def depth(self) -> int:
+        return await self._redis.llen(self.QUEUE_KEY)
+
+    async def save(self, job: Dict):
+        await self._redis.set(self.JOB_KEY.format(job["id"]),
+                              json.dumps(job, ensure_ascii=False), ex=self.ttl_sec)
+
+    async def load(self, job_id: str) -> Optional[Dict]:
+        raw = await self._redis.get(self.JOB_KEY.format(job_id))
+        return json.loads(raw) if raw else None
+
+    async def close(self):
+        await self._redis.close()
+
+
+def create_backend(kind: str, max_depth: int, host: str = "localhost", port: int = 6379,
+                   ttl_sec: int = 24 * 3600):
+    """JOB_BACKEND 값으로 백엔드 생성"""
+    if kind == "redis":
+        logger.info("[jobs] redis 백엔드 사용 (%s:%s)", host, port)
+        return RedisBackend(host=host, port=port, max_depth=max_depth, ttl_sec=ttl_sec)
+    return MemoryBackend(max_depth=max_depth, ttl_sec=ttl_sec)
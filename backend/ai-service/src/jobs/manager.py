@@ -0,0 +1,141 @@
+# backend/ai-service/src/jobs/manager.py
+"""비트맵 생성 작업 관리자
+
+submit → 큐 백엔드에 job_id 적재 → 고정 개수 워커가 꺼내서 스레드풀에서 실행.
+핸들러는 (payload, progress) 를 받는 동기 함수이며, progress(stage) 호출은
+워커 스레드에서 이벤트 루프로 넘겨 작업 상태에 반영한다.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+# 백엔드(Redis 등) 오류 시 워커가 다시 꺼내기 전 대기(초) – 연속 실패마다 두 배, 상한까지
+WORKER_BACKOFF_SEC = 0.5
+WORKER_BACKOFF_MAX_SEC = 30.0
+
+Handler = Callable[[Dict, Callable[[str], None]], Dict]
+
+
+class JobManager:
+    def __init__(self, backend, handlers: Dict[str, Handler], workers: int = 2):
+        self.backend = backend
+        self.handlers = handlers
+        self.workers = workers
+        self.running = 0
+        self._tasks: List[asyncio.Task] = []
+
+    # ──────────────────────────────────────────────────────────────
+    # PUBLIC
+    # ──────────────────────────────────────────────────────────────
+    async def start(self):
+        for i in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker(i)))
+        logger.info("[jobs] 워커 %d개 시작", self.workers)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        await self.backend.close()
+
+    async def submit(self, kind: str, payload: Dict) -> Dict:
+        """작업 등록 – 대기열이 가득 차면 QueueFullError"""
+        if kind not in self.handlers:
+            raise ValueError(f"알 수 없는 작업 종류: {kind}")
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": QUEUED,
+            "stage": None,
+            "payload": payload,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        await self.backend.save(job)
+        await self.backend.enqueue(job["id"])
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        return await self.backend.load(job_id)
+
+    async def stats(self) -> Dict:
+        return {
+            "queued": await self.backend.depth(),
+            "running": self.running,
+            "workers": self.workers,
+            "max_depth": self.backend.max_depth,
+        }
+
+    # ──────────────────────────────────────────────────────────────
+    # INTERNAL
+    # ──────────────────────────────────────────────────────────────
+    async def _worker(self, n: int):
+        """큐에서 꺼내 실행 – 백엔드 오류가 나도 워커는 죽지 않고 물러났다가 계속한다"""
+        delay = WORKER_BACKOFF_SEC
+        while True:
+            job_id = None
+            try:
+                job_id = await self.backend.dequeue()
+                job = await self.backend.load(job_id)
+                if job is None:                    # TTL 만료 등
+                    continue
+                self.running += 1
+                try:
+                    await self._run(job)
+                finally:
+                    self.running -= 1
+                delay = WORKER_BACKOFF_SEC
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("[jobs] 워커 %d 오류 (job %s) – %.1f초 뒤 재개", n, job_id, delay)
+                if job_id is not None:             # 이미 큐에서 빠졌으므로 다시 실행되지 않는다
+                    await self._fail(job_id, str(e))
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, WORKER_BACKOFF_MAX_SEC)
+
+    async def _fail(self, job_id: str, error: str):
+        """꺼낸 뒤 끝내지 못한 작업을 FAILED 로 (저장도 실패하면 로그만)"""
+        try:
+            job = await self.backend.load(job_id)
+            if job is not None and job["status"] not in (DONE, FAILED):
+                job.update(status=FAILED, error=error, updated_at=time.time())
+                await self.backend.save(job)
+        except Exception:
+            logger.exception("[jobs] %s 실패 상태 저장 불가", job_id)
+
+    async def _run(self, job: Dict):
+        loop = asyncio.get_running_loop()
+
+        async def _update(**fields):
+            job.update(fields, updated_at=time.time())
+            await self.backend.save(job)
+
+        async def _stage(stage: str):
+            if job["status"] == RUNNING:           # 완료 뒤 늦게 도착한 보고는 무시
+                await _update(stage=stage)
+
+        def progress(stage: str):
+            # 워커 스레드 → 이벤트 루프
+            asyncio.run_coroutine_threadsafe(_stage(stage), loop)
+
+        await _update(status=RUNNING)
+        try:
+            result = await run_in_threadpool(self.handlers[job["kind"]],
+                                             job["payload"], progress)
+            await _update(status=DONE, stage=None, result=result)
+        except Exception as e:
+            logger.exception("[jobs] %s 실패", job["id"])
+            await _update(status=FAILED, error=str(e))
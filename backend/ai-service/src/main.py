@@ -2,21 +2,38 @@
 """Rhythm AI Service entrypoint
 
 - CORS
-- Mount static mp3 / beatmap JSON
-- Include analyze + audio routers
+- Mount static mp3 / beatmap JSON (ETag, immutable cache, precompressed, Range)
+- Include analyze + audio + jobs + profiles + beatmaps routers
+- Start / stop analysis engine and background job workers
+- Prometheus /metrics
 """
 
 import os
 import logging
+import time
 import uvicorn
 
-from fastapi import FastAPI
+import anyio
+from fastapi import FastAPI, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from starlette.routing import Match
 
+from api.admission import admission
 from api.analyze import router as analyze_router
-from api.audio_routes import router as audio_router  # ← audio_routes.py 반영
+from api.audio_routes import router as audio_router, cancel_downloads  # ← audio_routes.py 반영
+from api.beatmaps import router as beatmaps_router
+from api.jobs import router as jobs_router, job_manager
+from api.profiles import router as profiles_router
+from api.static_files import CachedStaticFiles
+from beatmap.catalog import catalog_for
+from beatmap.engine import analysis_engine
+from models.registry import model_registry
+from monitoring.metrics import (ADMISSION_MEMORY, ENGINE_INFLIGHT, HTTP_LATENCY,
+                                JOBS_RUNNING, QUEUE_DEPTH, THREADPOOL_BUSY,
+                                THREADPOOL_SIZE)
 
 # ---------------------------------------------------------------------------
 # Logger 설정
@@ -24,6 +41,9 @@ from api.audio_routes import router as audio_router  # ← audio_routes.py 반
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 1 이면 시작 시 비트 모델을 미리 로드 (첫 요청 지연 제거)
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "1") == "1"
+
 # ---------------------------------------------------------------------------
 # FastAPI 애플리케이션 초기화
 # ---------------------------------------------------------------------------
@@ -36,11 +56,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ---------------------------------------------------------------------------
+# 요청 지연 지표 (라벨은 실제 경로가 아닌 라우트 템플릿 – 카디널리티 제한)
+# ---------------------------------------------------------------------------
+def _route_label(request: Request) -> str:
+    for route in app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unknown")
+    return "unmatched"
+
+
+@app.middleware("http")
+async def _observe_latency(request: Request, call_next):
+    t0 = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_LATENCY.labels(request.method, _route_label(request),
+                            str(status)).observe(time.perf_counter() - t0)
+
 # ---------------------------------------------------------------------------
 # 라우터 등록
 # ---------------------------------------------------------------------------
 app.include_router(analyze_router, prefix="/api/analyze", tags=["analyze"])
 app.include_router(audio_router,   prefix="/api/audio",   tags=["audio"])
+app.include_router(jobs_router,    prefix="/api/jobs",    tags=["jobs"])
+app.include_router(profiles_router, prefix="/api/profiles", tags=["profiles"])
+app.include_router(beatmaps_router, prefix="/api/beatmaps", tags=["beatmaps"])
+
+# ---------------------------------------------------------------------------
+# 분석 엔진 · 백그라운드 작업 워커
+# ---------------------------------------------------------------------------
+@app.on_event("startup")
+async def _start_workers():
+    if MODEL_WARMUP and analysis_engine.mode != "process":
+        await run_in_threadpool(model_registry.warm_up)
+    await run_in_threadpool(analysis_engine.start)
+    await job_manager.start()
+
+
+@app.on_event("shutdown")
+async def _stop_workers():
+    cancel_downloads()
+    await job_manager.stop()
+    analysis_engine.shutdown()
 
 # ---------------------------------------------------------------------------
 # 정적 파일 (mp3 / beatmap JSON) 마운트
@@ -51,8 +114,10 @@ BEATMAP_DIR = os.getenv("BEATMAP_DIR", "/tmp/audio_json")
 logger.info("[mount] /audio    -> %s", AUDIO_DIR)
 logger.info("[mount] /beatmaps -> %s", BEATMAP_DIR)
 
-app.mount("/audio",    StaticFiles(directory=AUDIO_DIR),   name="audio")
-app.mount("/beatmaps", StaticFiles(directory=BEATMAP_DIR), name="beatmaps")
+# ETag · 캐시 헤더 · Range(mp3) · 사전 압축본(비트맵 JSON) – api/static_files.py
+app.mount("/audio",    CachedStaticFiles(directory=AUDIO_DIR),   name="audio")
+app.mount("/beatmaps", CachedStaticFiles(directory=BEATMAP_DIR, precompress=True),
+          name="beatmaps")
 
 # ---------------------------------------------------------------------------
 # 헬스체크 & 디버그 엔드포인트
@@ -67,14 +132,31 @@ def health_check():
     return {"status": "ok"}
 
 
+@app.get("/api/models", tags=["Health"])
+def model_stats():
+    """모델 로드 상태 · 로드 시간 · 메모리 증가량 · 승인 제어 현황"""
+    return {"models": model_registry.stats(), "engine": analysis_engine.stats(),
+            "admission": admission.stats()}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 스크레이프 – 용량 지표는 이 시점 값으로 갱신"""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    THREADPOOL_BUSY.set(limiter.borrowed_tokens)
+    THREADPOOL_SIZE.set(limiter.total_tokens)
+    QUEUE_DEPTH.set(await job_manager.backend.depth())
+    JOBS_RUNNING.set(job_manager.running)
+    ENGINE_INFLIGHT.set(analysis_engine.inflight)
+    ADMISSION_MEMORY.set(admission.memory_in_use())
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/debug-beatmap-path")
 def debug_path():
-    """현재 BEATMAP_DIR 경로와 파일 목록 확인용"""
-    try:
-        files = os.listdir(BEATMAP_DIR)
-    except FileNotFoundError:
-        files = []
-    return {"beatmap_dir": BEATMAP_DIR, "files": files}
+    """현재 BEATMAP_DIR 경로와 비트맵 수 확인용 (목록은 /api/beatmaps)"""
+    return {"beatmap_dir": BEATMAP_DIR, "count": catalog_for(BEATMAP_DIR).count(),
+            "catalogue": "/api/beatmaps"}
 
 
 # ---------------------------------------------------------------------------
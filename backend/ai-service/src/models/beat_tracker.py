@@ -1,29 +1,127 @@
 # GPU 기반 비트 추적 모델
 # 오픈소스 오디오 분석 라이브러리를 활용한 비트 및 템포 추출
-import torch
+#
+# 분석 원시값(STFT·HPSS·온셋 …)은 차트 파이프라인과 같은 AnalysisContext 가 신호마다
+# 한 번씩만 계산해 보관하고(RhythmContext 는 리듬·음색 통계용 파생값만 더함), 모든 특성
+# 계산이 그것을 공유한다. 같은 신호를 다시 분석하면 BeatTracker 의 신호별 메모에서
+# 그대로 꺼낸다 (메모는 AnalysisContext 처럼 바이트 상한).
 import librosa
 import numpy as np
+from collections import OrderedDict
 from typing import Dict, List, Tuple, Optional
 import logging
+import os
+import threading
 from pathlib import Path
 
+from audio.digest import audio_digest
+from beatmap.analysis import CTX_MAX_BYTES, AnalysisContext
+
+try:
+    import torch
+except ImportError:                      # optional – 없으면 CPU 전용
+    torch = None
+
 logger = logging.getLogger(__name__)
 
+# 신호별 메모 상한 (컨텍스트 캐시 + 신호 바이트 합계) – 넘으면 오래 안 쓴 신호부터 버림
+FEATURE_MEMO_BYTES = int(os.getenv("BEAT_TRACKER_MEMO_MB", str(CTX_MAX_BYTES >> 20))) * 1024 * 1024
+MAX_TEMPO = 200.0        # 템포 후보 상한
+MIN_PERIOD_TEMPO = 300.0 # 주기성 계산에서 이보다 빠른(짧은 lag) 주기는 제외
+TEMPO_AC_SIZE = 8.0      # 템포그램 창(초) – librosa tempo · 차트 TempoTracker 와 같은 창
+
+
+class RhythmContext(AnalysisContext):
+    """AnalysisContext + 리듬·음색 통계용 파생값 (BeatTracker 전용)
+
+    STFT·HPSS·온셋·centroid 는 차트 단계와 같은 AnalysisContext 계산을 그대로 쓰고,
+    여기서는 MFCC·크로마용 mel_db · median 온셋 · 템포그램 등만 더한다 (같은 바이트 상한 캐시).
+    y 없이 온셋 엔벨로프만으로 만들면(from_onset_env) 리듬 값(템포그램·자기상관)만 쓸 수 있다.
+    """
+
+    def __init__(self, y: Optional[np.ndarray], sr: int, hop_length: int = 512,
+                 n_fft: int = 2048, onset_env: Optional[np.ndarray] = None,
+                 max_bytes: int = CTX_MAX_BYTES):
+        super().__init__(y, sr, n_fft=n_fft, hop_length=hop_length, max_bytes=max_bytes)
+        self._rhythm_env = None if onset_env is None else np.asarray(onset_env, dtype=float)
+
+    @classmethod
+    def from_onset_env(cls, onset_env: np.ndarray, sr: int,
+                       hop_length: int = 512) -> "RhythmContext":
+        return cls(None, sr, hop_length=hop_length, onset_env=onset_env)
+
+    @property
+    def nbytes(self) -> int:
+        """메모 상한용 크기 – 캐시된 파생값 + 신호"""
+        return self._bytes + getattr(self.y, "nbytes", 0)
+
+    # ---- 스펙트럼 ------------------------------------------------
+    def power(self) -> np.ndarray:
+        return self._get("power", lambda: self.magnitude("full") ** 2)
+
+    def mel_db(self) -> np.ndarray:
+        return self._get("mel_db", lambda: librosa.power_to_db(librosa.feature.melspectrogram(
+            S=self.power(), sr=self.sr, n_fft=self.n_fft, hop_length=self.hop_length)))
+
+    # ---- 온셋 ----------------------------------------------------
+    def rhythm_env(self) -> np.ndarray:
+        """리듬 값의 기준 엔벨로프 – 주어진 차트 온셋, 없으면 전체 대역 온셋"""
+        if self._rhythm_env is not None:
+            return self._rhythm_env
+        return self.onset_env("full")
+
+    def onset_env_median(self) -> np.ndarray:
+        """beat_track · tempo 가 y 입력일 때 쓰는 엔벨로프 (밴드 median 집계)"""
+        if self.y is None:
+            return self.rhythm_env()
+        return self._get("onset:median", lambda: librosa.onset.onset_strength(
+            S=self.mel_db(), sr=self.sr, hop_length=self.hop_length, aggregate=np.median))
+
+    # ---- 리듬 ----------------------------------------------------
+    def tempogram(self) -> np.ndarray:
+        win = int(librosa.time_to_frames(TEMPO_AC_SIZE, sr=self.sr, hop_length=self.hop_length))
+        return self._get("tempogram", lambda: librosa.feature.tempogram(
+            onset_envelope=self.rhythm_env(), sr=self.sr, hop_length=self.hop_length,
+            win_length=win))
+
+    def autocorr(self) -> np.ndarray:
+        return self._get("autocorr", lambda: librosa.autocorrelate(self.rhythm_env()))
+
+    def beat_track(self) -> Tuple[float, np.ndarray]:
+        def _track():
+            tempo, beat_frames = librosa.beat.beat_track(
+                onset_envelope=self.onset_env_median(), sr=self.sr,
+                hop_length=self.hop_length, units='frames')
+            return float(np.atleast_1d(tempo)[0]), beat_frames
+        return self._get("beat_track", _track)
+
+    def tempo_candidates(self) -> np.ndarray:
+        return self._get("tempo_candidates", lambda: librosa.feature.tempo(
+            onset_envelope=self.onset_env_median(), sr=self.sr,
+            hop_length=self.hop_length, max_tempo=MAX_TEMPO))
+
+
 class BeatTracker:
     """GPU 기반 비트 추적 및 템포 분석 클래스"""
-    
-    def __init__(self, device: str = 'cuda'):
-        self.device = device if torch.cuda.is_available() else 'cpu'
+
+    def __init__(self, device: str = 'cuda', memo_bytes: int = FEATURE_MEMO_BYTES):
+        cuda = torch is not None and torch.cuda.is_available()
+        self.device = device if cuda else 'cpu'
         self.sample_rate = 44100
         self.hop_length = 512
         self.frame_length = 2048
-        
+
         # 모델 초기화
         self.onset_model = None
         self.beat_model = None
-        
+
+        # 신호 해시 → RhythmContext (바이트 상한 LRU)
+        self.memo_bytes = memo_bytes
+        self._memo: "OrderedDict[str, RhythmContext]" = OrderedDict()
+        self._memo_lock = threading.Lock()
+
         logger.info(f"BeatTracker 초기화 완료 (device: {self.device})")
-    
+
     def load_models(self):
         """사전 훈련된 모델 로드"""
         try:
@@ -33,148 +131,175 @@ class BeatTracker:
         except Exception as e:
             logger.error(f"모델 로드 오류: {e}")
             raise
-    
+
+    def features(self, y: np.ndarray, sr: int) -> RhythmContext:
+        """신호별 메모 – 같은 (y, sr) 이면 이미 계산한 원시값을 그대로 돌려준다
+
+        컨텍스트는 계산하면서 커지므로 꺼낼 때마다 합계를 다시 재서 memo_bytes 를 넘으면
+        오래 안 쓴 신호부터 버린다 (방금 꺼낸 것은 남김)."""
+        key = audio_digest(y, sr)
+        with self._memo_lock:
+            feats = self._memo.get(key)
+            if feats is not None:
+                self._memo.move_to_end(key)
+            else:
+                feats = RhythmContext(y, sr, hop_length=self.hop_length,
+                                      n_fft=self.frame_length, max_bytes=self.memo_bytes)
+                self._memo[key] = feats
+            total = sum(ctx.nbytes for ctx in self._memo.values())
+            while total > self.memo_bytes and len(self._memo) > 1:
+                _, old = self._memo.popitem(last=False)
+                total -= old.nbytes
+        return feats
+
     def analyze_audio(self, audio_path: str) -> Dict:
         """
         오디오 파일 분석하여 비트, 템포, 온셋 정보 추출
-        
+
         Args:
             audio_path: 분석할 오디오 파일 경로
-            
+
         Returns:
             Dict: 분석 결과 (BPM, 비트, 온셋 등)
         """
         try:
             # 오디오 로드
             y, sr = librosa.load(audio_path, sr=self.sample_rate, mono=True)
-            
-            # GPU로 데이터 이동 (PyTorch 텐서로 변환)
-            if self.device == 'cuda':
-                y_tensor = torch.tensor(y, device=self.device)
-            else:
-                y_tensor = torch.tensor(y)
-            
-            # 1. 템포 및 비트 추출
-            tempo, beat_frames = self._extract_tempo_and_beats(y, sr)
-            
-            # 2. 온셋 검출
-            onset_frames = self._detect_onsets(y, sr)
-            
-            # 3. 음악적 특성 분석
-            musical_features = self._analyze_musical_features(y, sr)
-            
-            # 4. 결과 정리
-            beat_times = librosa.frames_to_time(beat_frames, sr=sr, hop_length=self.hop_length)
-            onset_times = librosa.frames_to_time(onset_frames, sr=sr, hop_length=self.hop_length)
-            
-            analysis_result = {
-                'tempo': {
-                    'bpm': float(tempo),
-                    'confidence': self._calculate_tempo_confidence(y, sr, tempo)
-                },
-                'beats': {
-                    'times': beat_times.tolist(),
-                    'frames': beat_frames.tolist(),
-                    'count': len(beat_times)
-                },
-                'onsets': {
-                    'times': onset_times.tolist(),
-                    'frames': onset_frames.tolist(),
-                    'count': len(onset_times)
-                },
-                'musical_features': musical_features,
-                'duration': float(len(y) / sr),
-                'sample_rate': sr
-            }
-            
-            logger.info(f"오디오 분석 완료: BPM={tempo:.1f}, 비트={len(beat_times)}개")
-            return analysis_result
-            
+            return self.analyze_signal(y, sr)
+
         except Exception as e:
             logger.error(f"오디오 분석 오류: {e}")
             raise
-    
-    def _extract_tempo_and_beats(self, y: np.ndarray, sr: int) -> Tuple[float, np.ndarray]:
+
+    def analyze_signal(self, y: np.ndarray, sr: int) -> Dict:
+        """이미 디코딩된 신호 분석 (analyze_audio 와 같은 결과 형식)"""
+        feats = self.features(y, sr)
+
+        # 1. 템포 및 비트 추출
+        tempo, beat_frames = self._extract_tempo_and_beats(feats)
+
+        # 2. 온셋 검출
+        onset_frames = self._detect_onsets(feats)
+
+        # 3. 음악적 특성 분석
+        musical_features = self._analyze_musical_features(feats)
+
+        # 4. 결과 정리
+        beat_times = librosa.frames_to_time(beat_frames, sr=sr, hop_length=self.hop_length)
+        onset_times = librosa.frames_to_time(onset_frames, sr=sr, hop_length=self.hop_length)
+
+        analysis_result = {
+            'tempo': {
+                'bpm': float(tempo),
+                'confidence': self._calculate_tempo_confidence(feats, tempo)
+            },
+            'beats': {
+                'times': beat_times.tolist(),
+                'frames': beat_frames.tolist(),
+                'count': len(beat_times)
+            },
+            'onsets': {
+                'times': onset_times.tolist(),
+                'frames': onset_frames.tolist(),
+                'count': len(onset_times)
+            },
+            'musical_features': musical_features,
+            'duration': float(len(y) / sr),
+            'sample_rate': sr
+        }
+
+        logger.info(f"오디오 분석 완료: BPM={tempo:.1f}, 비트={len(beat_times)}개")
+        return analysis_result
+
+    def rhythm_summary(self, onset_env: np.ndarray, sr: int, hop_length: int = 512,
+                       tempo: Optional[float] = None) -> Dict:
+        """이미 있는 온셋 엔벨로프로 리듬 메타데이터만 (STFT 없음, 수십 ms)
+
+        tempo 를 주면 그 템포의 신뢰도, 없으면 엔벨로프에서 추정한 템포 기준.
+        신뢰도는 템포 추정과 같은 TEMPO_AC_SIZE 창의 템포그램에서 읽는다.
+        """
+        feats = RhythmContext.from_onset_env(onset_env, sr, hop_length)
+        if tempo is None:
+            tempo = float(feats.tempo_candidates()[0])
+        rhythm = self._analyze_rhythm_patterns(feats)
+        return {
+            'tempo': float(tempo),
+            'tempo_confidence': self._calculate_tempo_confidence(feats, tempo),
+            'rhythm_complexity': rhythm.get('complexity'),
+            'periodicity': rhythm.get('periodicity'),
+        }
+
+    def _extract_tempo_and_beats(self, feats: RhythmContext) -> Tuple[float, np.ndarray]:
         """템포 및 비트 추출"""
         try:
             # librosa를 사용한 기본 템포 추출
-            tempo, beat_frames = librosa.beat.beat_track(
-                y=y, sr=sr, hop_length=self.hop_length, units='frames'
-            )
-            
+            tempo, beat_frames = feats.beat_track()
+
             # 다중 템포 후보 분석
-            tempo_candidates = librosa.beat.tempo(
-                y=y, sr=sr, hop_length=self.hop_length, max_tempo=200
-            )
-            
+            tempo_candidates = feats.tempo_candidates()
+
             # 가장 안정적인 템포 선택
             if len(tempo_candidates) > 0:
                 tempo = tempo_candidates[0]
-            
+
             return tempo, beat_frames
-            
+
         except Exception as e:
             logger.error(f"템포 추출 오류: {e}")
             # 기본값 반환
             return 120.0, np.array([])
-    
-    def _detect_onsets(self, y: np.ndarray, sr: int) -> np.ndarray:
+
+    def _detect_onsets(self, feats: RhythmContext) -> np.ndarray:
         """온셋 검출"""
         try:
             # 스펙트럼 기반 온셋 검출
             onset_frames = librosa.onset.onset_detect(
-                y=y, sr=sr, hop_length=self.hop_length, units='frames'
-            )
-            
-            # 추가 온셋 검출 방법들
-            # 1. 고조파 기반
-            harmonic_onsets = librosa.onset.onset_detect(
-                y=y, sr=sr, hop_length=self.hop_length, units='frames',
-                onset_envelope=librosa.onset.onset_strength(y=y, sr=sr)
+                onset_envelope=feats.onset_env("full"), sr=feats.sr,
+                hop_length=self.hop_length, units='frames'
             )
-            
-            # 2. 퍼커시브 기반
+
+            # 퍼커시브 기반 (스펙트럼 HPSS – 차트 단계와 같은 perc 온셋)
             percussive_onsets = librosa.onset.onset_detect(
-                y=y, sr=sr, hop_length=self.hop_length, units='frames',
-                onset_envelope=librosa.onset.onset_strength(
-                    y=librosa.effects.percussive(y), sr=sr
-                )
+                onset_envelope=feats.onset_env("perc"), sr=feats.sr,
+                hop_length=self.hop_length, units='frames'
             )
-            
+
             # 모든 온셋 통합 및 중복 제거
-            all_onsets = np.concatenate([onset_frames, harmonic_onsets, percussive_onsets])
+            all_onsets = np.concatenate([onset_frames, percussive_onsets])
             unique_onsets = np.unique(all_onsets)
-            
+
             return unique_onsets
-            
+
         except Exception as e:
             logger.error(f"온셋 검출 오류: {e}")
             return np.array([])
-    
-    def _analyze_musical_features(self, y: np.ndarray, sr: int) -> Dict:
+
+    def _analyze_musical_features(self, feats: RhythmContext) -> Dict:
         """음악적 특성 분석"""
         try:
+            sr, S = feats.sr, feats.magnitude("full")
+
             # 1. 스펙트럼 중심 (밝기)
-            spectral_centroids = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-            
+            spectral_centroids = feats.centroid()
+
             # 2. 스펙트럼 대역폭
-            spectral_bandwidth = librosa.feature.spectral_bandwidth(y=y, sr=sr)[0]
-            
+            spectral_bandwidth = librosa.feature.spectral_bandwidth(S=S, sr=sr)[0]
+
             # 3. 스펙트럼 롤오프
-            spectral_rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)[0]
-            
+            spectral_rolloff = librosa.feature.spectral_rolloff(S=S, sr=sr)[0]
+
             # 4. 영교차율 (Zero Crossing Rate)
-            zcr = librosa.feature.zero_crossing_rate(y)[0]
-            
+            zcr = librosa.feature.zero_crossing_rate(feats.y)[0]
+
             # 5. MFCC (Mel-frequency cepstral coefficients)
-            mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
-            
+            mfccs = librosa.feature.mfcc(S=feats.mel_db(), sr=sr, n_mfcc=13)
+
             # 6. 크로마 특성 (음정 정보)
-            chroma = librosa.feature.chroma_stft(y=y, sr=sr)
-            
+            chroma = librosa.feature.chroma_stft(S=feats.power(), sr=sr)
+
             # 7. 리듬 패턴 분석
-            rhythm_features = self._analyze_rhythm_patterns(y, sr)
-            
+            rhythm_features = self._analyze_rhythm_patterns(feats)
+
             return {
                 'spectral_centroid': {
                     'mean': float(np.mean(spectral_centroids)),
@@ -202,65 +327,65 @@ class BeatTracker:
                 },
                 'rhythm': rhythm_features
             }
-            
+
         except Exception as e:
             logger.error(f"음악적 특성 분석 오류: {e}")
             return {}
-    
-    def _analyze_rhythm_patterns(self, y: np.ndarray, sr: int) -> Dict:
+
+    def _analyze_rhythm_patterns(self, feats: RhythmContext) -> Dict:
         """리듬 패턴 분석"""
         try:
             # 템포그램 분석
-            onset_envelope = librosa.onset.onset_strength(y=y, sr=sr)
-            tempogram = librosa.feature.tempogram(
-                onset_envelope=onset_envelope, sr=sr
-            )
-            
+            onset_envelope = feats.rhythm_env()
+            tempogram = feats.tempogram()
+
             # 리듬 복잡도 계산
             rhythm_complexity = np.std(onset_envelope)
-            
-            # 주기성 분석
-            autocorr = librosa.autocorrelate(onset_envelope)
-            periodicity = np.max(autocorr[1:]) / autocorr[0]
-            
+
+            # 주기성 분석 – MIN_PERIOD_TEMPO 보다 짧은 lag(엔벨로프 자체의 매끄러움)는 제외
+            autocorr = feats.autocorr()
+            min_lag = max(1, int(60.0 * feats.sr / (feats.hop_length * MIN_PERIOD_TEMPO)))
+            periodicity = (np.max(autocorr[min_lag:]) / autocorr[0]
+                           if autocorr[0] > 0 and len(autocorr) > min_lag else 0.0)
+
             return {
                 'complexity': float(rhythm_complexity),
                 'periodicity': float(periodicity),
-                'tempogram_shape': tempogram.shape
+                'tempogram_shape': list(tempogram.shape)
             }
-            
+
         except Exception as e:
             logger.error(f"리듬 패턴 분석 오류: {e}")
             return {}
-    
-    def _calculate_tempo_confidence(self, y: np.ndarray, sr: int, tempo: float) -> float:
-        """템포 신뢰도 계산"""
+
+    def _calculate_tempo_confidence(self, feats: RhythmContext, tempo: float) -> float:
+        """템포 신뢰도 계산 – 해당 템포 lag 의 평균 템포그램 값 / 가장 강한 주기의 값"""
         try:
-            # 템포그램 기반 신뢰도 계산
-            onset_envelope = librosa.onset.onset_strength(y=y, sr=sr)
-            tempogram = librosa.feature.tempogram(
-                onset_envelope=onset_envelope, sr=sr
-            )
-            
-            # 해당 템포에서의 에너지 비율
-            tempo_bin = int(tempo * tempogram.shape[0] / 200)  # 200 BPM 기준
-            tempo_bin = min(tempo_bin, tempogram.shape[0] - 1)
-            
-            tempo_energy = np.sum(tempogram[tempo_bin, :])
-            total_energy = np.sum(tempogram)
-            
-            confidence = tempo_energy / total_energy if total_energy > 0 else 0.0
-            return min(confidence, 1.0)
-            
+            # 템포그램 행은 lag(프레임) 단위 → 행별 BPM 으로 해당 템포의 행을 찾는다
+            tempogram = feats.tempogram()
+            bpms = librosa.tempo_frequencies(tempogram.shape[0], sr=feats.sr,
+                                             hop_length=feats.hop_length)
+            profile = tempogram.mean(axis=1)
+            valid = np.isfinite(bpms) & (bpms <= MAX_TEMPO * 2)
+            if not valid.any() or tempo <= 0:
+                return 0.0
+            tempo_bin = np.flatnonzero(valid)[np.argmin(np.abs(bpms[valid] - tempo))]
+            peak = profile[valid].max()
+
+            confidence = profile[tempo_bin] / peak if peak > 0 else 0.0
+            return float(min(confidence, 1.0))
+
         except Exception as e:
             logger.error(f"템포 신뢰도 계산 오류: {e}")
             return 0.5  # 기본값
-    
+
     def cleanup(self):
         """리소스 정리"""
         try:
+            with self._memo_lock:
+                self._memo.clear()
             if self.device == 'cuda':
                 torch.cuda.empty_cache()
             logger.info("BeatTracker 리소스 정리 완료")
         except Exception as e:
-            logger.error(f"리소스 정리 오류: {e}")
\ No newline at end of file
+            logger.error(f"리소스 정리 오류: {e}")
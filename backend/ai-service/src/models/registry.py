@@ -0,0 +1,117 @@
+# backend/ai-service/src/models/registry.py
+"""프로세스 단위 모델 레지스트리
+
+- 모델은 처음 use/available/warm_up 될 때 한 번만 로드된다 (동시 첫 요청도 한 번만 로드)
+- 인스턴스는 use() 로만 빌린다 (풀 밖으로 맨 인스턴스를 내주는 get 은 없다)
+- use() 는 모델별 인스턴스 풀에서 쉬는 인스턴스를 빌려준다. madmom 레이어는
+  activate 중 인스턴스 상태(_prev 등)를 쓰므로 한 인스턴스를 동시에 쓰지 않되,
+  추론 전체를 락으로 묶지 않고 동시 사용자가 늘면 인스턴스를 하나 더 로드한다.
+  → 풀 크기는 동시 추론 수(엔진 capacity)까지만 늘어난다 (process 엔진에선 워커마다 하나)
+- 로드 시간과 로드 전후 RSS 차이, 인스턴스 수를 기록해 /api/models 로 노출한다
+"""
+
+import importlib
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _rss_bytes() -> int:
+    """현재 프로세스 RSS (리눅스 /proc, 그 외에는 최대 RSS 로 근사)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._stats: Dict[str, Dict] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._pool_locks: Dict[str, threading.Lock] = {}
+        self._idle: Dict[str, List[Any]] = {}
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        self._loaders[name] = loader
+        self._load_locks[name] = threading.Lock()
+        self._pool_locks[name] = threading.Lock()
+        self._idle[name] = []
+        self._stats[name] = {"loaded": False, "load_sec": None,
+                             "rss_delta_bytes": None, "uses": 0, "instances": 0}
+
+    def _load(self, name: str) -> Any:
+        """최초 1회 로드 (첫 인스턴스는 풀에 넣는다). 로더가 None 을 돌려주면 사용 불가로 기록"""
+        if name in self._models:
+            return self._models[name]
+        with self._load_locks[name]:
+            if name not in self._models:
+                rss0, t0 = _rss_bytes(), time.perf_counter()
+                model = self._loaders[name]()
+                self._stats[name].update(
+                    loaded=model is not None,
+                    load_sec=round(time.perf_counter() - t0, 3),
+                    rss_delta_bytes=_rss_bytes() - rss0,
+                    instances=int(model is not None),
+                )
+                if model is not None:
+                    self._idle[name].append(model)
+                self._models[name] = model
+                logger.info("[models] %s 로드 (%.2fs, available=%s)",
+                            name, self._stats[name]["load_sec"], model is not None)
+        return self._models[name]
+
+    @contextmanager
+    def use(self, name: str):
+        """쉬는 인스턴스를 빌려준다 (없으면 하나 더 로드) – 사용 불가면 None"""
+        if self._load(name) is None:
+            yield None
+            return
+        with self._pool_locks[name]:
+            model = self._idle[name].pop() if self._idle[name] else None
+            self._stats[name]["uses"] += 1
+        if model is None:
+            model = self._loaders[name]()
+            with self._pool_locks[name]:
+                self._stats[name]["instances"] += 1
+            logger.info("[models] %s 인스턴스 추가 (%d개)",
+                        name, self._stats[name]["instances"])
+        try:
+            yield model
+        finally:
+            with self._pool_locks[name]:
+                self._idle[name].append(model)
+
+    def available(self, name: str) -> bool:
+        """사용 가능 여부 (필요하면 로드) – 인스턴스는 빌리지 않는다"""
+        return self._load(name) is not None
+
+    def warm_up(self, names: Optional[Iterable[str]] = None):
+        """앱 시작 시 즉시 로드 – 첫 요청이 로드 지연을 떠안지 않도록"""
+        for name in names or list(self._loaders):
+            self._load(name)
+
+    def stats(self) -> Dict[str, Dict]:
+        return {name: dict(s) for name, s in self._stats.items()}
+
+
+# ──────────────────────────────────────────────────────────────
+# 기본 등록 모델
+# ──────────────────────────────────────────────────────────────
+def _load_madmom_beats():
+    if importlib.util.find_spec("madmom") is None:
+        return None
+    from madmom.features.beats import RNNBeatProcessor, DBNBeatTrackingProcessor
+    return RNNBeatProcessor(), DBNBeatTrackingProcessor(fps=100)
+
+
+model_registry = ModelRegistry()
+model_registry.register("madmom_beats", _load_madmom_beats)
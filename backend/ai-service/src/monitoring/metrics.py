@@ -0,0 +1,103 @@
+# backend/ai-service/src/monitoring/metrics.py
+"""Prometheus 지표 정의
+
+- ai_http_request_duration_seconds : 엔드포인트(라우트 템플릿)별 지연
+- ai_stage_duration_seconds        : 분석·다운로드 단계별 지연 (progress 훅 + yt-dlp 단계)
+- ai_audio_processed_seconds_total : 실제 분석한 오디오 길이 (캐시 적중 제외)
+- ai_download_bytes_total          : YouTube 에서 새로 받은 mp3 바이트
+- ai_cache_lookups_total           : 캐시별 hit/miss (적중률은 PromQL 에서 계산)
+- ai_admission_rejected_total      : 승인 제어 한도 초과로 429 를 돌려준 수 (한도별)
+- ai_job_queue_depth · ai_jobs_running · ai_analysis_inflight · ai_threadpool_busy
+  · ai_admission_memory_bytes : 스크레이프 시점에 갱신하는 용량 지표
+"""
+
+import time
+from typing import Callable, Dict, Optional
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily
+
+# 수 ms(차트) ~ 수 분(긴 곡 분석·다운로드)을 모두 담는 버킷
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5,
+                   10, 20, 30, 60, 120, 300, 600)
+
+HTTP_LATENCY = Histogram(
+    "ai_http_request_duration_seconds", "HTTP 요청 처리 시간",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS)
+STAGE_LATENCY = Histogram(
+    "ai_stage_duration_seconds", "분석/다운로드 단계별 처리 시간",
+    ["stage"], buckets=LATENCY_BUCKETS)
+AUDIO_SECONDS = Counter(
+    "ai_audio_processed_seconds_total", "분석한 오디오 길이(초)", ["source"])
+DOWNLOAD_BYTES = Counter(
+    "ai_download_bytes_total", "YouTube 에서 새로 받은 mp3 바이트")
+ADMISSION_REJECTED = Counter(
+    "ai_admission_rejected_total", "승인 제어로 거절한 분석 요청 수", ["reason"])
+
+QUEUE_DEPTH = Gauge("ai_job_queue_depth", "작업 대기열 길이")
+JOBS_RUNNING = Gauge("ai_jobs_running", "실행 중인 작업 수")
+ENGINE_INFLIGHT = Gauge("ai_analysis_inflight", "분석 엔진에서 실행 중인 요청 수")
+THREADPOOL_BUSY = Gauge("ai_threadpool_busy", "run_in_threadpool 사용 중인 스레드 수")
+THREADPOOL_SIZE = Gauge("ai_threadpool_size", "run_in_threadpool 스레드 한도")
+ADMISSION_MEMORY = Gauge("ai_admission_memory_bytes", "승인된 분석의 예약 메모리 합계")
+
+
+class _CacheCollector:
+    """캐시 객체의 hits/misses 카운터를 스크레이프 시점에 읽어 노출"""
+
+    def __init__(self):
+        self._caches: Dict[str, Callable[[], Dict]] = {}
+
+    def add(self, name: str, stats: Callable[[], Dict]):
+        self._caches[name] = stats
+
+    def collect(self):
+        family = CounterMetricFamily("ai_cache_lookups", "캐시 조회 수",
+                                     labels=["cache", "result"])
+        for name, stats in self._caches.items():
+            s = stats()
+            family.add_metric([name, "hit"], s.get("hits", 0))
+            family.add_metric([name, "miss"], s.get("misses", 0))
+        yield family
+
+
+_cache_collector = _CacheCollector()
+REGISTRY.register(_cache_collector)
+
+
+def register_cache(name: str, stats: Callable[[], Dict]):
+    """stats() 가 {"hits", "misses"} 를 돌려주는 캐시를 지표에 등록"""
+    _cache_collector.add(name, stats)
+
+
+class StageTimer:
+    """progress 콜백을 감싸 단계 전환 시각으로 단계별 시간을 기록
+
+    progress(stage) 는 단계 "시작"을 알리므로, 다음 단계가 오거나 블록을 빠져나갈 때
+    직전 단계의 소요 시간을 관측한다. 원래 콜백(작업 상태 갱신)도 그대로 호출.
+
+        with StageTimer(progress) as progress:
+            ...
+    """
+
+    def __init__(self, progress: Optional[Callable[[str], None]] = None):
+        self._inner = progress
+        self._stage: Optional[str] = None
+        self._t0 = 0.0
+
+    def __call__(self, stage: str):
+        self._close()
+        self._stage, self._t0 = stage, time.perf_counter()
+        if self._inner is not None:
+            self._inner(stage)
+
+    def _close(self):
+        if self._stage is not None:
+            STAGE_LATENCY.labels(self._stage).observe(time.perf_counter() - self._t0)
+            self._stage = None
+
+    def __enter__(self) -> "StageTimer":
+        return self
+
+    def __exit__(self, *exc):
+        self._close()
@@ -0,0 +1,183 @@
+# backend/ai-service/src/monitoring/profiler.py
+"""느린 분석 요청 프로파일러
+
+PROFILE_MODE=sample (기본) : 분석 스레드의 스택을 PROFILE_INTERVAL_MS 마다 샘플링
+PROFILE_MODE=cprofile      : cProfile (함수 호출 단위, 오버헤드 큼)
+PROFILE_MODE=off           : 비활성
+
+모든 분석 요청을 프로파일하되, 걸린 시간이 PROFILE_SLOW_SEC 를 넘거나
+요청에 X-Profile: 1 헤더가 있을 때만 PROFILE_DIR 에 beatmap_id 이름으로 저장하고
+나머지는 버린다. 최근 PROFILE_KEEP 개만 남긴다.
+
+샘플 모드 출력은 flamegraph.pl / speedscope 에 바로 넣을 수 있는 folded stack
+("바깥;...;안쪽 <ms>") 이며, 맨 위에 자기 시간(self) 기준 상위 함수 요약을 붙인다.
+샘플러도 GIL 이 있어야 돌기 때문에 GIL 을 쥔 긴 C 호출은 끝난 직후 프레임에
+시간이 몰린다 → 샘플마다 개수 대신 직전 샘플 이후 경과 시간을 가중치로 쓴다.
+(ANALYSIS_EXECUTOR=process 에서는 분석이 워커에서 돌아 대기 스택만 잡힌다)
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODE = os.getenv("PROFILE_MODE", "sample")           # sample | cprofile | off
+PROFILE_SLOW_SEC = float(os.getenv("PROFILE_SLOW_SEC", "20"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "10"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/audio_profiles")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+PROFILE_HEADER = "x-profile"
+
+
+# ──────────────────────────────────────────────────────────────
+# 수집기
+# ──────────────────────────────────────────────────────────────
+class StackSampler:
+    """대상 스레드의 스택을 주기적으로 읽어 (스택 → 누적 ms) 로 모은다"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def _label(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += (now - last) * 1000
+            last = now
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> str:
+        self._stop.set()
+        self._thread.join()
+        own = Counter()
+        for stack, ms in self.stacks.items():
+            own[stack.rsplit(";", 1)[-1].split(" (")[0]] += ms
+        total = sum(self.stacks.values()) or 1.0
+        lines = ["# self time (top 25)"]
+        lines += [f"# {ms:10.1f} ms {ms / total:6.1%}  {fn}" for fn, ms in own.most_common(25)]
+        lines += [f"{stack} {ms:.0f}" for stack, ms in self.stacks.most_common()]
+        return "\n".join(lines) + "\n"
+
+
+class _CProfile:
+    def __init__(self):
+        self._prof = cProfile.Profile()
+
+    def start(self):
+        self._prof.enable()
+
+    def stop(self) -> str:
+        self._prof.disable()
+        out = io.StringIO()
+        pstats.Stats(self._prof, stream=out).sort_stats("cumulative").print_stats(60)
+        return out.getvalue()
+
+
+# ──────────────────────────────────────────────────────────────
+# 저장소
+# ──────────────────────────────────────────────────────────────
+def _save(key: str, elapsed: float, label: str, forced: bool, body: str) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile_id = f"{os.path.splitext(key)[0]}-{int(time.time() * 1000)}"
+    meta = {"id": profile_id, "beatmap_id": key, "label": label, "mode": PROFILE_MODE,
+            "elapsed_sec": round(elapsed, 3), "forced": forced, "created": time.time()}
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.txt")
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fp:
+        fp.write(f"# {json.dumps(meta)}\n{body}")
+    os.replace(tmp_path, path)
+    _prune()
+    logger.info("[profile] %s 저장 (%.1fs, %s)", profile_id, elapsed, label)
+    return profile_id
+
+
+def _prune():
+    files = sorted((f for f in os.listdir(PROFILE_DIR) if f.endswith(".txt")),
+                   key=lambda f: os.path.getmtime(os.path.join(PROFILE_DIR, f)))
+    for name in files[:max(len(files) - PROFILE_KEEP, 0)]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, name))
+        except FileNotFoundError:
+            pass
+
+
+def list_profiles(limit: int = 50) -> List[Dict]:
+    """최근 프로파일 메타 (최신순)"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    names = sorted((f for f in os.listdir(PROFILE_DIR) if f.endswith(".txt")),
+                   key=lambda f: os.path.getmtime(os.path.join(PROFILE_DIR, f)),
+                   reverse=True)[:limit]
+    out = []
+    for name in names:
+        path = os.path.join(PROFILE_DIR, name)
+        try:
+            with open(path, "r", encoding="utf-8") as fp:
+                meta = json.loads(fp.readline()[2:])
+        except (OSError, ValueError):
+            continue
+        out.append({**meta, "size": os.path.getsize(path)})
+    return out
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """프로파일 파일 경로 (id 검증 포함, 없으면 None)"""
+    if not profile_id or "/" in profile_id or profile_id.startswith("."):
+        return None
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.txt")
+    return path if os.path.isfile(path) else None
+
+
+# ──────────────────────────────────────────────────────────────
+# PUBLIC
+# ──────────────────────────────────────────────────────────────
+def profiled(fn: Callable[..., Dict], *args, force: bool = False, label: str = "",
+             key: Callable[[Dict], Optional[str]] = lambda r: r.get("beatmap_id"),
+             **kwargs) -> Dict:
+    """fn 을 현재 스레드에서 프로파일하며 실행 – 느리거나 force 면 저장하고
+    결과 dict 에 "profile_id" 를 붙인다"""
+    if PROFILE_MODE == "off":
+        return fn(*args, **kwargs)
+    prof = (_CProfile() if PROFILE_MODE == "cprofile"
+            else StackSampler(threading.get_ident(), PROFILE_INTERVAL_MS / 1000))
+    t0 = time.perf_counter()
+    prof.start()
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        body = prof.stop()
+    elapsed = time.perf_counter() - t0
+    if (force or elapsed >= PROFILE_SLOW_SEC) and isinstance(result, dict):
+        try:
+            result["profile_id"] = _save(key(result) or "unknown", elapsed,
+                                         label, force, body)
+        except OSError as e:
+            logger.warning("[profile] 저장 실패: %s", e)
+    return result
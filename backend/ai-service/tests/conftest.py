@@ -0,0 +1,15 @@
+# backend/ai-service/tests/conftest.py
+"""src 를 import 경로에 넣고, 모듈 import 시점에 읽는 저장 경로를 임시 디렉터리로 돌린다"""
+
+import os
+import sys
+import tempfile
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, os.path.abspath(SRC))
+
+_tmp = tempfile.mkdtemp(prefix="ai-service-tests-")
+for name in ("BEATMAP_DIR", "AUDIO_DIR", "UPLOAD_SPOOL_DIR"):
+    os.environ.setdefault(name, os.path.join(_tmp, name.lower()))
+os.environ.setdefault("MODEL_WARMUP", "0")
+os.environ.setdefault("ANALYSIS_EXECUTOR", "thread")
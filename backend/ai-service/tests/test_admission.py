@@ -0,0 +1,130 @@
+# backend/ai-service/tests/test_admission.py
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from api import audio_routes
+from api.admission import MB, AdmissionController, AdmissionRejected
+
+SR = 22050
+
+
+def _controller(**kw):
+    opts = dict(max_memory=100 * MB, max_slots=2, client_memory=60 * MB, client_slots=1,
+                bytes_per_sample=1)
+    opts.update(kw)
+    return AdmissionController(**opts)
+
+
+def test_admit_reserves_and_releases():
+    ctl = _controller()
+    with ctl.admit("a", 60, SR) as ticket:
+        assert ticket.memory == 60 * SR
+        assert ctl.stats()["inflight"] == 1
+    assert ctl.stats()["inflight"] == 0 and ctl.memory_in_use() == 0
+
+
+def test_rejects_client_and_global_limits():
+    ctl = _controller()
+    with ctl.admit("a", 60, SR):
+        with pytest.raises(AdmissionRejected) as e:
+            with ctl.admit("a", 1, SR):
+                pass
+        assert (e.value.reason, e.value.client) == ("client_slots", "a")
+        with ctl.admit("b", 60, SR):
+            with pytest.raises(AdmissionRejected) as e:
+                ctl.check("c")
+            assert (e.value.reason, e.value.client) == ("slots", None)
+            assert e.value.retry_after >= 1
+    assert ctl.rejected == 2
+
+
+def test_oversized_request_runs_alone():
+    ctl = _controller(max_memory=1 * MB)
+    with ctl.admit("a", 600, SR):
+        with pytest.raises(AdmissionRejected) as e:
+            with ctl.admit("b", 600, SR):
+                pass
+        assert e.value.reason == "memory"
+
+
+def test_internal_callers_wait_instead_of_rejecting():
+    ctl = _controller(max_slots=1)
+    admitted = threading.Event()
+
+    def worker():
+        with ctl.admit(None, 1, SR):
+            admitted.set()
+
+    with ctl.admit("a", 1, SR):
+        t = threading.Thread(target=worker)
+        t.start()
+        assert not admitted.wait(0.1)
+    assert admitted.wait(5)
+    t.join()
+
+
+# ──────────────────────────────────────────────────────────────
+# 공유 분석 (single-flight) 재시도
+# ──────────────────────────────────────────────────────────────
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(audio_routes, "FLIGHT_RETRY_BACKOFF_SEC", 0.0)
+
+
+def test_shared_flight_runs_once(no_backoff):
+    calls = []
+
+    async def run():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"beatmap_id": "x.json"}
+
+    async def main():
+        return await asyncio.gather(*(audio_routes._shared_analysis("k1", run, c)
+                                      for c in ("a", "b", "c")))
+
+    assert asyncio.run(main()) == [{"beatmap_id": "x.json"}] * 3
+    assert len(calls) == 1
+
+
+def test_joiner_retries_after_other_clients_rejection(no_backoff):
+    results = iter([AdmissionRejected("client_slots", 5, client="other"),
+                    {"beatmap_id": "mine.json"}])
+
+    async def run():
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    assert asyncio.run(audio_routes._shared_analysis("k2", run, "me")) == \
+        {"beatmap_id": "mine.json"}
+
+
+def test_own_rejection_is_429_without_retry(no_backoff):
+    calls = []
+
+    async def run():
+        calls.append(1)
+        raise AdmissionRejected("client_slots", 7, client="me")
+
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(audio_routes._shared_analysis("k3", run, "me"))
+    assert (e.value.status_code, e.value.headers["Retry-After"]) == (429, "7")
+    assert len(calls) == 1
+
+
+def test_retries_are_bounded(no_backoff):
+    calls = []
+
+    async def run():
+        calls.append(1)
+        raise AdmissionRejected("client_memory", 3, client="other")
+
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(audio_routes._shared_analysis("k4", run, "me"))
+    assert e.value.status_code == 429
+    assert len(calls) == audio_routes.FLIGHT_RETRIES + 1
@@ -0,0 +1,25 @@
+# backend/ai-service/tests/test_beat_tracker.py
+import numpy as np
+
+from models.beat_tracker import BeatTracker
+
+SR = 22050
+
+
+def _signal(seconds, seed):
+    return np.random.default_rng(seed).standard_normal(int(seconds * SR)).astype(np.float32)
+
+
+def test_memo_reuses_context_for_same_signal():
+    tracker = BeatTracker(device="cpu")
+    y = _signal(3, 0)
+    assert tracker.features(y, SR) is tracker.features(y.copy(), SR)
+
+
+def test_memo_is_capped_by_bytes():
+    tracker = BeatTracker(device="cpu", memo_bytes=8 << 20)
+    old = tracker.features(_signal(20, 0), SR)
+    old.stft()                                  # ≈ 8.9 MB 스펙트로그램 + 신호
+    new = tracker.features(_signal(2, 1), SR)
+    assert list(tracker._memo.values()) == [new]
+    assert sum(ctx.nbytes for ctx in tracker._memo.values()) <= 8 << 20
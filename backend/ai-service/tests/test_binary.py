@@ -0,0 +1,79 @@
+# backend/ai-service/tests/test_binary.py
+import io
+import json
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import beatmaps
+from beatmap import binary
+from beatmap.store import save_beatmap
+
+
+def _beatmap(n=2000, seed=0, difficulty="hard"):
+    rng = np.random.default_rng(seed)
+    times = np.round(np.cumsum(rng.uniform(0.05, 0.4, n)), 4)
+    events = [{"id": i + 1, "time": float(t), "type": ("normal", "strong")[i % 3 == 0],
+               "lane": int(rng.integers(4))} for i, t in enumerate(times)]
+    return {"tempo": 128.0, "lanes": 4, "events": events, "difficulty": difficulty}
+
+
+def _window(beatmap, start, end):
+    lo = -float("inf") if start is None else start
+    hi = float("inf") if end is None else end
+    return [e for e in beatmap["events"] if lo <= e["time"] < hi]
+
+
+class CountingReader(io.BytesIO):
+    """읽은 바이트 수를 센다"""
+    def __init__(self, data):
+        super().__init__(data)
+        self.nread = 0
+
+    def read(self, size=-1):
+        out = super().read(size)
+        self.nread += len(out)
+        return out
+
+
+def test_round_trip():
+    beatmap = _beatmap()
+    assert binary.decode(binary.encode(beatmap)) == beatmap
+    empty = {"tempo": 0.0, "lanes": 4, "events": []}
+    assert binary.decode(binary.encode(empty)) == empty
+
+
+@pytest.mark.parametrize("start,end", [(None, None), (0, 10), (12.3, 47.9), (95.0, None),
+                                       (None, 0.5), (30.0, 30.0), (1e6, None)])
+def test_read_range_matches_decode_and_json(start, end):
+    beatmap = _beatmap()
+    data = binary.encode(beatmap)
+    ranged = binary.read(io.BytesIO(data), start, end)
+    assert ranged == binary.decode(data, start, end)
+    assert ranged["events"] == _window(beatmap, start, end)
+
+
+def test_read_seeks_to_range():
+    data = binary.encode(_beatmap(n=20000))
+    fp = CountingReader(data)
+    assert binary.read(fp, 100.0, 110.0)["events"]
+    assert fp.nread < len(data) / 10             # 헤더 · 인덱스 + 청크 하나
+
+
+def test_api_range_reads_binary(tmp_path, monkeypatch):
+    monkeypatch.setattr(beatmaps, "SAVE_DIR", str(tmp_path))
+    app = FastAPI()
+    app.include_router(beatmaps.router, prefix="/api/beatmaps")
+    beatmap = _beatmap()
+    beatmap_id = save_beatmap(str(tmp_path), beatmap)
+    client = TestClient(app)
+
+    url = f"/api/beatmaps/{beatmap_id}?start=20&end=35"
+    res = client.get(url)
+    assert res.json()["events"] == _window(beatmap, 20, 35)
+    res = client.get(url, headers={"Accept": binary.MEDIA_TYPE})
+    assert res.headers["content-type"] == binary.MEDIA_TYPE
+    assert binary.decode(res.content)["events"] == _window(beatmap, 20, 35)
+    assert json.loads(client.get(f"/api/beatmaps/{beatmap_id}").content) == beatmap
@@ -0,0 +1,85 @@
+# backend/ai-service/tests/test_cache.py
+import os
+
+from beatmap.cache import BeatmapCache
+from beatmap.features import feature_path
+from beatmap.store import beatmap_files, save_beatmap
+
+BEATMAP = {"tempo": 120.0, "lanes": 4,
+           "events": [{"id": 1, "time": 0.5, "type": "normal", "lane": 0}]}
+
+
+def _cache(path, **kw):
+    return BeatmapCache(str(path), lambda: {"v": 1}, **kw)
+
+
+def test_two_writers_keep_each_others_entries(tmp_path):
+    a, b = _cache(tmp_path), _cache(tmp_path)
+    id_a = save_beatmap(str(tmp_path), BEATMAP)
+    id_b = save_beatmap(str(tmp_path), BEATMAP)
+    a.store("audio-a", id_a, upload_digest="up-a")
+    b.store("audio-b", id_b, upload_digest="up-b")
+
+    fresh = _cache(tmp_path)
+    assert fresh.lookup_upload("up-a") == id_a
+    assert fresh.lookup_upload("up-b") == id_b
+    assert a.lookup("audio-b") == id_b
+
+
+def test_one_miss_per_request(tmp_path):
+    cache = _cache(tmp_path)
+    assert cache.lookup_upload("up") is None
+    assert cache.lookup("audio") is None
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_lru_eviction_deletes_files(tmp_path):
+    cache = _cache(tmp_path, max_entries=1)
+    old = save_beatmap(str(tmp_path), BEATMAP)
+    cache.store("old", old)
+    new = save_beatmap(str(tmp_path), BEATMAP)
+    cache.store("new", new)
+    assert cache.lookup("old") is None
+    assert not os.path.exists(tmp_path / old)
+    assert cache.lookup("new") == new
+
+
+def _files_size(path, beatmap_id):
+    return sum(os.path.getsize(p) for p in beatmap_files(str(path), beatmap_id)
+               if os.path.exists(p))
+
+
+def test_entry_size_counts_variants_and_eviction_removes_them(tmp_path):
+    cache = _cache(tmp_path, max_entries=1)
+    old = save_beatmap(str(tmp_path), BEATMAP)
+    cache.store("old", old)
+    variants = [p for p in beatmap_files(str(tmp_path), old) if os.path.exists(p)]
+    assert len(variants) >= 3                   # JSON + .gz + .bmap (+ .br)
+    assert cache.stats()["bytes"] == _files_size(tmp_path, old)
+
+    cache.store("new", save_beatmap(str(tmp_path), BEATMAP))
+    assert not any(os.path.exists(p) for p in variants)
+
+
+def _feat(path, digest, size=1000):
+    with open(feature_path(str(path), digest), "wb") as f:
+        f.write(b"\0" * size)
+
+
+def test_eviction_removes_feature_file_with_last_entry(tmp_path):
+    cache = _cache(tmp_path, max_entries=2)
+    _feat(tmp_path, "old")
+    easy = save_beatmap(str(tmp_path), BEATMAP)
+    cache.store("old/easy", easy)
+    hard = save_beatmap(str(tmp_path), BEATMAP)
+    cache.store("old/hard", hard)
+    # .feat 는 첫 항목에만 더해진다
+    assert cache.stats()["bytes"] == _files_size(tmp_path, easy) + _files_size(tmp_path, hard) + 1000
+
+    cache.store("new", save_beatmap(str(tmp_path), BEATMAP))
+    assert not os.path.exists(tmp_path / easy)
+    assert os.path.exists(feature_path(str(tmp_path), "old"))      # hard 가 아직 사용
+
+    cache.store("newer", save_beatmap(str(tmp_path), BEATMAP))
+    assert not os.path.exists(tmp_path / hard)
+    assert not os.path.exists(feature_path(str(tmp_path), "old"))
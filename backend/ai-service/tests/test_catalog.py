@@ -0,0 +1,52 @@
+# backend/ai-service/tests/test_catalog.py
+import pytest
+
+from beatmap.catalog import BeatmapCatalog
+
+BEATMAP = {"tempo": 120.0, "lanes": 4,
+           "events": [{"id": 1, "time": 0.5, "type": "normal", "lane": 0}]}
+
+
+def _pages(catalog, limit, cursor=None, **filters):
+    """cursor 부터 마지막 페이지까지 이어 붙인 행"""
+    rows, cursor = catalog.query(limit, cursor, **filters)
+    while cursor is not None:
+        page, cursor = catalog.query(limit, cursor, **filters)
+        rows += page
+    return rows
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """created 가 여러 항목에서 같은(동률 정렬 키) 카탈로그"""
+    catalog = BeatmapCatalog(str(tmp_path))
+    stamps = [1700000000.123456, 1700000000.123456, 1700000001.5, 1700000002.0]
+    for i in range(37):
+        catalog.put(f"{i:02d}-map.json", {**BEATMAP, "tempo": 100.0 + i},
+                    {"created": stamps[i % len(stamps)], "source": ("upload", "batch")[i % 2]})
+    return catalog
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, 9, 36, 37, 50])
+def test_keyset_pages_have_no_gaps_or_repeats(catalog, limit):
+    rows = _pages(catalog, limit)
+    ids = [r["beatmap_id"] for r in rows]
+    assert len(ids) == len(set(ids)) == catalog.count()
+    keys = [(r["created"], r["beatmap_id"]) for r in rows]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_keyset_pages_with_filters(catalog):
+    rows = _pages(catalog, 4, source="batch", min_tempo=110)
+    ids = [r["beatmap_id"] for r in rows]
+    expected = {f"{i:02d}-map.json" for i in range(37) if i % 2 and 100 + i >= 110}
+    assert len(ids) == len(set(ids)) and set(ids) == expected
+
+
+def test_insert_between_pages_does_not_repeat(catalog):
+    first, cursor = catalog.query(10)
+    catalog.put("zz-new.json", BEATMAP, {"created": 1700000003.0})   # 첫 페이지보다 최신
+    rest = _pages(catalog, 10, cursor)
+    ids = [r["beatmap_id"] for r in first + rest]
+    assert len(ids) == len(set(ids)) == catalog.count() - 1
+
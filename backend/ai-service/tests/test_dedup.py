@@ -0,0 +1,27 @@
+# backend/ai-service/tests/test_dedup.py
+from concurrent.futures import ThreadPoolExecutor
+
+from audio.dedup import VideoIndex
+
+
+def test_concurrent_writers_keep_each_others_entries(tmp_path):
+    a, b = VideoIndex(str(tmp_path)), VideoIndex(str(tmp_path))
+
+    def put(i):
+        (a if i % 2 else b).put(f"video{i:06d}", {"path": f"/mp3/{i}.mp3"}, f"{i}.json", "fp")
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(put, range(200)))
+    fresh = VideoIndex(str(tmp_path))
+    assert all(fresh.get(f"video{i:06d}")["beatmap_id"] == f"{i}.json" for i in range(200))
+
+
+def test_meta_update_keeps_beatmap_link(tmp_path):
+    index = VideoIndex(str(tmp_path))
+    index.put("abcdefghijk", {"path": "/mp3/a.mp3"}, "a.json", "fp1")
+    index.put("abcdefghijk", {"path": "/mp3/a2.mp3"})            # 다운로드만 다시
+    assert index.get("abcdefghijk") == {"meta": {"path": "/mp3/a2.mp3"},
+                                        "beatmap_id": "a.json", "params": "fp1"}
+    assert index.repoint({"a.json": "b.json"}, "fp2") == 1
+    assert index.get("abcdefghijk")["beatmap_id"] == "b.json"
+    assert index.get("abcdefghijk")["params"] == "fp2"
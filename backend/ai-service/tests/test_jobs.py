@@ -0,0 +1,77 @@
+# backend/ai-service/tests/test_jobs.py
+import asyncio
+
+from jobs import manager
+from jobs.backends import MemoryBackend
+from jobs.manager import JobManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_backend_expires_jobs_after_ttl():
+    clock = FakeClock()
+    backend = MemoryBackend(ttl_sec=60, clock=clock)
+
+    async def run():
+        await backend.save({"id": "a", "status": "done"})
+        clock.now = 30
+        await backend.save({"id": "b", "status": "running"})
+        clock.now = 59
+        assert (await backend.load("a"))["status"] == "done"
+        clock.now = 61
+        assert await backend.load("a") is None
+        assert (await backend.load("b"))["status"] == "running"
+        # 갱신하면 만료가 다시 ttl 만큼 밀린다
+        await backend.save({"id": "b", "status": "done"})
+        clock.now = 120
+        assert (await backend.load("b"))["status"] == "done"
+        clock.now = 122
+        assert await backend.load("b") is None
+        assert not backend._jobs
+
+    asyncio.run(run())
+
+
+def test_worker_survives_backend_errors_and_fails_dequeued_job(monkeypatch):
+    monkeypatch.setattr(manager, "WORKER_BACKOFF_SEC", 0.001)
+    backend = MemoryBackend()
+    jobs = JobManager(backend, {"echo": lambda payload, progress: payload}, workers=1)
+    real_dequeue, real_save = backend.dequeue, backend.save
+    errors = {"dequeue": 1, "save": 1}
+
+    async def dequeue():
+        if errors["dequeue"]:
+            errors["dequeue"] -= 1
+            raise ConnectionError("redis down")
+        return await real_dequeue()
+
+    async def save(job):
+        # 첫 작업의 RUNNING 저장만 실패
+        if job["status"] == manager.RUNNING and errors["save"]:
+            errors["save"] -= 1
+            raise ConnectionError("redis down")
+        await real_save(job)
+
+    backend.dequeue, backend.save = dequeue, save
+
+    async def run():
+        await jobs.start()
+        first = await jobs.submit("echo", {"n": 1})
+        second = await jobs.submit("echo", {"n": 2})
+        for _ in range(200):
+            if (await jobs.get(second["id"]))["status"] == manager.DONE:
+                break
+            await asyncio.sleep(0.01)
+        failed, done = await jobs.get(first["id"]), await jobs.get(second["id"])
+        await jobs.stop()
+        return failed, done
+
+    failed, done = asyncio.run(run())
+    assert (failed["status"], failed["error"]) == (manager.FAILED, "redis down")
+    assert (done["status"], done["result"]) == (manager.DONE, {"n": 2})
@@ -0,0 +1,41 @@
+# backend/ai-service/tests/test_rechart.py
+import os
+
+import numpy as np
+
+from api.analyze import SAVE_DIR, beatmap_cache, save_features
+from audio.dedup import VideoIndex
+from beatmap.catalog import catalog_for
+from beatmap.charting import BeatmapFeatures
+from beatmap.store import save_beatmap
+from cli.rechart import rechart
+
+
+def _features():
+    rng = np.random.default_rng(0)
+    n = 430                                      # 약 10 초 (22050 Hz, hop 512)
+    return BeatmapFeatures(sr=22050, hop_length=512, duration=n * 512 / 22050, tempo=120.0,
+                           beat_times=np.arange(0.5, 9.5, 0.5), onset_env=rng.random(n),
+                           centroid=rng.random(n) * 4000)
+
+
+def test_rechart_writes_new_id_and_repoints_indexes(tmp_path):
+    old_id = save_beatmap(SAVE_DIR, {"tempo": 90.0, "lanes": 4, "events": []},
+                          meta={"title": "song", "source": "youtube"})
+    created = catalog_for(SAVE_DIR).get(old_id)["created"]
+    save_features("rechart-audio", _features())
+    beatmap_cache.store("rechart-audio", old_id)
+    videos = VideoIndex(SAVE_DIR)
+    videos.put("abcdefghijk", {"path": str(tmp_path / "a.mp3")}, beatmap_id=old_id,
+               params=beatmap_cache.fingerprint())
+
+    counts, _ = rechart(force=True)
+
+    new_id = beatmap_cache.lookup("rechart-audio")
+    assert counts["rechart"] >= 1 and new_id != old_id
+    assert not os.path.exists(os.path.join(SAVE_DIR, old_id))     # 같은 id 에 덮어쓰지 않음
+    assert os.path.exists(os.path.join(SAVE_DIR, new_id))
+    assert VideoIndex(SAVE_DIR).get("abcdefghijk")["beatmap_id"] == new_id
+    row = catalog_for(SAVE_DIR).get(new_id)
+    assert (row["title"], row["source"], row["created"]) == ("song", "youtube", created)
+    assert catalog_for(SAVE_DIR).get(old_id) is None
@@ -0,0 +1,44 @@
+# backend/ai-service/tests/test_registry.py
+import threading
+
+from models.registry import ModelRegistry
+
+
+def _registry(loader):
+    registry = ModelRegistry()
+    registry.register("m", loader)
+    return registry
+
+
+def test_use_never_lends_one_instance_twice():
+    registry = _registry(object)
+    assert registry.available("m")
+    with registry.use("m") as a, registry.use("m") as b:
+        assert a is not b
+    with registry.use("m") as c:                # 반납된 인스턴스를 다시 쓴다
+        assert c in (a, b)
+    assert registry.stats()["m"]["instances"] == 2
+
+
+def test_concurrent_users_hold_distinct_instances():
+    registry = _registry(object)
+    held, barrier = [], threading.Barrier(4)
+
+    def work():
+        with registry.use("m") as model:
+            held.append(model)
+            barrier.wait(timeout=5)             # 넷이 동시에 빌린 상태
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(m) for m in held}) == 4
+
+
+def test_unavailable_model_yields_none():
+    registry = _registry(lambda: None)
+    assert not registry.available("m")
+    with registry.use("m") as model:
+        assert model is None
@@ -0,0 +1,79 @@
+# backend/ai-service/tests/test_static_files.py
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.static_files import IMMUTABLE, CachedStaticFiles
+from beatmap.store import save_beatmap
+
+BEATMAP = {"tempo": 120.0, "lanes": 4,
+           "events": [{"id": i + 1, "time": i * 0.25, "type": "normal", "lane": i % 4}
+                      for i in range(200)]}
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = FastAPI()
+    app.mount("/beatmaps", CachedStaticFiles(directory=str(tmp_path), precompress=True))
+    app.mount("/audio", CachedStaticFiles(directory=str(tmp_path)))
+    return TestClient(app)
+
+
+def test_etag_revalidation_returns_304(client, tmp_path):
+    beatmap_id = save_beatmap(str(tmp_path), BEATMAP)
+    headers = {"Accept-Encoding": "identity"}
+    res = client.get(f"/beatmaps/{beatmap_id}", headers=headers)
+    assert res.status_code == 200 and res.headers["cache-control"] == IMMUTABLE
+    etag = res.headers["etag"]
+
+    res = client.get(f"/beatmaps/{beatmap_id}", headers={**headers, "If-None-Match": etag})
+    assert (res.status_code, res.content, res.headers["etag"]) == (304, b"", etag)
+    res = client.get(f"/beatmaps/{beatmap_id}",
+                     headers={**headers, "If-None-Match": f'"other", W/{etag}'})
+    assert res.status_code == 304
+    res = client.get(f"/beatmaps/{beatmap_id}", headers={**headers, "If-None-Match": '"other"'})
+    assert res.status_code == 200
+
+
+def test_accept_encoding_selects_precompressed_variant(client, tmp_path):
+    beatmap_id = save_beatmap(str(tmp_path), BEATMAP)
+    plain = client.get(f"/beatmaps/{beatmap_id}", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["vary"]
+
+    gz = client.get(f"/beatmaps/{beatmap_id}", headers={"Accept-Encoding": "gzip"})
+    assert gz.headers["content-encoding"] == "gzip"
+    assert gz.json() == BEATMAP
+    assert gz.headers["etag"] != plain.headers["etag"]        # 인코딩별 ETag
+    assert int(gz.headers["content-length"]) == os.path.getsize(tmp_path / f"{beatmap_id}.gz")
+
+    if os.path.exists(tmp_path / f"{beatmap_id}.br"):
+        br = client.get(f"/beatmaps/{beatmap_id}", headers={"Accept-Encoding": "gzip, br"})
+        assert br.headers["content-encoding"] == "br"
+    # q=0 이면 그 인코딩은 고르지 않는다
+    res = client.get(f"/beatmaps/{beatmap_id}", headers={"Accept-Encoding": "gzip;q=0, br;q=0"})
+    assert "content-encoding" not in res.headers
+
+
+def test_range_and_if_range(client, tmp_path):
+    data = bytes(range(256)) * 16
+    (tmp_path / "song.mp3").write_bytes(data)
+    res = client.get("/audio/song.mp3", headers={"Range": "bytes=100-199"})
+    assert res.status_code == 206
+    assert res.headers["content-range"] == f"bytes 100-199/{len(data)}"
+    assert res.content == data[100:200]
+    etag = res.headers["etag"]
+
+    res = client.get("/audio/song.mp3", headers={"Range": "bytes=-10"})
+    assert (res.status_code, res.content) == (206, data[-10:])
+    res = client.get("/audio/song.mp3", headers={"Range": f"bytes={len(data)}-"})
+    assert res.status_code == 416
+    assert res.headers["content-range"] == f"bytes */{len(data)}"
+
+    # If-Range 가 맞으면 구간, 어긋나면(파일이 바뀜) 전체
+    res = client.get("/audio/song.mp3", headers={"Range": "bytes=0-9", "If-Range": etag})
+    assert (res.status_code, res.content) == (206, data[:10])
+    res = client.get("/audio/song.mp3", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert (res.status_code, res.content) == (200, data)
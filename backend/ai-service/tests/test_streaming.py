@@ -0,0 +1,71 @@
+# backend/ai-service/tests/test_streaming.py
+"""구간 출력(iter_segments)이 청크 크기·구간 길이와 무관한지, 블록 추출
+(extract_features_streaming)이 곡 전체 추출과 같은 특징을 내는지 확인
+
+픽스처는 시드 고정 합성 트랙 (128 BPM 킥·하이햇 클릭 + 화음 + 잡음, 38 초 → 비트 추적
+구간 3개). 청크는 무작위 크기로 잘라 ffmpeg 파이프처럼 흘린다.
+"""
+
+import numpy as np
+import pytest
+
+from beatmap.analysis import extract_features, make_beatmap
+from beatmap.streaming import extract_features_streaming, iter_segments, join_segments
+
+SR = 22050
+
+
+@pytest.fixture(scope="module")
+def track():
+    rng = np.random.default_rng(7)
+    n = int(38 * SR)
+    t = np.arange(n) / SR
+    y = 0.05 * rng.standard_normal(n) + 0.1 * np.sin(2 * np.pi * 220 * t)
+    click = np.arange(int(0.05 * SR)) / SR
+    kick = np.sin(2 * np.pi * 80 * click) * np.exp(-click * 60)
+    hat = rng.standard_normal(click.size) * np.exp(-click * 120) * 0.4
+    beat = 60.0 / 128
+    for i, start in enumerate(np.arange(0, 38 - 0.1, beat / 2)):
+        a = int(start * SR)
+        y[a:a + click.size] += hat if i % 2 else kick
+    return y.astype(np.float32)
+
+
+def _chunks(y, seed):
+    cuts = np.sort(np.random.default_rng(seed).integers(0, len(y), 9))
+    return iter(np.split(y, cuts))
+
+
+@pytest.fixture(scope="module")
+def reference(track):
+    """청크 하나 · 곡보다 긴 구간 하나로 만든 구간 차트"""
+    return join_segments(list(iter_segments(iter([track]), SR, segment_sec=60)))
+
+
+@pytest.mark.parametrize("segment_sec", [10, 15])
+def test_segments_independent_of_chunks_and_length(track, reference, segment_sec):
+    segments = list(iter_segments(_chunks(track, segment_sec), SR, segment_sec=segment_sec))
+    assert join_segments(segments) == reference
+    assert reference["events"]
+    assert [s["segment"] for s in segments] == list(range(len(segments)))
+    assert segments[-1]["last"] and not any(s["last"] for s in segments[:-1])
+    for seg in segments:
+        assert all(seg["start"] <= ev["time"] for ev in seg["events"])
+        if not seg["last"]:
+            assert all(ev["time"] < seg["end"] for ev in seg["events"])
+
+
+def test_segment_chart_tracks_whole_song_chart(track, reference):
+    """구간 차트는 통계만 다르다 – 템포 같고 노트 수는 10% 안"""
+    whole = make_beatmap(track, SR)
+    assert reference["tempo"] == whole["tempo"]
+    assert abs(len(reference["events"]) - len(whole["events"])) <= 0.1 * len(whole["events"])
+
+
+def test_streaming_features_match_whole_song(track):
+    whole = extract_features(track, SR)
+    streamed = extract_features_streaming(_chunks(track, 1), SR, block_sec=10)
+    for name in ("onset_env", "centroid"):
+        assert np.allclose(getattr(whole, name), getattr(streamed, name), rtol=1e-4), name
+    assert np.allclose(whole.beat_times, streamed.beat_times, atol=0.02)
+    assert (whole.tempo, whole.duration) == (streamed.tempo, streamed.duration)
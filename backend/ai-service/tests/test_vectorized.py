@@ -0,0 +1,146 @@
+# backend/ai-service/tests/test_vectorized.py
+"""일괄(NumPy) 스냅·레인 구현이 이전 루프 구현과 같은 결과를 내는지 회귀 확인
+
+비트 그리드는 템포로 만들고 약간 흔들고, 후보 시각에는 분할 경계 근처 값을 섞는다.
+온셋·centroid 곡선은 시드 고정 난수.
+저장된 실제 차트(backend/audio_json)의 이벤트 시각·템포로도 같은 비교를 한다.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from beatmap.charting import (BEAT_TOL, SNAP_TOL, SUBDIVISIONS,
+                              assign_lanes, near_beat, snap_to_grid)
+
+
+# ──────────────────────────────────────────────────────────────
+# 이전 루프 구현 (비교 기준)
+# ──────────────────────────────────────────────────────────────
+def snap_to_grid_ref(times, beat_times, bpm):
+    if len(beat_times) < 2 or bpm is None or np.isnan(bpm):
+        return times
+    beat_dur = 60.0 / bpm
+    snapped = []
+    for t in times:
+        idx = max(np.searchsorted(beat_times, t) - 1, 0)
+        base = beat_times[idx]
+        rel = t - base
+        best = t
+        best_diff = SNAP_TOL + 1
+        for div in SUBDIVISIONS:
+            cand = base + round(rel / (beat_dur / div)) * (beat_dur / div)
+            diff = abs(cand - t)
+            if diff < best_diff:
+                best, best_diff = cand, diff
+        snapped.append(best if best_diff <= SNAP_TOL else t)
+    return np.array(snapped)
+
+
+def events_ref(final_times, beat_times, onset_env, time_axis, strong_thr,
+               centroid_norm, frame_times):
+    rr_idx = {0: 0, 1: 0, 2: 0, 3: 0}
+    mapping = {0: [0, 1, 0, 1], 1: [1, 0, 1, 0], 2: [2, 3, 2, 3], 3: [3, 2, 3, 2]}
+    out = []
+    for i, t in enumerate(final_times, start=1):
+        strength = np.interp(t, time_axis, onset_env,
+                             left=onset_env[0], right=onset_env[-1])
+        is_beat = any(abs(t - b) < BEAT_TOL for b in beat_times)
+        strong = bool(is_beat and strength >= strong_thr)
+        if strong:
+            lane = 1 if (i % 2) else 2
+        else:
+            c_val = np.interp(t, frame_times, centroid_norm,
+                              left=centroid_norm[0], right=centroid_norm[-1])
+            bucket = int(np.clip(np.floor(np.sqrt(c_val) * 4), 0, 3))
+            lane = mapping[bucket][rr_idx[bucket] % 4]
+            rr_idx[bucket] += 1
+        out.append((strong, lane))
+    return out
+
+
+# ──────────────────────────────────────────────────────────────
+def _inputs(seed, n_events=400, bpm=None):
+    rng = np.random.default_rng(seed)
+    bpm = bpm or float(rng.uniform(70, 180))
+    end = 90.0
+    beats = np.arange(0.0, end, 60.0 / bpm)
+    beats = np.sort(beats + rng.normal(0, 0.01, beats.size))
+    # 분할 경계(1/8 비트 중간) 근처와 임의 시각
+    step = 60.0 / bpm / 8
+    edges = (np.arange(n_events) + 0.5) * step + rng.normal(0, 0.005, n_events)
+    times = np.sort(rng.uniform(0, end, n_events))
+    cands = np.unique(np.concatenate([times, edges]))
+    fps = 22050 / 512
+    n = int(end * fps) + 1
+    time_axis = np.arange(n) / fps
+    onset_env = rng.gamma(2.0, 1.0, n)
+    centroid_norm = rng.uniform(0, 1, n)
+    return cands, times, beats, bpm, onset_env, time_axis, centroid_norm
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_snap_to_grid_matches_loop(seed):
+    cands, _, beats, bpm, *_ = _inputs(seed)
+    assert np.array_equal(snap_to_grid(cands, beats, bpm), snap_to_grid_ref(cands, beats, bpm))
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_assign_lanes_matches_loop(seed):
+    _, times, beats, _, onset_env, axis, cnorm = _inputs(seed)
+    strong_thr = np.percentile(onset_env, 70)
+    strong, lanes = assign_lanes(times, beats, onset_env, axis, strong_thr, cnorm, axis)
+    assert events_ref(times, beats, onset_env, axis, strong_thr, cnorm, axis) == \
+        list(zip(strong.tolist(), lanes.tolist()))
+
+
+def test_near_beat_matches_loop():
+    _, times, beats, *_ = _inputs(0)
+    ref = [any(abs(t - b) < BEAT_TOL for b in beats) for t in times]
+    assert near_beat(times, beats).tolist() == ref
+
+
+def test_degenerate_inputs():
+    beats = np.array([0.0, 0.5, 1.0])
+    assert snap_to_grid(np.array([]), beats, 120.0).size == 0
+    assert snap_to_grid([0.3], [0.0], 120.0) == [0.3]
+    assert near_beat([0.1], []).tolist() == [False]
+
+
+# ──────────────────────────────────────────────────────────────
+# 저장된 차트(backend/audio_json) 기반 회귀
+# ──────────────────────────────────────────────────────────────
+AUDIO_JSON_DIR = Path(__file__).resolve().parents[2] / "audio_json"
+STORED = sorted(AUDIO_JSON_DIR.glob("*.json")) if AUDIO_JSON_DIR.is_dir() else []
+
+
+def _stored_inputs(path):
+    """저장된 차트 → (이벤트 시각, 비트 그리드, bpm, 온셋·centroid 곡선)
+
+    비트 그리드는 첫 strong 노트(비트 위)에 맞춘 템포 격자, 곡선은 파일별 시드 난수.
+    """
+    chart = json.loads(path.read_text())
+    times = np.array([e["time"] for e in chart["events"]], dtype=float)
+    bpm = float(chart["tempo"])
+    anchor = next((e["time"] for e in chart["events"] if e["type"] == "strong"), 0.0)
+    beat_dur = 60.0 / bpm
+    beats = np.arange(anchor % beat_dur, times[-1] + beat_dur, beat_dur)
+    rng = np.random.default_rng(len(times))
+    fps = 22050 / 512
+    axis = np.arange(int((times[-1] + 1) * fps)) / fps
+    return times, beats, bpm, rng.gamma(2.0, 1.0, axis.size), axis, rng.uniform(0, 1, axis.size)
+
+
+@pytest.mark.skipif(not STORED, reason="backend/audio_json 없음")
+@pytest.mark.parametrize("path", STORED, ids=lambda p: p.stem[:8])
+def test_stored_charts_match_loop(path):
+    times, beats, bpm, onset_env, axis, cnorm = _stored_inputs(path)
+    assert np.array_equal(snap_to_grid(times, beats, bpm), snap_to_grid_ref(times, beats, bpm))
+    assert near_beat(times, beats).tolist() == \
+        [any(abs(t - b) < BEAT_TOL for b in beats) for t in times]
+    strong_thr = np.percentile(onset_env, 70)
+    strong, lanes = assign_lanes(times, beats, onset_env, axis, strong_thr, cnorm, axis)
+    assert events_ref(times, beats, onset_env, axis, strong_thr, cnorm, axis) == \
+        list(zip(strong.tolist(), lanes.tolist()))